@@ -0,0 +1,57 @@
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Sentencias a medir, de la más ligera a la más completa
+STATEMENTS = [
+    "import batch_processing",
+    "from batch_processing import BatchProcessorFactory",
+    "from batch_processing import IIterableBatchProcessor",
+    "import batch_processing.batch_processor.batch_worker",
+]
+RUNS = 15
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+
+
+def import_times(statement: str) -> Tuple[int, Dict[str, int]]:
+    """Ejecuta la sentencia con -X importtime; devuelve el total y el acumulado por módulo (µs)."""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    cumulative: Dict[str, int] = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        # Solo los módulos de primer nivel suman al total
+        if not name.startswith("  "):
+            total += int(cum)
+        cumulative[name.strip()] = int(cum)
+    return total, cumulative
+
+
+def benchmark(statement: str) -> None:
+    totals: List[int] = []
+    per_module: Dict[str, List[int]] = {}
+    for _ in range(RUNS):
+        total, cumulative = import_times(statement)
+        totals.append(total)
+        for name, cum in cumulative.items():
+            per_module.setdefault(name, []).append(cum)
+
+    print(f"\n--- {statement} ---")
+    print(f"Mediana: {statistics.median(totals) / 1000:.1f} ms (mín {min(totals) / 1000:.1f} ms, {RUNS} ejecuciones)")
+    print(f"Módulos importados: {len(per_module)}")
+    slowest = sorted(per_module.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)
+    for name, times in slowest[:8]:
+        print(f"  {statistics.median(times) / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    for statement in sys.argv[1:] or STATEMENTS:
+        benchmark(statement)
@@ -1,22 +1,40 @@
-from .worker_pool import IWorkerPool
-from .batch_processor import IBatchWorker, IBatchProcessor, BatchProcessorConfig
-from .monitor import IWorkerMonitor
-from .iterable_batch_processor import IIterableBatchProcessor
-from .worker_pool.factory import WorkerPoolFactory
-from .batch_processor.factory import BatchProcessorFactory
-from .configuration import FailurePolicy, SharedConfig
-from .context import ControlContext
+from typing import TYPE_CHECKING
+from ._lazy import lazy_exports
 
-__all__ = [
-    "IWorkerPool",
-    "IBatchWorker",
-    "IBatchProcessor",
-    "BatchProcessorConfig",
-    "IWorkerMonitor",
-    "IIterableBatchProcessor",
-    "WorkerPoolFactory",
-    "BatchProcessorFactory",
-    "FailurePolicy",
-    "SharedConfig",
-    "ControlContext",
-]
+if TYPE_CHECKING:
+    from .worker_pool import IWorkerPool
+    from .batch_processor import IBatchWorker, IBatchProcessor, BatchProcessorConfig, RetryPolicy
+    from .monitor import IWorkerMonitor
+    from .iterable_batch_processor import IIterableBatchProcessor
+    from .input_source import IInputSource
+    from .pipeline import IPipeline, PipelineFactory, Stage
+    from .dag import IDag, DagFactory, Node
+    from .worker_pool.factory import WorkerPoolFactory
+    from .batch_processor.factory import BatchProcessorFactory
+    from .configuration import FailurePolicy, SharedConfig
+    from .context import ControlContext
+
+_EXPORTS = {
+    "IWorkerPool": ".worker_pool",
+    "IBatchWorker": ".batch_processor",
+    "IBatchProcessor": ".batch_processor",
+    "BatchProcessorConfig": ".batch_processor",
+    "RetryPolicy": ".batch_processor",
+    "IWorkerMonitor": ".monitor",
+    "IIterableBatchProcessor": ".iterable_batch_processor",
+    "IInputSource": ".input_source",
+    "IPipeline": ".pipeline",
+    "PipelineFactory": ".pipeline",
+    "Stage": ".pipeline",
+    "IDag": ".dag",
+    "DagFactory": ".dag",
+    "Node": ".dag",
+    "WorkerPoolFactory": ".worker_pool.factory",
+    "BatchProcessorFactory": ".batch_processor.factory",
+    "FailurePolicy": ".configuration",
+    "SharedConfig": ".configuration",
+    "ControlContext": ".context",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,13 +1,46 @@
-from .batch_processor import IBatchProcessor, BatchProcessor
-from .batch_worker import IBatchWorker, BatchWorkerExecutor
-from .configuration import BatchProcessorConfig
-from .factory import BatchProcessorFactory
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "BatchProcessor",
-    "BatchProcessor",
-    "IBatchWorker",
-    "BatchWorkerExecutor",
-    "BatchProcessorConfig",
-    "BatchProcessorFactory",
-]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .batch_processor import IBatchProcessor, BatchProcessor
+    from .batch_worker import IBatchWorker, BatchWorkerExecutor
+    from .configuration import BatchProcessorConfig, RetryPolicy
+    from .factory import BatchProcessorFactory
+    from .task import Task, TaskResult
+    from .deadline_expired_error import DeadlineExpiredError
+    from .exception_info import ErrorCapture, ErrorGroup, ExceptionInfo
+    from .result_cache import IResultCache, LRUResultCache, SqliteResultCache
+    from .profiling import ProfileMode, ProfileResult
+    from .tracing import ITraceHook, Phase, TraceConfig, TraceEvent, Tracer
+    from .speculation import ServiceTimes, SpeculationConfig
+
+_EXPORTS = {
+    "BatchProcessor": ".batch_processor",
+    "IBatchWorker": ".batch_worker",
+    "BatchWorkerExecutor": ".batch_worker",
+    "BatchProcessorConfig": ".configuration",
+    "RetryPolicy": ".configuration",
+    "BatchProcessorFactory": ".factory",
+    "Task": ".task",
+    "TaskResult": ".task",
+    "DeadlineExpiredError": ".deadline_expired_error",
+    "ErrorCapture": ".exception_info",
+    "ErrorGroup": ".exception_info",
+    "ExceptionInfo": ".exception_info",
+    "IResultCache": ".result_cache",
+    "LRUResultCache": ".result_cache",
+    "SqliteResultCache": ".result_cache",
+    "ProfileMode": ".profiling",
+    "ProfileResult": ".profiling",
+    "ITraceHook": ".tracing",
+    "Phase": ".tracing",
+    "TraceConfig": ".tracing",
+    "TraceEvent": ".tracing",
+    "Tracer": ".tracing",
+    "ServiceTimes": ".speculation",
+    "SpeculationConfig": ".speculation",
+    "IBatchProcessor": ".batch_processor",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,11 +1,20 @@
+import time
 from abc import abstractmethod
+from collections import deque
 from queue import Empty
-from typing import Generic, TypeVar, Optional, List
+from typing import Any, Deque, Dict, Generic, Hashable, Set, Tuple, TypeVar, Optional, List
 from contextlib import AbstractContextManager
 from .context import BatchProcessorContext
+from .deadline_expired_error import DeadlineExpiredError
+from .edf_dispatcher import EdfDispatcher
 from .worker_reported_error import WorkerReportedError
-from .exception_info import ExceptionInfo
+from .exception_info import ErrorGroup, ExceptionInfo
+from .result_cache import LRUResultCache
+from .task import EndOfStream, Task, TaskResult, unwrap, wrap
+from .profiling import ProfileMode, ProfileResult, collect_reports
+from .tracing import Phase, Tracer
 from ..configuration import FailurePolicy
+from ..logger import queue_logging
 from ..worker_pool.worker_pool import IWorkerPool
 from ..monitor.monitor import IWorkerMonitor
 
@@ -20,7 +29,11 @@ class IBatchProcessor(Generic[I, O], AbstractContextManager):
         pass
 
     @abstractmethod
-    def stop(self) -> None:
+    def stop(self, drain: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def drain(self) -> List[O]:
         pass
 
     @abstractmethod
@@ -28,7 +41,7 @@ class IBatchProcessor(Generic[I, O], AbstractContextManager):
         pass
 
     @abstractmethod
-    def put(self, item: I) -> None:
+    def put(self, item: I, deadline: Optional[float] = None) -> None:
         pass
 
     @abstractmethod
@@ -48,22 +61,250 @@ class BatchProcessor(IBatchProcessor[I, O]):
         self.monitor = monitor
         self.ctx = ctx
         self._fatal_exception: Optional[Exception] = None
+        # Parent-side bookkeeping for tracked tasks (config.track_tasks)
+        self._next_task_id = 0
+        self._pending: Dict[int, Task[I]] = {}
+        self._lost_counts: Dict[int, int] = {}
+        # Errors not read from error_queue by poll_exceptions (lost tasks, coalesced copies)
+        self._reported: List[ExceptionInfo] = []
+        self._error_groups: Dict[Optional[str], ErrorGroup] = {}
+        # Results already taken off out_queue, served before it by get()/get_nowait()
+        self._ready: Deque[O] = deque()
+        # Item keys of tracked tasks, for caching and coalescing
+        self._task_keys: Dict[int, Hashable] = {}
+        self._inflight: Dict[Hashable, int] = {}
+        # Envelope ids of the coalesced submitters waiting on each task
+        self._waiters: Dict[int, List[List[int]]] = {}
+        self.cache: Optional[LRUResultCache] = None
+        if ctx.config.cache_size is not None:
+            self.cache = LRUResultCache(ctx.config.cache_size, ctx.config.cache_ttl)
+        # Items skipped because their deadline passed, see expired()
+        self.expired_count = 0
+        self._expired: List[ExceptionInfo] = []
+        self._expired_unsent: Deque[Tuple[Any, float]] = deque()
+        self._dispatcher: Optional[EdfDispatcher] = None
+        if ctx.config.edf:
+            self._dispatcher = EdfDispatcher(
+                ctx.in_queue,
+                pool.size,
+                pool.taken_items,
+                lambda entry, deadline: self._expired_unsent.append((entry, deadline)),
+            )
+        # Items put on in_queue directly, without the EDF dispatcher
+        self._sent = 0
+        # Tasks given a second copy by speculate(), and how many
+        self._speculated: Set[int] = set()
+        # Speculated tasks one copy of which failed, settled only if the other fails too
+        self._failed_once: Set[int] = set()
+        self.speculated_count = 0
+        self._last_speculation = 0.0
 
     def start(self) -> None:
         self.ctx.stop_event.clear()
         self.ctx.abort_event.clear()
+        if self.ctx.config.shared.logging:
+            # Before the workers fork, so they inherit the queue handler
+            queue_logging.start()
+        # Spawned workers inherit no handler, they attach to the queue themselves
+        self.ctx.worker_logging = queue_logging.worker_logging
         self.pool.start()
         self.monitor.start()
+        if self._dispatcher is not None:
+            self._dispatcher.start()
+
+    def _finish(self, task_id: int) -> List[List[int]]:
+        """Drop a settled task's bookkeeping; returns the envelope ids of the submitters coalesced into it."""
+        self._pending.pop(task_id, None)
+        self._lost_counts.pop(task_id, None)
+        self._failed_once.discard(task_id)
+        key = self._task_keys.pop(task_id, None)
+        if key is not None and self._inflight.get(key) == task_id:
+            del self._inflight[key]
+        if task_id in self._speculated and self.ctx.config.speculation.cancel_losers:
+            # The other copy is still running for nothing. A worker that moved on to
+            # another task meanwhile is killed with it, that one goes back in the queue
+            for displaced in self.pool.cancel_tasks([task_id]):
+                task = self._pending.get(displaced)
+                if task is not None:
+                    self._enqueue(task, task.deadline)
+        return self._waiters.pop(task_id, [])
+
+    def _copy_failed(self, task_id: Optional[int]) -> bool:
+        """Whether a failure of this task waits for its other copy, which may still succeed."""
+        if task_id not in self._speculated or task_id in self._failed_once:
+            return False
+        self._failed_once.add(task_id)
+        return True
+
+    def _get_error(self) -> ExceptionInfo:
+        """Next error from error_queue, skipping those a speculated task's other copy may make up for."""
+        while True:
+            info = self.ctx.error_queue.get_nowait()
+            if info.task_id not in self._speculated:
+                return info
+            # Settled already, or the first of its copies to fail
+            if info.task_id in self._pending and not self._copy_failed(info.task_id):
+                return info
+
+    def _group_error(self, info: ExceptionInfo) -> None:
+        group = self._error_groups.get(info.signature)
+        if group is None:
+            self._error_groups[info.signature] = ErrorGroup(info)
+            return
+        group.count += 1
+        if not (group.info.tb or group.info.frames) and (info.tb or info.frames):
+            group.info = info
+
+    def error_summary(self) -> List[ErrorGroup]:
+        """Errors handled so far grouped by signature, most frequent first."""
+        return sorted(self._error_groups.values(), key=lambda group: group.count, reverse=True)
+
+    def best_worker_count(self) -> Optional[int]:
+        """Worker count with the highest throughput found by auto-tune, None if it is off."""
+        tuner = self.monitor.tuner
+        return None if tuner is None else tuner.best_workers
+
+    def _handle_info(self, info: ExceptionInfo) -> None:
+        self._group_error(info)
+        if info.task_id is not None and info.task_id in self._pending:
+            # Coalesced submitters of the same item fail with it
+            self._reported.extend([info] * len(self._finish(info.task_id)))
+
+        policy = self.ctx.config.on_worker_exception
+        if policy == FailurePolicy.RETRY:
+            policy = self.ctx.config.retry_policy.on_exhausted
+
+        if policy == FailurePolicy.ABORT:
+            self._abort(WorkerReportedError(info))
 
     def _handle_worker_exceptions(self) -> None:
         while True:
             try:
-                info = self.ctx.error_queue.get_nowait()
+                info = self._get_error()
             except Empty:
                 break
 
-            if self.ctx.config.on_worker_exception == FailurePolicy.ABORT:
-                self._abort(WorkerReportedError(info))
+            if info.exc_type is DeadlineExpiredError:
+                self._record_expired(info)
+                continue
+            self._handle_info(info)
+
+    def _record_expired(self, info: ExceptionInfo) -> None:
+        copies = 1
+        if info.task_id is not None and info.task_id in self._pending:
+            copies += len(self._finish(info.task_id))
+        self.expired_count += copies
+        self._expired.extend([info] * copies)
+
+    def _collect_expired(self) -> None:
+        """Report the items the dispatcher dropped without sending them."""
+        now = time.monotonic()
+        while self._expired_unsent:
+            entry, deadline = self._expired_unsent.popleft()
+            task = entry if isinstance(entry, Task) else Task(None, entry, deadline)
+            exc = DeadlineExpiredError(deadline, now - deadline)
+            self._record_expired(ExceptionInfo(
+                exc_type=DeadlineExpiredError,
+                message=str(exc),
+                tb="",
+                item=task.item if self.ctx.config.error_include_item else None,
+                task_id=task.id,
+            ))
+
+    def expired(self) -> List[ExceptionInfo]:
+        """
+        Items skipped because their deadline passed, since the last call.
+
+        They are not worker errors: the failure policy does not apply to them and
+        poll_exceptions() does not return them. ``expired_count`` keeps the total.
+        """
+        self._collect_expired()
+        while True:
+            try:
+                info = self._get_error()
+            except Empty:
+                break
+            if info.exc_type is DeadlineExpiredError:
+                self._record_expired(info)
+            else:
+                self._reported.append(info)
+                self._handle_info(info)
+        expired, self._expired = self._expired, []
+        return expired
+
+    def _redelivery_limit(self) -> int:
+        if self.ctx.config.max_redeliveries is not None:
+            return self.ctx.config.max_redeliveries
+        if self.ctx.config.on_worker_exception == FailurePolicy.RETRY:
+            return self.ctx.config.retry_policy.max_attempts - 1
+        return 0
+
+    def _handle_lost_tasks(self) -> int:
+        """Requeue or report the tasks held by workers that died or were evicted, returns how many were requeued."""
+        requeued = 0
+        for lost in self.pool.lost_tasks():
+            task = self._pending.get(lost.task_id)
+            if task is None or self._copy_failed(task.id):
+                continue  # Already settled, or the other copy of a speculated task may still succeed
+
+            redeliveries = self._lost_counts.get(task.id, 0)
+            if redeliveries < self._redelivery_limit():
+                self._lost_counts[task.id] = redeliveries + 1
+                self._enqueue(task, task.deadline)
+                requeued += 1
+                continue
+
+            # Poison pill: the item keeps killing or hanging workers
+            info = ExceptionInfo(
+                exc_type=type(lost.error),
+                message=str(lost.error),
+                tb="",
+                item=task.item,
+                task_id=task.id,
+                attempts=redeliveries + 1,
+            )
+            self._reported.append(info)
+            self._handle_info(info)
+        return requeued
+
+    def speculate(self) -> int:
+        """
+        Give stragglers a second copy on idle workers, returns how many were launched.
+
+        Meant for the tail of a job, once no more items are coming: a tracked item in
+        flight for longer than ``speculation.quantile`` of the service times measured
+        so far is queued again, at most once and only while workers are idle. The
+        first result settles it and the other copy's is dropped; an error settles it
+        only once both copies have failed.
+        Checks at most once per ``speculation.interval`` seconds.
+        """
+        config = self.ctx.config.speculation
+        service_times = self.ctx.service_times
+        if config is None or service_times is None:
+            return 0
+        now = time.monotonic()
+        if now - self._last_speculation < config.interval:
+            return 0
+        self._last_speculation = now
+
+        threshold = service_times.quantile(config.quantile, config.min_samples)
+        if threshold is None:
+            return 0
+        in_flight = self.pool.in_flight()
+        idle = self.pool.size() - len(in_flight) - self._waiting()
+        launched = 0
+        # Longest running first
+        for task_id, elapsed in sorted(in_flight, key=lambda entry: entry[1], reverse=True):
+            if launched >= idle or elapsed <= threshold:
+                break
+            task = self._pending.get(task_id)
+            if task is None or task_id in self._speculated:
+                continue
+            self._speculated.add(task_id)
+            self._enqueue(task, task.deadline)
+            launched += 1
+        self.speculated_count += launched
+        return launched
 
     def _abort(self, exc: Exception) -> None:
         if not self._fatal_exception:
@@ -71,8 +312,137 @@ class BatchProcessor(IBatchProcessor[I, O]):
             self.ctx.abort_event.set()
             self.ctx.stop_event.set()
 
-    def stop(self) -> None:
+    def stop(self, drain: bool = False) -> None:
+        """
+        Stop the workers and release the pool.
+
+        With ``drain=True`` every queued item is processed first (see ``drain``) and
+        the results not yet retrieved stay available through ``get``/``get_nowait``.
+        """
+        if drain:
+            self._ready.extend(self.drain())
+            return
+        self._shutdown()
+
+    def _traced(self, phase: Phase, fn, *args):
+        tracer = self.ctx.tracer
+        if tracer is None:
+            return fn(*args)
+        start = tracer.begin(phase)
+        try:
+            return fn(*args)
+        finally:
+            tracer.end(tracer.parent_ring, phase, start)
+
+    @property
+    def tracer(self) -> Optional[Tracer]:
+        """Phase timings of this processor, None unless ``BatchProcessorConfig.trace`` is set."""
+        return self.ctx.tracer
+
+    def profile(
+        self,
+        duration: float,
+        mode: ProfileMode = ProfileMode.CPROFILE,
+        slots: Optional[List[int]] = None,
+        interval: float = 0.005,
+        timeout: float = 5.0,
+    ) -> ProfileResult:
+        """
+        Profile running workers for ``duration`` seconds and merge what they report.
+
+        Workers start between items, so one busy with a long item joins late or, if
+        not within the profiling time, not at all. ``slots`` selects workers by pool
+        slot, all by default. ``interval`` is the sampling period in ``SAMPLE`` mode.
+        Reports are awaited up to ``timeout`` seconds past ``duration``; results that
+        arrive meanwhile are kept for ``get()``.
+        """
+        channel = self.ctx.profile_channel
+        if channel is None:
+            raise RuntimeError("Profiling needs a local worker pool")
+        slots = list(range(len(channel))) if slots is None else list(slots)
+        request = channel.request(slots, mode, duration, interval)
+        reports = collect_reports(channel, slots, request, duration, timeout, self._buffer_results)
+        return ProfileResult(reports)
+
+    def _buffer_results(self) -> None:
+        # Workers writing results block once the pipe is full, keep it drained while waiting.
+        # Only for a queue this processor owns, a shared one is read by the next stage.
+        if not self.ctx.config.echo_end_of_stream:
+            return
+        while True:
+            try:
+                result = self.ctx.out_queue.get_nowait()
+            except Empty:
+                return
+            if not self.ctx.config.track_tasks:
+                self._ready.append(result)
+            elif self._settle(result):
+                self._ready.append(result.result)
+
+    def drain(self) -> List[O]:
+        return self._traced(Phase.DRAIN, self._drain)
+
+    def _drain(self) -> List[O]:
+        """
+        Let workers finish every queued item, then stop; returns the unretrieved results.
+
+        One ``EndOfStream`` marker per live worker is queued behind the pending items.
+        A worker echoes its marker on ``out_queue`` and exits, so once every marker is
+        back all results are too. The monitor keeps evicting hung workers and replacing
+        crashed ones meanwhile, but no longer restarts the workers that exit on their
+        marker. Tracked items lost during the drain are queued again behind the
+        markers, and another round of workers is started for them.
+        """
+        self.monitor.draining = True
+        if self._dispatcher is not None:
+            # Markers must go behind every item, stop pacing and send the rest now
+            self._dispatcher.flush()
+
+        results = list(self._ready)
+        self._ready.clear()
+        while self._drain_round(results):
+            self.pool.stop()
+            self.pool.restart_dead()
+
+        self._shutdown()
+        return results
+
+    def _drain_round(self, results: List[O]) -> int:
+        """Send one marker per live worker and collect results until they are back, returns the items requeued."""
+        n_markers = self.pool.alive_workers()
+        for _ in range(n_markers):
+            self.ctx.in_queue.put(EndOfStream())
+
+        requeued = 0
+        finished = 0
+        while finished < n_markers:
+            try:
+                result = self.ctx.out_queue.get(timeout=0.1)
+            except Empty:
+                if self.ctx.config.track_tasks:
+                    requeued += self._handle_lost_tasks()
+                if self.pool.alive_workers() == 0 and not (self.monitor.restarts_dead and self.pool.fatal_errors()):
+                    break  # Workers died before returning their marker and are not replaced
+                continue
+
+            if isinstance(result, EndOfStream):
+                finished += 1
+            elif not self.ctx.config.track_tasks:
+                results.append(result)
+            elif self._settle(result):
+                results.append(result.result)
+
+        if self.ctx.config.track_tasks:
+            requeued += self._handle_lost_tasks()
+        return requeued if not self.ctx.abort_event.is_set() else 0
+
+    def _shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
+        self._collect_expired()
         self._handle_worker_exceptions()
+        if self.ctx.config.track_tasks:
+            self._handle_lost_tasks()
 
         self.ctx.stop_event.set()
         self.monitor.stop()
@@ -86,22 +456,119 @@ class BatchProcessor(IBatchProcessor[I, O]):
             raise self._fatal_exception
 
     def poll_exceptions(self) -> List[ExceptionInfo]:
-        infos = []
+        if self.ctx.config.track_tasks:
+            self._handle_lost_tasks()
         while True:
             try:
-                infos.append(self.ctx.error_queue.get_nowait())
+                info = self._get_error()
             except Empty:
                 break
+            if info.exc_type is DeadlineExpiredError:
+                self._record_expired(info)
+                continue
+            self._reported.append(info)
+            self._handle_info(info)
+        infos, self._reported = self._reported, []
         return infos
 
-    def put(self, item: I) -> None:
-        self.ctx.in_queue.put(item)
+    def put(self, item: I, deadline: Optional[float] = None) -> None:
+        """
+        Queue an item for the workers.
+
+        ``deadline`` is a ``time.monotonic()`` time: an item still waiting when it
+        passes is skipped and reported by expired() instead of being worked on. With
+        ``config.edf`` items are dispatched earliest deadline first.
+        """
+        self._traced(Phase.PUT, self._put, item, deadline)
+
+    def _enqueue(self, entry, deadline: Optional[float]) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.push(entry, deadline)
+        else:
+            self.ctx.in_queue.put(entry)
+            self._sent += 1
+
+    def _waiting(self) -> int:
+        """Items queued that no worker has taken yet, counted without Queue.qsize() (not on macOS)."""
+        if self._dispatcher is not None:
+            return len(self._dispatcher) + self._dispatcher.waiting()
+        return max(0, self._sent - self.pool.taken_items())
+
+    def _put(self, item: I, deadline: Optional[float]) -> None:
+        keyed = self.cache is not None or self.ctx.config.coalesce
+        if keyed:
+            # Envelopes (e.g. checkpoint indexes) are not part of the key, like in the worker
+            ids, payload = unwrap(item)
+            key = self.ctx.config.item_key(payload)
+
+        if self.cache is not None:
+            hit, result = self.cache.get(key)
+            if hit:
+                self._ready.append(wrap(ids, result))
+                return
+
+        if self.ctx.config.coalesce and key in self._inflight:
+            # Single flight: share the pending execution instead of queueing again
+            task_id = self._inflight[key]
+            self._waiters.setdefault(task_id, []).append(ids)
+            return
+
+        if self.ctx.config.track_tasks:
+            task = Task(self._next_task_id, item, deadline)
+            self._next_task_id += 1
+            self._pending[task.id] = task
+            if keyed:
+                self._task_keys[task.id] = key
+                if self.ctx.config.coalesce:
+                    self._inflight[key] = task.id
+            self._enqueue(task, deadline)
+        elif deadline is not None:
+            self._enqueue(Task(None, item, deadline), deadline)
+        else:
+            self._enqueue(item, deadline)
+
+    def _settle(self, result: TaskResult[O]) -> bool:
+        """Mark a tracked task done; False for a late duplicate of a settled task."""
+        if result.id not in self._pending:
+            return False
+        key = self._task_keys.get(result.id)
+        waiters = self._finish(result.id)
+        # Cached and shared bare, then wrapped in the envelopes of each item that asked for it
+        value = unwrap(result.result)[1]
+        if self.cache is not None:
+            self.cache.put(key, value)
+        self._ready.extend(wrap(ids, value) for ids in waiters)
+        return True
 
     def get(self) -> O:
-        return self.ctx.out_queue.get()
+        return self._traced(Phase.GET, self._get)
+
+    def _get(self) -> O:
+        if self._ready:
+            return self._ready.popleft()
+        if not self.ctx.config.track_tasks:
+            return self.ctx.out_queue.get()
+
+        while True:
+            try:
+                result = self.ctx.out_queue.get(timeout=0.1)
+            except Empty:
+                self._handle_lost_tasks()
+                continue
+            if self._settle(result):
+                return result.result
 
     def get_nowait(self) -> O:
-        return self.ctx.out_queue.get_nowait()
+        if self._ready:
+            return self._ready.popleft()
+        if not self.ctx.config.track_tasks:
+            return self.ctx.out_queue.get_nowait()
+
+        self._handle_lost_tasks()
+        while True:
+            result = self.ctx.out_queue.get_nowait()
+            if self._settle(result):
+                return result.result
 
     def __enter__(self):
         self.start()
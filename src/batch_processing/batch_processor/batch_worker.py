@@ -1,9 +1,19 @@
+import time
 from abc import ABC, abstractmethod
 from queue import Empty
-from typing import Callable, Generic, TypeVar
+from typing import Callable, Generic, Optional, Sequence, Set, TypeVar
 from .context import BatchProcessorContext
-from .exception_info import ExceptionInfo
-from ..logger import logger
+from .deadline_expired_error import DeadlineExpiredError
+from .exception_info import ErrorCapture, ExceptionInfo
+from .result_cache import IResultCache, SqliteResultCache
+from .task import EndOfStream, Task, TaskResult
+from .profiling import WorkerProfiler
+from .tracing import Phase
+from ..configuration import FailurePolicy
+from ..context import ControlContext
+from ..logger import logger, queue_logging
+from ..worker_pool.memory import current_rss
+from ..worker_pool.resource_limits import ResourceLimits
 from ..worker_pool.worker import IWorker
 
 
@@ -12,6 +22,9 @@ O = TypeVar("O")
 
 
 class IBatchWorker(Generic[I, O], ABC):
+    # Names of the pool's resource limits to hold around every work() call
+    resources: Sequence[str] = ()
+
     @abstractmethod
     def work(self, item: I) -> O:
         pass
@@ -25,26 +38,190 @@ class BatchWorkerExecutor(Generic[I, O], IWorker):
     ):
         self.ctx = ctx
         self.worker_factory = worker_factory
+        self._shared_cache: Optional[IResultCache] = None
+        self._seen_signatures: Set[str] = set()
+        self._items_done = 0
+        if ctx.config.shared_cache_path is not None:
+            self._shared_cache = SqliteResultCache(ctx.config.shared_cache_path, ctx.config.cache_ttl)
+
+    def _begin(self, task_id) -> None:
+        if self.slots is not None:
+            self.slots.begin(self.slot, task_id)
+
+    def _end(self) -> None:
+        if self.slots is not None:
+            self.slots.end(self.slot)
+
+    def _work(self, worker: IBatchWorker[I, O], item: I) -> O:
+        if self._shared_cache is None:
+            return worker.work(item)
+
+        key = self.ctx.config.item_key(item)
+        hit, result = self._shared_cache.get(key)
+        if not hit:
+            result = worker.work(item)
+            self._shared_cache.put(key, result)
+        return result
+
+    def _over_limits(self) -> bool:
+        config = self.ctx.config
+        if config.max_items_per_worker is not None and self._items_done >= config.max_items_per_worker:
+            return True
+        return config.max_rss_per_worker is not None and current_rss() >= config.max_rss_per_worker
+
+    def _report_expired(self, item: I, task_id: Optional[int], deadline: float) -> None:
+        exc = DeadlineExpiredError(deadline, time.monotonic() - deadline)
+        self.ctx.error_queue.put_sync(ExceptionInfo(
+            exc_type=DeadlineExpiredError,
+            message=str(exc),
+            tb="",
+            item=item if self.ctx.config.error_include_item else None,
+            task_id=task_id,
+        ))
+
+    def _log_error(self, info: ExceptionInfo, first: bool) -> None:
+        if first or self.ctx.config.error_capture == ErrorCapture.FULL:
+            logger.exception("Worker exception")
+        else:
+            # The traceback was logged with the first error of this signature, formatting
+            # it again would undo what COMPACT and ID_ONLY capture save
+            logger.error("Worker exception %s, signature %s", info.exc_type.__name__, info.signature)
+
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        if self.ctx.config.on_worker_exception != FailurePolicy.RETRY:
+            return False
+        policy = self.ctx.config.retry_policy
+        if not policy.should_retry(exc, attempt):
+            return False
+        # An abort during the backoff wait gives up on the item
+        return not self.ctx.abort_event.wait(policy.delay(attempt))
 
     def target(self) -> None:
+        if self.ctx.worker_logging is not None:
+            queue_logging.attach(self.ctx.worker_logging)
         worker = self.worker_factory()
+        limits = self.limits
+        if limits is not None:
+            limits.attach(self.slot)
+        # Always taken in the same order, so workers never wait on each other's resources
+        resources = sorted(set(worker.resources))
+        if resources and limits is None:
+            # No limit names them: every item fails with the error of an unknown name
+            limits = ResourceLimits({}, 0)
+        if self.slots is not None:
+            self.slots.mark_ready(self.slot)
+        # Tracing is opt-in, when off every phase costs one None check
+        tracer = self.ctx.tracer
+        ring = tracer.ring(self.slot) if tracer is not None else -1
+        wait_start = 0
+        channel = self.ctx.profile_channel
+        profiler = WorkerProfiler(channel, self.slot) if channel is not None and self.slot >= 0 else None
+        service_times = self.ctx.service_times
 
-        while not self.ctx.stop_event.is_set():
-            if self.ctx.abort_event.is_set():
+        # Checked on every item: read the flag word, not the Events behind it
+        flags = self.ctx.control_ctx.flags
+        while not flags[ControlContext.STOP]:
+            if flags[ControlContext.ABORT]:
+                break
+            # Our replacement is running, leave between items so none is lost
+            if self.slots is not None and self.slots.should_retire(self.slot):
                 break
+            if profiler is not None:
+                profiler.poll()
 
+            if tracer is not None and not wait_start:
+                wait_start = tracer.begin(Phase.IN_QUEUE_GET)
             try:
                 item = self.ctx.in_queue.get(timeout=0.1)
             except Empty:
                 continue
 
-            try:
-                result = worker.work(item)
-                self.ctx.out_queue.put(result)
+            if isinstance(item, EndOfStream):
+                # Every item queued before the marker has been taken and ours is done
+                if self.ctx.config.echo_end_of_stream:
+                    self.ctx.out_queue.put_sync(item)
+                break
+
+            # Envelopes may be nested (e.g. a checkpoint index inside a tracked task),
+            # and a result from an upstream stage keeps its id for the next one
+            task_ids = []
+            deadline = None
+            while isinstance(item, (Task, TaskResult)):
+                if isinstance(item, Task):
+                    if item.id is not None:
+                        task_ids.append(item.id)
+                    if deadline is None:
+                        deadline = item.deadline
+                    item = item.item
+                else:
+                    task_ids.append(item.id)
+                    item = item.result
+            task_id = task_ids[0] if task_ids else None
+            if self.slots is not None:
+                self.slots.take(self.slot, task_id)
+            if tracer is not None:
+                tracer.end(ring, Phase.IN_QUEUE_GET, wait_start, task_id)
+                wait_start = 0
+
+            if deadline is not None and time.monotonic() > deadline:
+                # Too late to be of use, report it instead of computing it
+                self._report_expired(item, task_id, deadline)
+                continue
+
+            attempt = 1
+            while True:
+                try:
+                    # Waiting for a resource does not count towards the item's timeout
+                    if resources:
+                        limits.acquire_all(resources)
+                    self._begin(task_id)
+                    start = tracer.begin(Phase.WORK, task_id) if tracer is not None else 0
+                    began = time.monotonic() if service_times is not None else 0.0
+                    try:
+                        result = self._work(worker, item)
+                    finally:
+                        self._end()
+                        if service_times is not None:
+                            service_times.record(self.slot, time.monotonic() - began)
+                        if resources:
+                            limits.release_all(resources)
+                        if tracer is not None:
+                            tracer.end(ring, Phase.WORK, start, task_id)
+                    for wrapping_id in reversed(task_ids):
+                        result = TaskResult(wrapping_id, result)
+                    start = tracer.begin(Phase.OUT_QUEUE_PUT, task_id) if tracer is not None else 0
+                    self.ctx.out_queue.put_sync(result)
+                    if tracer is not None:
+                        tracer.end(ring, Phase.OUT_QUEUE_PUT, start, task_id)
+
+                except Exception as exc:
+                    if self._should_retry(exc, attempt):
+                        attempt += 1
+                        continue
+
+                    n_seen = len(self._seen_signatures)
+                    info = ExceptionInfo.from_exception(
+                        exc,
+                        item,
+                        task_id,
+                        attempt,
+                        capture=self.ctx.config.error_capture,
+                        include_item=self.ctx.config.error_include_item,
+                        seen=self._seen_signatures,
+                    )
+                    self.ctx.error_queue.put_sync(info)
+
+                    if self.ctx.config.shared.logging:
+                        self._log_error(info, first=len(self._seen_signatures) > n_seen)
+                break
 
-            except Exception as exc:
-                info = ExceptionInfo.from_exception(exc, item)
-                self.ctx.error_queue.put(info)
+            self._items_done += 1
+            if (
+                self.slots is not None
+                and not self.slots.recycle_requested(self.slot)
+                and self._over_limits()
+            ):
+                # Keep working until the pool has a replacement ready
+                self.slots.request_recycle(self.slot)
 
-                if self.ctx.config.shared.logging:
-                    logger.exception("Worker exception")
+        queue_logging.report_suppressed()
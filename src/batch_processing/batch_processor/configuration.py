@@ -1,14 +1,65 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+from .exception_info import ErrorCapture
+from .speculation import SpeculationConfig
+from .tracing import TraceConfig
 from ..configuration import FailurePolicy, SharedConfig
+from ..worker_pool.affinity import AffinitySpec
+from ..worker_pool.autotune import AutoTune
+from ..worker_pool.resource_limits import ResourceLimit
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry settings used when ``on_worker_exception`` is ``FailurePolicy.RETRY``.
+
+    Attempt ``n`` waits ``min(max_delay, base_delay * multiplier ** (n - 1))``
+    seconds, reduced by a random fraction of up to ``jitter`` (1.0 is full jitter).
+    Once ``max_attempts`` is reached the error is reported and handled with
+    ``on_exhausted``.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    jitter: float = 1.0
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+    on_exhausted: FailurePolicy = FailurePolicy.ABORT
+
+    def should_retry(self, exc: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and isinstance(exc, self.retry_on)
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1.0 - self.jitter * random.random())
 
 
 @dataclass
 class ProcessorConfig:
     shared: SharedConfig
     on_worker_exception: FailurePolicy
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    track_tasks: bool = False
+    max_redeliveries: Optional[int] = None
+    cache_size: Optional[int] = None
+    cache_ttl: Optional[float] = None
+    shared_cache_path: Optional[str] = None
+    key_fn: Optional[Callable[[Any], Hashable]] = None
+    coalesce: bool = False
+    error_capture: ErrorCapture = ErrorCapture.FULL
+    error_include_item: bool = True
+    max_items_per_worker: Optional[int] = None
+    max_rss_per_worker: Optional[int] = None
+    echo_end_of_stream: bool = True
+    edf: bool = False
+    speculation: Optional[SpeculationConfig] = None
 
+    def item_key(self, item: Any) -> Hashable:
+        return item if self.key_fn is None else self.key_fn(item)
 
 
 @dataclass
@@ -18,3 +69,33 @@ class BatchProcessorConfig:
     worker_monitoring_frequency: float = 1.0
     logging: bool = True
     worker_timeout: Optional[float] = None
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    item_timeout: Optional[float] = None
+    max_redeliveries: Optional[int] = None
+    startup_timeout: Optional[float] = None
+    affinity: AffinitySpec = None
+    cache_size: Optional[int] = None
+    cache_ttl: Optional[float] = None
+    shared_cache_path: Optional[str] = None
+    key_fn: Optional[Callable[[Any], Hashable]] = None
+    coalesce: bool = False
+    error_capture: ErrorCapture = ErrorCapture.FULL
+    error_include_item: bool = True
+    max_items_per_worker: Optional[int] = None
+    max_rss_per_worker: Optional[int] = None
+    autotune: Optional[AutoTune] = None
+    trace: Optional[TraceConfig] = None
+    edf: bool = False  # Dispatch items earliest deadline first, see BatchProcessor.put
+    # Rate and concurrency limits per downstream resource, see IBatchWorker.resources
+    resource_limits: Dict[str, ResourceLimit] = field(default_factory=dict)
+    speculation: Optional[SpeculationConfig] = None
+
+    def tracks_tasks(self) -> bool:
+        """Whether results must be matched back to their items, which needs tracked task ids."""
+        return (
+            self.item_timeout is not None
+            or self.max_redeliveries is not None
+            or self.cache_size is not None
+            or self.coalesce
+            or self.speculation is not None
+        )
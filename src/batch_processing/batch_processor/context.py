@@ -1,19 +1,38 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 from .exception_info import ExceptionInfo
 from .configuration import ProcessorConfig
+from .profiling import ProfileChannel
+from .speculation import ServiceTimes
+from .tracing import Tracer
 from ..context import ControlContext
 from ..gen_mp_queue import GenMPQueue
+from ..logger import WorkerLogging
 
 I = TypeVar("I")
 O = TypeVar("O")
 
 class BatchProcessorContext(Generic[I, O]):
-    def __init__(self, config: ProcessorConfig, control_ctx: ControlContext):
+    def __init__(
+        self,
+        config: ProcessorConfig,
+        control_ctx: ControlContext,
+        in_queue: Optional[GenMPQueue[I]] = None,
+        out_queue: Optional[GenMPQueue[O]] = None,
+    ):
         self.config = config
         self.control_ctx = control_ctx
-        self.in_queue = GenMPQueue[I]()
-        self.out_queue = GenMPQueue[O]()
+        # Queues can be shared with other processors, e.g. between pipeline stages
+        self.in_queue = GenMPQueue[I]() if in_queue is None else in_queue
+        self.out_queue = GenMPQueue[O]() if out_queue is None else out_queue
         self.error_queue = GenMPQueue[ExceptionInfo]()
+        # Set by the factory when tracing is on, sized for the pool's slots
+        self.tracer: Optional[Tracer] = None
+        # Set by the factory for local pools, lets the parent profile running workers
+        self.profile_channel: Optional[ProfileChannel] = None
+        # Set by the factory when speculation is on, workers record how long items take
+        self.service_times: Optional[ServiceTimes] = None
+        # Set on start while queue logging is on, for workers that do not inherit its handler
+        self.worker_logging: Optional[WorkerLogging] = None
 
     @property
     def stop_event(self):
@@ -0,0 +1,5 @@
+class DeadlineExpiredError(Exception):
+    def __init__(self, deadline: float, late_by: float):
+        super().__init__(f"Item deadline passed {late_by:.3f}s before it could be processed")
+        self.deadline = deadline
+        self.late_by = late_by
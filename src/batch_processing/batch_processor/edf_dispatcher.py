@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import math
+import time
+from threading import Condition, Thread
+from typing import Any, Callable, List, Optional, Tuple
+from ..gen_mp_queue import GenMPQueue
+
+
+class EdfDispatcher:
+    """
+    Feeds ``in_queue`` earliest deadline first.
+
+    Items wait in a heap in the parent; a thread moves them to ``in_queue`` while it
+    holds fewer than ``window()`` items, about one per worker, so that an urgent item
+    put late only waits behind those. Items without a deadline go after every item
+    with one. Items whose deadline passes in the heap are never sent: they are
+    handed to ``on_expired`` instead, from the dispatcher thread.
+
+    What ``in_queue`` holds is what was sent minus what workers have ``taken()``
+    (Queue.qsize() is not implemented on macOS), so every item for these workers
+    must go through ``push``. The heap holds at most ``in_queue.maxsize`` items and
+    ``push`` blocks while it is full; with an unbounded ``in_queue`` (the default)
+    it never blocks, as ``put`` would not without EDF.
+    """
+
+    POLL_INTERVAL = 0.001
+
+    def __init__(
+        self,
+        in_queue: GenMPQueue[Any],
+        window: Callable[[], int],
+        taken: Callable[[], int],
+        on_expired: Callable[[Any, float], None],
+    ):
+        self.in_queue = in_queue
+        self.window = window
+        self.taken = taken
+        self.on_expired = on_expired
+        # Items put on in_queue, only written by the thread holding _cond
+        self.sent = 0
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._order = itertools.count()
+        self._cond = Condition()
+        self._running = False
+        # Once flushed, items are sent as they are pushed, until started again
+        self._flushed = False
+        self._thread: Optional[Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def waiting(self) -> int:
+        """Items sent that no worker has taken yet."""
+        return max(0, self.sent - self.taken())
+
+    def push(self, entry: Any, deadline: Optional[float]) -> None:
+        with self._cond:
+            while self._running and 0 < self.in_queue.maxsize <= len(self._heap):
+                self._cond.wait()
+            heapq.heappush(
+                self._heap, (math.inf if deadline is None else deadline, next(self._order), entry)
+            )
+            if self._flushed:
+                self._send(len(self._heap))
+            self._cond.notify_all()
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._flushed = False
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def flush(self) -> None:
+        """Stop pacing and send every waiting item now, still in deadline order, and the next ones as they come."""
+        self.stop()
+        with self._cond:
+            self._flushed = True
+            self._send(len(self._heap))
+
+    def _send(self, n: int) -> None:
+        now = time.monotonic()
+        while n > 0 and self._heap:
+            deadline, _, entry = heapq.heappop(self._heap)
+            if deadline < now:
+                self.on_expired(entry, deadline)
+                continue
+            self.in_queue.put(entry)
+            self.sent += 1
+            n -= 1
+        # Room for producers blocked on a full heap
+        self._cond.notify_all()
+
+    def _loop(self) -> None:
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                room = self.window() - self.waiting()
+                if room > 0:
+                    self._send(room)
+                else:
+                    # Workers take items without telling us, check again shortly
+                    self._cond.wait(self.POLL_INTERVAL)
@@ -1,6 +1,18 @@
-import traceback
+import hashlib
 from dataclasses import dataclass
-from typing import Any, Type
+from enum import Enum, auto
+from typing import Any, List, Optional, Set, Tuple, Type
+
+Frame = Tuple[str, int, str]
+
+
+class ErrorCapture(Enum):
+    FULL = auto()
+    """Formatted traceback for every error."""
+    COMPACT = auto()
+    """Frame list, formatted on demand, sent only for the first error of each signature."""
+    ID_ONLY = auto()
+    """Exception type, signature and task id only."""
 
 
 @dataclass
@@ -9,12 +21,83 @@ class ExceptionInfo:
     message: str
     tb: str
     item: Any
+    task_id: Optional[int] = None
+    attempts: int = 1
+    frames: Optional[List[Frame]] = None
+    signature: Optional[str] = None
 
     @classmethod
-    def from_exception(cls, exc: Exception, item: Any) -> "ExceptionInfo":
+    def from_exception(
+        cls,
+        exc: Exception,
+        item: Any,
+        task_id: Optional[int] = None,
+        attempts: int = 1,
+        capture: ErrorCapture = ErrorCapture.FULL,
+        include_item: bool = True,
+        seen: Optional[Set[str]] = None,
+    ) -> "ExceptionInfo":
+        """
+        Build the info for ``exc``, capturing as much detail as ``capture`` asks for.
+
+        ``seen`` holds the signatures already reported by this worker: in COMPACT mode
+        a repeated signature is sent without its frames.
+        """
+        # Imported on the first error, most runs never need it
+        import traceback
+
+        # Source lines are not read here, format_traceback() looks them up in the parent
+        frames = [
+            (f.filename, f.lineno, f.name)
+            for f in traceback.StackSummary.extract(
+                traceback.walk_tb(exc.__traceback__), lookup_lines=False
+            )
+        ]
+        signature = cls._signature(type(exc), frames)
+
+        tb = ""
+        if capture == ErrorCapture.FULL:
+            tb = traceback.format_exc()
+            frames = None
+        elif capture == ErrorCapture.ID_ONLY or (seen is not None and signature in seen):
+            frames = None
+        if seen is not None:
+            seen.add(signature)
+
         return cls(
             exc_type=type(exc),
-            message=str(exc),
-            tb=traceback.format_exc(),
-            item=item,
-        )
\ No newline at end of file
+            message="" if capture == ErrorCapture.ID_ONLY else str(exc),
+            tb=tb,
+            item=item if include_item else None,
+            task_id=task_id,
+            attempts=attempts,
+            frames=frames,
+            signature=signature,
+        )
+
+    @staticmethod
+    def _signature(exc_type: Type[BaseException], frames: List[Frame]) -> str:
+        key = repr((exc_type.__module__, exc_type.__qualname__, frames)).encode()
+        return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+    def format_traceback(self) -> str:
+        if self.tb or not self.frames:
+            return self.tb
+        import traceback
+
+        summary = traceback.StackSummary.from_list(
+            [traceback.FrameSummary(filename, lineno, name) for filename, lineno, name in self.frames]
+        )
+        return (
+            "Traceback (most recent call last):\n"
+            + "".join(summary.format())
+            + f"{self.exc_type.__name__}: {self.message}\n"
+        )
+
+
+@dataclass
+class ErrorGroup:
+    """Errors sharing a signature: the most detailed info received and how many occurred."""
+
+    info: ExceptionInfo
+    count: int = 1
@@ -1,14 +1,22 @@
-from typing import Callable, TypeVar, Optional
+from typing import Any, Callable, Dict, Hashable, TypeVar, Optional
 from .batch_processor import BatchProcessor, BatchProcessor
 from .batch_worker import BatchWorkerExecutor, IBatchWorker
 from .context import BatchProcessorContext
-from .configuration import BatchProcessorConfig, ProcessorConfig
+from .configuration import BatchProcessorConfig, ProcessorConfig, RetryPolicy
+from .exception_info import ErrorCapture
+from .profiling import ProfileChannel
+from .speculation import ServiceTimes
+from .tracing import Tracer
 from ..context import ControlContext
 from ..monitor.factory import MonitorFactory
 from ..monitor.monitor import IWorkerMonitor
 from ..monitor.configuration import MonitorConfig
+from ..worker_pool.affinity import Affinity
+from ..worker_pool.autotune import AutoTune
 from ..worker_pool.factory import WorkerPoolFactory
-from ..configuration import SharedConfig
+from ..worker_pool.resource_limits import ResourceLimit
+from ..configuration import FailurePolicy, SharedConfig
+from ..gen_mp_queue import GenMPQueue
 
 I = TypeVar("I")
 O = TypeVar("O")
@@ -27,11 +35,37 @@ class BatchProcessorFactory:
         self.worker_pool_factory = WorkerPoolFactory()
         self.monitor_factory = MonitorFactory()
 
+    @staticmethod
+    def _processor_config(
+        config: BatchProcessorConfig, shared_config: SharedConfig
+    ) -> ProcessorConfig:
+        return ProcessorConfig(
+            shared=shared_config,
+            on_worker_exception=config.on_worker_exception,
+            retry_policy=config.retry_policy,
+            track_tasks=config.tracks_tasks(),
+            max_redeliveries=config.max_redeliveries,
+            cache_size=config.cache_size,
+            cache_ttl=config.cache_ttl,
+            shared_cache_path=config.shared_cache_path,
+            key_fn=config.key_fn,
+            coalesce=config.coalesce,
+            error_capture=config.error_capture,
+            error_include_item=config.error_include_item,
+            max_items_per_worker=config.max_items_per_worker,
+            max_rss_per_worker=config.max_rss_per_worker,
+            edf=config.edf,
+            speculation=config.speculation,
+        )
+
     def create(
         self,
         n_workers: int,
         worker_factory: Callable[[], IBatchWorker[I, O]],
         config: BatchProcessorConfig,
+        control_ctx: Optional[ControlContext] = None,
+        in_queue: Optional[GenMPQueue[I]] = None,
+        out_queue: Optional[GenMPQueue[O]] = None,
     ) -> BatchProcessor[I, O]:
         """
         Create a complete BatchProcessor from scratch.
@@ -43,22 +77,37 @@ class BatchProcessorFactory:
             n_workers (int): Number of worker processes.
             worker_factory (Callable[[], IBatchWorker[I, O]]): Factory for worker instances.
             config (BatchProcessorConfig): Configuration for the batch processor.
+            control_ctx (Optional[ControlContext]): Control events shared with other processors.
+                Defaults to a new context.
+            in_queue (Optional[GenMPQueue[I]]): Queue the workers read items from. Defaults to a
+                new unbounded queue.
+            out_queue (Optional[GenMPQueue[O]]): Queue the workers write results to. Defaults to a
+                new unbounded queue.
 
         Returns:
             IBatchProcessor[I, O]: A fully configured batch processor.
         """
         shared_config = SharedConfig(logging=config.logging)
-        processor_config = ProcessorConfig(
-            shared=shared_config, on_worker_exception=config.on_worker_exception
-        )
+        processor_config = self._processor_config(config, shared_config)
+        # Markers are echoed for drain(), which only reads a queue this processor owns
+        processor_config.echo_end_of_stream = out_queue is None
+        # Restarting a crashed worker does not bring back the item it held: tracked, the
+        # item is requeued or reported instead of never settling. Only possible while the
+        # parent reads every result
+        if config.on_worker_death == FailurePolicy.RESTART and out_queue is None:
+            processor_config.track_tasks = True
         monitor_config = MonitorConfig(
             shared=shared_config,
             on_worker_death=config.on_worker_death,
             worker_monitoring_frequency=config.worker_monitoring_frequency,
+            item_timeout=config.item_timeout,
+            autotune=config.autotune,
         )
 
-        control_ctx = ControlContext()
-        processor_ctx = BatchProcessorContext[I, O](processor_config, control_ctx)
+        control_ctx = control_ctx or ControlContext()
+        processor_ctx = BatchProcessorContext[I, O](
+            processor_config, control_ctx, in_queue, out_queue
+        )
 
         def executor_factory():
             return BatchWorkerExecutor[I, O](processor_ctx, worker_factory)
@@ -67,8 +116,19 @@ class BatchProcessorFactory:
             n_workers=n_workers,
             worker_factory=executor_factory,
             worker_timeout=config.worker_timeout,
+            startup_timeout=config.startup_timeout,
+            affinity=config.affinity,
+            max_workers=config.autotune.upper_bound() if config.autotune else None,
+            resource_limits=config.resource_limits,
         )
 
+        # Workers find these on the context when they start, after this
+        processor_ctx.profile_channel = ProfileChannel(len(pool.slots))
+        if config.trace is not None:
+            processor_ctx.tracer = Tracer(len(pool.slots), config.trace)
+        if config.speculation is not None:
+            processor_ctx.service_times = ServiceTimes(len(pool.slots))
+
         monitor = self.monitor_factory.create_with_shared_control_context(
             pool, monitor_config, control_ctx
         )
@@ -96,11 +156,18 @@ class BatchProcessorFactory:
 
         Returns:
             IBatchProcessor[I, O]: A batch processor using the provided components.
+
+        Raises:
+            ValueError: If config sets item_timeout, which the monitor enforces and an
+                existing monitor was not configured with.
         """
+        if config.item_timeout is not None:
+            raise ValueError("item_timeout is enforced by the monitor, configure it on the existing monitor")
+
         shared_config = SharedConfig(logging=config.logging)
-        processor_config = ProcessorConfig(
-            shared=shared_config, on_worker_exception=config.on_worker_exception
-        )
+        processor_config = self._processor_config(config, shared_config)
+        if config.on_worker_death == FailurePolicy.RESTART:
+            processor_config.track_tasks = True
 
         control_ctx = ControlContext()
         processor_ctx = BatchProcessorContext[I, O](processor_config, control_ctx)
@@ -112,7 +179,16 @@ class BatchProcessorFactory:
             n_workers=n_workers,
             worker_factory=executor_factory,
             worker_timeout=config.worker_timeout,
+            startup_timeout=config.startup_timeout,
+            affinity=config.affinity,
+            max_workers=config.autotune.upper_bound() if config.autotune else None,
+            resource_limits=config.resource_limits,
         )
+        processor_ctx.profile_channel = ProfileChannel(len(pool.slots))
+        if config.trace is not None:
+            processor_ctx.tracer = Tracer(len(pool.slots), config.trace)
+        if config.speculation is not None:
+            processor_ctx.service_times = ServiceTimes(len(pool.slots))
 
         return BatchProcessor[I, O](pool, monitor, processor_ctx)
 
@@ -125,6 +201,22 @@ class BatchProcessorFactory:
         worker_monitoring_frequency: float = 1.0,
         logging: bool = True,
         worker_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        item_timeout: Optional[float] = None,
+        max_redeliveries: Optional[int] = None,
+        startup_timeout: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        shared_cache_path: Optional[str] = None,
+        key_fn: Optional[Callable[[Any], Hashable]] = None,
+        coalesce: bool = False,
+        error_capture: str = "FULL",
+        error_include_item: bool = True,
+        affinity: Optional[str] = None,
+        max_items_per_worker: Optional[int] = None,
+        max_rss_per_worker: Optional[int] = None,
+        autotune: bool = False,
+        resource_limits: Optional[Dict[str, ResourceLimit]] = None,
     ) -> BatchProcessor[I, O]:
         """
         Create a BatchProcessor with default settings.
@@ -135,22 +227,66 @@ class BatchProcessorFactory:
         Args:
             n_workers (int): Number of worker processes.
             worker_factory (Callable[[], IBatchWorker[I, O]]): Factory for worker instances.
-            on_worker_exception (str): Policy for worker exceptions ('IGNORE', 'ABORT'). Defaults to 'ABORT'.
+            on_worker_exception (str): Policy for worker exceptions ('IGNORE', 'ABORT', 'RETRY'). Defaults to 'ABORT'.
             on_worker_death (str): Policy for worker deaths ('IGNORE', 'ABORT', 'RESTART'). Defaults to 'RESTART'.
             worker_monitoring_frequency (float): Monitoring frequency in seconds. Defaults to 1.0.
             logging (bool): Enable logging. Defaults to True.
             worker_timeout (float): Timeout for workers. Defaults to None.
+            retry_policy (Optional[RetryPolicy]): Retry settings used with the 'RETRY' policy. Defaults to RetryPolicy().
+            item_timeout (Optional[float]): Seconds a worker may spend on one item before it is killed
+                and replaced. Defaults to None (no limit).
+            max_redeliveries (Optional[int]): How many times an item held by a worker that died or
+                timed out is requeued before it is reported as failed. Defaults to None (no recovery).
+            startup_timeout (Optional[float]): If set, start() waits for every worker to finish
+                initialising, up to this many seconds. Defaults to None.
+            cache_size (Optional[int]): Size of the parent-side result cache; repeated items are
+                answered from it without being sent to a worker. Defaults to None (no cache).
+            cache_ttl (Optional[float]): Seconds a cached result stays valid. Defaults to None.
+            shared_cache_path (Optional[str]): SQLite file used as a result cache shared by all
+                workers. Defaults to None.
+            key_fn (Optional[Callable[[Any], Hashable]]): Maps an item to its cache and coalescing
+                key. Defaults to the item itself.
+            coalesce (bool): Submit an item only once while an item with the same key is in
+                flight; every submitter receives the result. Defaults to False.
+            error_capture (str): Detail captured for worker exceptions ('FULL', 'COMPACT', 'ID_ONLY').
+                Defaults to 'FULL'.
+            error_include_item (bool): Send the failed item back with its error. Defaults to True.
+            affinity (Optional[str]): Pin workers per CPU ('CORE') or per NUMA node ('NUMA').
+                Defaults to None.
+            max_items_per_worker (Optional[int]): Replace a worker after it has processed this many
+                items. Defaults to None.
+            max_rss_per_worker (Optional[int]): Replace a worker once its resident memory reaches
+                this many bytes. Defaults to None.
+            autotune (bool): Adjust the number of active workers to the throughput measured while
+                running, starting from n_workers and up to os.cpu_count(). Defaults to False.
+            resource_limits (Optional[Dict[str, ResourceLimit]]): Rate and concurrency limits per
+                resource name, shared by all workers and held around work() for the names in the
+                worker's ``resources``. Defaults to None.
 
         Returns:
             IBatchProcessor[I, O]: A batch processor with default configurations.
         """
-        from .configuration import FailurePolicy
-
         config = BatchProcessorConfig(
             on_worker_exception=FailurePolicy[on_worker_exception],
             on_worker_death=FailurePolicy[on_worker_death],
             worker_monitoring_frequency=worker_monitoring_frequency,
             logging=logging,
             worker_timeout=worker_timeout,
+            retry_policy=retry_policy or RetryPolicy(),
+            item_timeout=item_timeout,
+            max_redeliveries=max_redeliveries,
+            startup_timeout=startup_timeout,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            shared_cache_path=shared_cache_path,
+            key_fn=key_fn,
+            coalesce=coalesce,
+            error_capture=ErrorCapture[error_capture],
+            error_include_item=error_include_item,
+            affinity=Affinity[affinity] if affinity else None,
+            max_items_per_worker=max_items_per_worker,
+            max_rss_per_worker=max_rss_per_worker,
+            autotune=AutoTune() if autotune else None,
+            resource_limits=resource_limits or {},
         )
         return self.create(n_workers, worker_factory, config)
@@ -0,0 +1,220 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from enum import IntEnum
+from multiprocessing.sharedctypes import RawArray
+from queue import Empty
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+from ..gen_mp_queue import GenMPQueue
+
+# Only imported once a profile is asked for
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+
+
+class ProfileMode(IntEnum):
+    NONE = 0
+    CPROFILE = 1  # Deterministic, every call in the worker's main thread
+    SAMPLE = 2  # Stack samples of the main thread, taken from a helper thread
+
+
+class ProfileReport(NamedTuple):
+    slot: int
+    request: int
+    pid: int
+    mode: ProfileMode
+    stats: Optional[Dict[Any, Any]]  # cProfile's raw stats
+    stacks: Optional[Dict[str, int]]  # Collapsed stack -> samples
+
+
+class _RawStats:
+    # What pstats.Stats loads a profile from
+    def __init__(self, stats: Dict[Any, Any]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class ProfileResult:
+    """Profiles of several workers, merged."""
+
+    def __init__(self, reports: List[ProfileReport]):
+        self.reports = reports
+        self.stacks: Counter = Counter()
+        for report in reports:
+            if report.stacks:
+                self.stacks.update(report.stacks)
+
+    @property
+    def pids(self) -> List[int]:
+        return [report.pid for report in self.reports]
+
+    def stats(self) -> Optional["pstats.Stats"]:
+        """The cProfile stats of every worker added up, None if none ran cProfile."""
+        import pstats
+
+        profiles = [report.stats for report in self.reports if report.stats is not None]
+        if not profiles:
+            return None
+        merged = pstats.Stats(_RawStats(profiles[0]))
+        for stats in profiles[1:]:
+            merged.add(pstats.Stats(_RawStats(stats)))
+        return merged
+
+    def collapsed(self) -> str:
+        """Sampled stacks in collapsed format (``outer;inner count``), e.g. for flamegraph.pl."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump_stats(self, path: str) -> None:
+        stats = self.stats()
+        if stats is None:
+            raise ValueError("No worker ran cProfile")
+        stats.dump_stats(path)
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+
+class ProfileChannel:
+    """
+    Profiling requests from the parent to worker slots, and the workers' reports back.
+
+    The parent writes a request (mode, duration, sampling interval) for a slot and
+    bumps its request number; the worker in the slot notices the new number between
+    items, acknowledges it and profiles for ``duration`` seconds. Requests and
+    acknowledgements each have a single writer, the parent and the worker.
+    """
+
+    def __init__(self, n_slots: int):
+        self._request = RawArray("q", n_slots)
+        self._acked = RawArray("q", n_slots)
+        self._mode = RawArray("b", n_slots)
+        self._duration = RawArray("d", n_slots)
+        self._interval = RawArray("d", n_slots)
+        self._next_request = 0
+        self.reports = GenMPQueue[ProfileReport]()
+
+    def __len__(self) -> int:
+        return len(self._request)
+
+    def request(self, slots: Iterable[int], mode: ProfileMode, duration: float, interval: float) -> int:
+        self._next_request += 1
+        for slot in slots:
+            self._mode[slot] = mode
+            self._duration[slot] = duration
+            self._interval[slot] = interval
+            # Last, so a worker never sees the number without the parameters
+            self._request[slot] = self._next_request
+        return self._next_request
+
+    def cancel(self, slots: Iterable[int]) -> None:
+        """Withdraw requests not picked up yet."""
+        self.request(slots, ProfileMode.NONE, 0.0, 0.0)
+
+    def acked(self, slot: int) -> int:
+        return self._acked[slot]
+
+
+class WorkerProfiler:
+    """Worker side of a ProfileChannel, polled by the executor between items."""
+
+    def __init__(self, channel: ProfileChannel, slot: int):
+        self.channel = channel
+        self.slot = slot
+        # Requests are always answered or cancelled, one still unacknowledged was made
+        # while this worker was starting up and is its to pick up
+        self._seen = channel._acked[slot]
+        self._profile: Optional["cProfile.Profile"] = None
+        self._request = 0
+        self._deadline = 0.0
+
+    def poll(self) -> None:
+        if self._profile is not None and time.monotonic() >= self._deadline:
+            self._finish_cprofile()
+        request = self.channel._request[self.slot]
+        if request == self._seen:
+            return
+        self._seen = request
+        self.channel._acked[self.slot] = request
+        mode = ProfileMode(self.channel._mode[self.slot])
+        duration = self.channel._duration[self.slot]
+        if mode == ProfileMode.CPROFILE and self._profile is None:
+            import cProfile
+
+            self._request = request
+            self._deadline = time.monotonic() + duration
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif mode == ProfileMode.SAMPLE:
+            # Stacks start at the caller, the frames below it were inherited from the parent
+            root = sys._getframe(1)
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(request, threading.get_ident(), root, duration, self.channel._interval[self.slot]),
+                daemon=True,
+            )
+            sampler.start()
+
+    def _finish_cprofile(self) -> None:
+        self._profile.disable()
+        self._profile.create_stats()
+        report = ProfileReport(
+            self.slot, self._request, os.getpid(), ProfileMode.CPROFILE, self._profile.stats, None
+        )
+        self._profile = None
+        self.channel.reports.put_sync(report)
+
+    def _sample(self, request: int, thread_id: int, root: Any, duration: float, interval: float) -> None:
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = None if frame is root else frame.f_back
+            if stack:
+                stacks[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+        report = ProfileReport(self.slot, request, os.getpid(), ProfileMode.SAMPLE, None, dict(stacks))
+        self.channel.reports.put_sync(report)
+
+
+def collect_reports(
+    channel: ProfileChannel,
+    slots: List[int],
+    request: int,
+    duration: float,
+    timeout: float,
+    idle: Callable[[], None],
+) -> List[ProfileReport]:
+    """
+    Wait for the reports of a request from every slot that acknowledged it.
+
+    Slots that have not acknowledged it once the profiling time is over are given
+    up on. ``idle`` is called while waiting, e.g. to keep reading results.
+    """
+    started = time.monotonic()
+    reports: Dict[int, ProfileReport] = {}
+    while True:
+        now = time.monotonic()
+        if now - started >= duration:
+            expected = [slot for slot in slots if channel.acked(slot) == request]
+            if all(slot in reports for slot in expected) or now - started >= duration + timeout:
+                break
+        try:
+            report = channel.reports.get(timeout=0.05)
+        except Empty:
+            idle()
+            continue
+        if report.request == request:
+            reports[report.slot] = report
+        idle()
+    channel.cancel(slots)
+    return list(reports.values())
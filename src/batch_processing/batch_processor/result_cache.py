@@ -0,0 +1,108 @@
+import hashlib
+import os
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable, Optional, Tuple
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+class IResultCache(ABC):
+    @abstractmethod
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return ``(True, result)`` on a hit and ``(False, None)`` on a miss."""
+        pass
+
+    @abstractmethod
+    def put(self, key: Hashable, result: Any) -> None:
+        pass
+
+
+class LRUResultCache(IResultCache):
+    """In-process cache bounded by entry count, with optional expiry after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, result
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: Hashable, result: Any) -> None:
+        expires_at = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class SqliteResultCache(IResultCache):
+    """
+    On-disk cache shared by every worker process, and by later runs.
+
+    Keys are hashed from their pickled form and results are stored pickled. Each
+    process opens its own connection on first use, so an instance can be created
+    in the parent and inherited or pickled to workers.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        self.path = os.fspath(path)
+        self.ttl = ttl
+        self._conn: Optional["sqlite3.Connection"] = None
+        self._pid: Optional[int] = None
+
+    def __getstate__(self):
+        # Connections cannot be pickled, the receiving process opens its own
+        return {**self.__dict__, "_conn": None, "_pid": None}
+
+    def _connection(self) -> "sqlite3.Connection":
+        if self._conn is None or self._pid != os.getpid():
+            import sqlite3
+
+            self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key BLOB PRIMARY KEY, expires_at REAL, result BLOB)"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _digest(key: Hashable) -> bytes:
+        return hashlib.blake2b(pickle.dumps(key), digest_size=20).digest()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        row = self._connection().execute(
+            "SELECT result FROM results WHERE key = ? AND expires_at >= ?",
+            (self._digest(key), time.time()),
+        ).fetchone()
+        if row is None:
+            return False, None
+        return True, pickle.loads(row[0])
+
+    def put(self, key: Hashable, result: Any) -> None:
+        expires_at = float("inf") if self.ttl is None else time.time() + self.ttl
+        self._connection().execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+            (self._digest(key), expires_at, pickle.dumps(result, pickle.HIGHEST_PROTOCOL)),
+        )
@@ -0,0 +1,81 @@
+import math
+from dataclasses import dataclass
+from multiprocessing.sharedctypes import RawArray
+from typing import List, Optional
+
+
+@dataclass
+class SpeculationConfig:
+    """
+    Speculative re-execution of stragglers, see BatchProcessor.speculate.
+
+    A tracked item in flight for longer than the ``quantile`` of the service times
+    measured so far gets a second copy on an idle worker, once ``min_samples`` items
+    have been measured. The first result settles the item, an error only once both
+    copies have failed. With ``cancel_losers``, the worker still on the other copy is
+    killed and replaced. Items must therefore be safe to process twice.
+    """
+
+    quantile: float = 0.95
+    min_samples: int = 20
+    interval: float = 0.05  # Seconds between checks for stragglers
+    cancel_losers: bool = True
+
+
+class ServiceTimes:
+    """
+    Histogram of item service times in shared memory, one row per worker slot.
+
+    Buckets are logarithmic, four per power of two from about a microsecond to over an
+    hour, so quantiles are accurate to within a bucket (about 12%). Like the SlotTable,
+    every row has a single writer and no lock is needed.
+    """
+
+    SUB_BUCKETS = 4
+    MIN_EXP = -20
+    N_BUCKETS = 33 * SUB_BUCKETS
+
+    def __init__(self, n_slots: int):
+        # Last row for executors not bound to a slot
+        self._n_slots = n_slots
+        self._counts = RawArray("q", (n_slots + 1) * self.N_BUCKETS)
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= 0:
+            return 0
+        mantissa, exp = math.frexp(seconds)  # seconds = mantissa * 2**exp, 0.5 <= mantissa < 1
+        bucket = (exp - self.MIN_EXP) * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        return min(max(bucket, 0), self.N_BUCKETS - 1)
+
+    def _upper_bound(self, bucket: int) -> float:
+        exp, sub = divmod(bucket, self.SUB_BUCKETS)
+        return (0.5 + (sub + 1) / (2 * self.SUB_BUCKETS)) * 2.0 ** (exp + self.MIN_EXP)
+
+    def record(self, slot: int, seconds: float) -> None:
+        row = slot if slot >= 0 else self._n_slots
+        self._counts[row * self.N_BUCKETS + self._bucket(seconds)] += 1
+
+    def totals(self) -> List[int]:
+        counts = [0] * self.N_BUCKETS
+        for row in range(self._n_slots + 1):
+            at = row * self.N_BUCKETS
+            for bucket, count in enumerate(self._counts[at:at + self.N_BUCKETS]):
+                counts[bucket] += count
+        return counts
+
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def quantile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile, None with fewer samples."""
+        counts = self.totals()
+        total = sum(counts)
+        if total < max(1, min_samples):
+            return None
+        target = q * total
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= target and count:
+                return self._upper_bound(bucket)
+        return self._upper_bound(self.N_BUCKETS - 1)
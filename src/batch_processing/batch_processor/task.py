@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+
+@dataclass
+class Task(Generic[I]):
+    """
+    Item tagged with an id so its result can be matched back by the producer.
+
+    Untracked items with a deadline are sent with no id, their result is not wrapped.
+    ``deadline`` is a ``time.monotonic()`` time after which the item is not worked on.
+    """
+
+    id: Optional[int]
+    item: I
+    deadline: Optional[float] = None
+
+
+@dataclass
+class TaskResult(Generic[O]):
+    id: int
+    result: O
+
+
+def unwrap(entry: Any) -> Tuple[List[int], Any]:
+    """Ids of the envelopes around an item or result, outermost first, and what they wrap."""
+    ids = []
+    while isinstance(entry, (Task, TaskResult)):
+        if isinstance(entry, Task):
+            if entry.id is not None:
+                ids.append(entry.id)
+            entry = entry.item
+        else:
+            ids.append(entry.id)
+            entry = entry.result
+    return ids, entry
+
+
+def wrap(ids: List[int], result: Any) -> Any:
+    """Wrap a result in the envelopes of its item, the inverse of ``unwrap``."""
+    for task_id in reversed(ids):
+        result = TaskResult(task_id, result)
+    return result
+
+
+class EndOfStream:
+    """Marker sent once per worker by ``BatchProcessor.drain``; workers echo it and exit."""
@@ -0,0 +1,127 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import IntEnum
+from multiprocessing.sharedctypes import RawArray
+from time import perf_counter_ns
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class Phase(IntEnum):
+    # Worker side
+    IN_QUEUE_GET = 0  # Waiting for an item
+    WORK = 1
+    OUT_QUEUE_PUT = 2  # Pickling and writing the result
+    # Parent side
+    PUT = 3
+    GET = 4
+    DRAIN = 5
+
+
+class ITraceHook(ABC):
+    """Callbacks around every traced phase, run in the process doing the work."""
+
+    @abstractmethod
+    def before(self, phase: Phase, task_id: Optional[int]) -> None:
+        pass
+
+    @abstractmethod
+    def after(self, phase: Phase, task_id: Optional[int], duration_ns: int) -> None:
+        pass
+
+
+@dataclass
+class TraceConfig:
+    capacity: int = 65536  # Events kept per worker slot, older ones are overwritten
+    hooks: List[ITraceHook] = field(default_factory=list)
+
+
+class TraceEvent(NamedTuple):
+    ring: int
+    phase: Phase
+    start_ns: int
+    end_ns: int
+    task_id: Optional[int]
+
+
+class Tracer:
+    """
+    Phase timings in shared-memory ring buffers, one per worker slot plus one for the parent.
+
+    Timestamps come from ``perf_counter_ns``, a system-wide monotonic clock on Linux,
+    so events from different processes line up. Like the SlotTable, every ring has a
+    single writer and no lock: an event read while being overwritten may be torn.
+    """
+
+    _FIELDS = 4
+    _NO_TASK = -1
+
+    def __init__(self, n_slots: int, config: TraceConfig):
+        self.capacity = config.capacity
+        self.hooks = config.hooks
+        self.parent_ring = n_slots
+        self._events = RawArray("q", (n_slots + 1) * self.capacity * self._FIELDS)
+        self._heads = RawArray("q", n_slots + 1)
+
+    def ring(self, slot: int) -> int:
+        # Executors not bound to a slot run in the parent, e.g. when called directly
+        return slot if slot >= 0 else self.parent_ring
+
+    def begin(self, phase: Phase, task_id: Optional[int] = None) -> int:
+        for hook in self.hooks:
+            hook.before(phase, task_id)
+        return perf_counter_ns()
+
+    def end(self, ring: int, phase: Phase, start_ns: int, task_id: Optional[int] = None) -> None:
+        end_ns = perf_counter_ns()
+        head = self._heads[ring]
+        at = (ring * self.capacity + head % self.capacity) * self._FIELDS
+        self._events[at:at + self._FIELDS] = [
+            phase, start_ns, end_ns, self._NO_TASK if task_id is None else task_id
+        ]
+        self._heads[ring] = head + 1
+        for hook in self.hooks:
+            hook.after(phase, task_id, end_ns - start_ns)
+
+    def events(self) -> List[TraceEvent]:
+        """Every event still in the rings, oldest first within each ring."""
+        events = []
+        for ring, head in enumerate(self._heads):
+            for i in range(max(0, head - self.capacity), head):
+                at = (ring * self.capacity + i % self.capacity) * self._FIELDS
+                phase, start_ns, end_ns, task_id = self._events[at:at + self._FIELDS]
+                events.append(TraceEvent(
+                    ring, Phase(phase), start_ns, end_ns, None if task_id == self._NO_TASK else task_id
+                ))
+        return events
+
+    def dropped(self) -> int:
+        """Events overwritten before they were read."""
+        return sum(max(0, head - self.capacity) for head in self._heads)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The events in Chrome trace-event format, one thread per worker slot."""
+        pid = os.getpid()
+        trace = []
+        rings = set()
+        for event in self.events():
+            rings.add(event.ring)
+            trace.append({
+                "name": event.phase.name.lower(),
+                "ph": "X",
+                "ts": event.start_ns / 1000,
+                "dur": (event.end_ns - event.start_ns) / 1000,
+                "pid": pid,
+                "tid": event.ring,
+                "args": {"task_id": event.task_id},
+            })
+        for ring in sorted(rings):
+            name = "parent" if ring == self.parent_ring else f"worker slot {ring}"
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": ring, "args": {"name": name}})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Write the trace to a JSON file for chrome://tracing or Perfetto."""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,21 @@
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .record_batch import ColumnBatch, RecordBatch
+    from .shared_columns import ColumnSpec, SharedColumns
+    from .columnar_worker import ColumnarBatchWorker, ColumnarSource, IColumnarWorker, concat_batches
+
+_EXPORTS = {
+    "ColumnBatch": ".record_batch",
+    "RecordBatch": ".record_batch",
+    "ColumnSpec": ".shared_columns",
+    "SharedColumns": ".shared_columns",
+    "ColumnarBatchWorker": ".columnar_worker",
+    "ColumnarSource": ".columnar_worker",
+    "IColumnarWorker": ".columnar_worker",
+    "concat_batches": ".columnar_worker",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,95 @@
+import array
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+from .record_batch import ColumnBatch, RecordBatch
+from .shared_columns import SharedColumns, as_buffer, numpy_or_none
+from ..batch_processor.batch_worker import IBatchWorker
+from ..input_source.input_source import IInputSource
+
+
+class IColumnarWorker(ABC):
+    @abstractmethod
+    def work_batch(self, columns: Dict[str, Any]) -> Mapping[str, Any]:
+        """Compute output columns, as long as the input ones, from a slice of the input columns."""
+        pass
+
+
+class ColumnarSource(IInputSource[RecordBatch]):
+    """Splits the rows of shared columns into record batches of ``batch_rows`` rows."""
+
+    def __init__(self, columns: SharedColumns, batch_rows: int = 65536):
+        if batch_rows <= 0:
+            raise ValueError("batch_rows must be positive")
+        self._n_rows = len(columns)
+        self._batch_rows = batch_rows
+
+    def __iter__(self) -> Iterator[RecordBatch]:
+        for start in range(0, self._n_rows, self._batch_rows):
+            yield RecordBatch(start, min(start + self._batch_rows, self._n_rows))
+
+    def __len__(self) -> int:
+        return -(-self._n_rows // self._batch_rows)
+
+
+def _owned(column: Any) -> Any:
+    # Memoryviews cannot be pickled, send their contents as an array
+    if not isinstance(column, memoryview):
+        return column
+    owned = array.array("B" if column.format == "?" else column.format)
+    owned.frombytes(column.cast("B"))
+    return owned
+
+
+class ColumnarBatchWorker(IBatchWorker[RecordBatch, Union[RecordBatch, ColumnBatch]]):
+    """
+    Worker that views a record batch's input columns in place and runs an inner columnar worker on them.
+
+    With ``outputs`` the columns computed are copied into that shared block at the
+    batch's rows and only the RecordBatch goes back; without it they are returned
+    in a ColumnBatch, see ``concat_batches``. ``names`` limits the input columns viewed.
+    """
+
+    def __init__(
+        self,
+        batch_worker: IColumnarWorker,
+        inputs: SharedColumns,
+        outputs: Optional[SharedColumns] = None,
+        names: Optional[Sequence[str]] = None,
+    ):
+        self._batch_worker = batch_worker
+        self._inputs = inputs
+        self._outputs = outputs
+        self._names = names
+
+    def work(self, item: RecordBatch) -> Union[RecordBatch, ColumnBatch]:
+        columns = self._inputs.views(item.start, item.stop, self._names)
+        result = self._batch_worker.work_batch(columns)
+        if self._outputs is None:
+            return ColumnBatch(item.start, item.stop, {name: _owned(column) for name, column in result.items()})
+
+        for name, column in result.items():
+            rows = len(as_buffer(column))
+            if rows != len(item):
+                raise ValueError(f"Output column {name!r} has {rows} rows for a batch of {len(item)}")
+            self._outputs.write(name, item.start, column)
+        return item
+
+
+def concat_batches(batches: Iterable[ColumnBatch]) -> Dict[str, Any]:
+    """Join returned batches back into whole columns, in row order whatever order they came in."""
+    ordered: List[ColumnBatch] = sorted(batches, key=lambda batch: batch.start)
+    if not ordered:
+        return {}
+    numpy = numpy_or_none()
+    joined = {}
+    for name in ordered[0].columns:
+        parts = [batch.columns[name] for batch in ordered]
+        if numpy is not None and all(isinstance(part, numpy.ndarray) for part in parts):
+            joined[name] = numpy.concatenate(parts)
+            continue
+        first = as_buffer(parts[0])
+        column = array.array("B" if first.format == "?" else first.format)
+        for part in parts:
+            column.frombytes(as_buffer(part).cast("B"))
+        joined[name] = column
+    return joined
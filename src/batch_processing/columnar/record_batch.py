@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class RecordBatch:
+    """Rows ``[start, stop)`` of shared columns, handed to a worker instead of the rows themselves."""
+
+    start: int
+    stop: int
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+
+@dataclass
+class ColumnBatch:
+    """Output columns computed for a record batch, returned by value."""
+
+    start: int
+    stop: int
+    columns: Dict[str, Any]
@@ -0,0 +1,176 @@
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+# Fixed-width formats a memoryview can be cast to
+FORMATS = "bBhHiIlLqQfd?"
+_ALIGN = 64
+# C long is an alias of int or long long, named after its size so they compare equal
+_ALIASES = {"l": "q", "L": "Q"} if struct.calcsize("l") == 8 else {"l": "i", "L": "I"}
+
+_numpy_module: Any = None
+
+
+def numpy_or_none():
+    """NumPy if it is installed, None otherwise; imported on first use only."""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+def _fixed_width(fmt: str) -> bool:
+    # A single code: "in" alone would also accept "" and runs such as "dq"
+    return len(fmt) == 1 and fmt in FORMATS
+
+
+def as_buffer(column: Any) -> memoryview:
+    """
+    A flat memoryview over a column, without copying it when possible.
+
+    Anything with the buffer protocol works (NumPy arrays, ``array.array``); Arrow
+    arrays and chunked arrays, and pandas series, go through their ``to_numpy()``.
+    """
+    try:
+        view = memoryview(column)
+    except TypeError:
+        if not hasattr(column, "to_numpy"):
+            raise TypeError(f"Column of type {type(column).__name__} has no buffer") from None
+        view = memoryview(column.to_numpy())
+    fmt = view.format.lstrip("@=" + ("<" if sys.byteorder == "little" else ">"))
+    fmt = _ALIASES.get(fmt, fmt)
+    if view.ndim != 1 or not view.c_contiguous or not _fixed_width(fmt):
+        raise ValueError(
+            f"Columns must be contiguous 1-D arrays of a fixed-width type, got format {view.format!r}"
+        )
+    return view.cast("B").cast(fmt) if view.format != fmt else view
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    format: str
+    itemsize: int
+    offset: int  # In bytes, from the start of the block
+
+
+class SharedColumns:
+    """
+    Columns of equal length laid out in one shared-memory block.
+
+    The parent copies the columns in once; workers then read any slice of them as
+    zero-copy views (see ``views``), NumPy arrays if NumPy is installed and typed
+    memoryviews otherwise. Blocks made with ``allocate`` are zero-filled and meant
+    for workers to write their output columns into.
+
+    Forked workers use the parent's mapping. The owner must ``unlink`` the block when
+    done with it; the mapping is released by ``close``.
+    """
+
+    def __init__(self, specs: List[ColumnSpec], n_rows: int, size: int, shm: Optional[SharedMemory] = None):
+        self.specs = {spec.name: spec for spec in specs}
+        self.n_rows = n_rows
+        self._size = size
+        # Only the process that created the block removes it
+        self._owner = shm is None
+        self._shm = shm if shm is not None else SharedMemory(create=True, size=max(1, size))
+        self._pid = os.getpid()
+
+    @classmethod
+    def allocate(cls, formats: Mapping[str, str], n_rows: int) -> "SharedColumns":
+        """Zero-filled columns, ``formats`` maps names to struct codes such as ``"d"`` or ``"q"``."""
+        specs, offset = [], 0
+        for name, fmt in formats.items():
+            if not _fixed_width(fmt):
+                raise ValueError(f"Unsupported column format {fmt!r}")
+            fmt = _ALIASES.get(fmt, fmt)
+            itemsize = memoryview(bytes(16)).cast(fmt).itemsize
+            specs.append(ColumnSpec(name, fmt, itemsize, offset))
+            # Aligned so every column can be viewed as a typed array
+            offset += -(-itemsize * n_rows // _ALIGN) * _ALIGN
+        return cls(specs, n_rows, offset)
+
+    @classmethod
+    def from_arrays(cls, columns: Mapping[str, Any]) -> "SharedColumns":
+        """Copy columns (NumPy, Arrow, ``array.array``...) into a new shared block."""
+        buffers = {name: as_buffer(column) for name, column in columns.items()}
+        lengths = {len(buffer) for buffer in buffers.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns must have the same length, got {sorted(lengths)}")
+        n_rows = lengths.pop() if lengths else 0
+        shared = cls.allocate({name: buffer.format for name, buffer in buffers.items()}, n_rows)
+        for name, buffer in buffers.items():
+            spec = shared.specs[name]
+            shared._shm.buf[spec.offset:spec.offset + buffer.nbytes] = buffer.cast("B")
+        return shared
+
+    @classmethod
+    def from_table(cls, table: Any) -> "SharedColumns":
+        """Copy the columns of an Arrow table (anything with ``column_names`` and ``column``)."""
+        return cls.from_arrays({name: table.column(name) for name in table.column_names})
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getstate__(self):
+        # Only sent to processes that were not forked from the owner
+        return {"specs": list(self.specs.values()), "n_rows": self.n_rows, "size": self._size, "name": self._shm.name}
+
+    def __setstate__(self, state) -> None:
+        # Child processes share the owner's resource tracker, attaching registers nothing new
+        shm = SharedMemory(name=state["name"])
+        self.__init__(state["specs"], state["n_rows"], state["size"], shm)
+
+    def view(self, name: str, start: int = 0, stop: Optional[int] = None, writable: bool = False) -> Any:
+        """
+        Zero-copy view of rows ``[start, stop)`` of a column.
+
+        Views are read-only unless ``writable``: they share memory with every worker,
+        a writable one is for filling an output column in place.
+        """
+        spec = self.specs[name]
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        start = min(max(start, 0), stop)
+        numpy = numpy_or_none()
+        if numpy is not None:
+            column = numpy.frombuffer(
+                self._shm.buf, dtype=numpy.dtype(spec.format), count=stop - start,
+                offset=spec.offset + start * spec.itemsize,
+            )
+            column.flags.writeable = writable
+            return column
+        begin = spec.offset + start * spec.itemsize
+        column = self._shm.buf[begin:begin + (stop - start) * spec.itemsize].cast(spec.format)
+        return column if writable else column.toreadonly()
+
+    def views(self, start: int = 0, stop: Optional[int] = None, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return {name: self.view(name, start, stop) for name in (names or self.specs)}
+
+    def write(self, name: str, start: int, values: Any) -> None:
+        """Copy ``values`` into a column from row ``start`` on."""
+        spec = self.specs[name]
+        buffer = as_buffer(values)
+        if buffer.format != spec.format:
+            raise ValueError(f"Column {name!r} holds {spec.format!r} values, got {buffer.format!r}")
+        if start < 0 or start + len(buffer) > self.n_rows:
+            raise IndexError(f"Rows {start}..{start + len(buffer)} out of range for {self.n_rows} rows")
+        begin = spec.offset + start * spec.itemsize
+        self._shm.buf[begin:begin + buffer.nbytes] = buffer.cast("B")
+
+    def column(self, name: str) -> Any:
+        """A whole column as a view, see ``view``."""
+        return self.view(name)
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        if self._owner and os.getpid() == self._pid:
+            self._shm.unlink()
@@ -7,6 +7,7 @@ class FailurePolicy(Enum):
     IGNORE = auto()
     ABORT = auto()
     RESTART = auto()
+    RETRY = auto()
 
 
 @dataclass
@@ -1,9 +1,94 @@
-from multiprocessing import Event
+import os
+from multiprocessing import Event, Lock
+from multiprocessing.reduction import ForkingPickler
+from multiprocessing.sharedctypes import RawArray, RawValue
 from typing import Optional
 
 
+class SharedFlag:
+    """
+    A multiprocessing Event whose ``is_set`` is a plain read of a shared byte.
+
+    Event.is_set takes the Event's lock on every call, too much for a check made
+    on every item. The Event is kept for ``wait``, which needs to block.
+    """
+
+    def __init__(self, flags, index: int):
+        self._flags = flags
+        self._index = index
+        self._event = Event()
+
+    def is_set(self) -> bool:
+        return self._flags[self._index] != 0
+
+    def set(self) -> None:
+        self._flags[self._index] = 1
+        self._event.set()
+
+    def clear(self) -> None:
+        self._flags[self._index] = 0
+        self._event.clear()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._flags[self._index]:
+            return True
+        self._event.wait(timeout)
+        return self.is_set()
+
+
 class ControlContext:
-    def __init__(self):
-        self.stop_event = Event()
-        self.abort_event = Event()
-        self.fatal_exception: Optional[Exception] = None
+    """
+    Control state shared by the parent, its monitor threads and the worker processes.
+
+    ``fatal_exception`` is kept pickled in shared memory, so one set in a worker is
+    seen by the parent. Exceptions that cannot be pickled, or whose pickle exceeds
+    ``max_exception_size`` bytes, are replaced by a RuntimeError with their message.
+    """
+
+    STOP, ABORT = 0, 1
+
+    def __init__(self, max_exception_size: int = 65536):
+        self.flags = RawArray("b", 2)
+        self.stop_event = SharedFlag(self.flags, self.STOP)
+        self.abort_event = SharedFlag(self.flags, self.ABORT)
+        self._exception = RawArray("c", max_exception_size)
+        self._exception_size = RawValue("q", 0)
+        self._exception_lock = Lock()
+        self._local = None
+        self._local_exception: Optional[Exception] = None
+
+    @property
+    def fatal_exception(self) -> Optional[Exception]:
+        with self._exception_lock:
+            size = self._exception_size.value
+            data = self._exception.raw[:size]
+        if not size:
+            return None
+        # The process that set it gets the same object back, others a copy
+        if self._local == (os.getpid(), data):
+            return self._local_exception
+        return ForkingPickler.loads(data)
+
+    @staticmethod
+    def _pickle(exc: Exception) -> bytes:
+        try:
+            data = bytes(ForkingPickler.dumps(exc))
+            ForkingPickler.loads(data)  # Custom __init__ signatures can break unpickling
+            return data
+        except Exception:
+            return b""
+
+    @fatal_exception.setter
+    def fatal_exception(self, exc: Optional[Exception]) -> None:
+        data = b""
+        if exc is not None:
+            data = self._pickle(exc)
+            if not data or len(data) > len(self._exception):
+                # Half the buffer leaves room for the pickle's own overhead
+                summary = f"{type(exc).__name__}: {exc}"[:len(self._exception) // 2]
+                data = self._pickle(RuntimeError(summary))
+        with self._exception_lock:
+            self._exception[:len(data)] = data
+            self._exception_size.value = len(data)
+        self._local = (os.getpid(), data)
+        self._local_exception = exc
@@ -0,0 +1,17 @@
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .dag import IDag, Dag
+    from .node import Node
+    from .factory import DagFactory
+
+_EXPORTS = {
+    "IDag": ".dag",
+    "Dag": ".dag",
+    "Node": ".node",
+    "DagFactory": ".factory",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
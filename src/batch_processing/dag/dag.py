@@ -0,0 +1,234 @@
+from abc import abstractmethod
+from collections import deque
+from contextlib import AbstractContextManager
+from multiprocessing.reduction import ForkingPickler
+from queue import Empty, Full
+from typing import Any, Deque, Dict, Generic, List, Set, Tuple, TypeVar
+from ..batch_processor.batch_processor import BatchProcessor
+from ..batch_processor.exception_info import ExceptionInfo
+from ..batch_processor.task import Task, TaskResult
+from ..gen_mp_queue import GenMPQueue
+
+I = TypeVar("I")
+
+DagResult = Tuple[int, Dict[str, Any]]
+
+
+class IDag(Generic[I], AbstractContextManager):
+    @abstractmethod
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def stop(self, drain: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def drain(self) -> List[DagResult]:
+        pass
+
+    @abstractmethod
+    def poll_exceptions(self) -> List[ExceptionInfo]:
+        pass
+
+    @abstractmethod
+    def put(self, item: I) -> int:
+        pass
+
+    @abstractmethod
+    def get_nowait(self) -> DagResult:
+        pass
+
+    @abstractmethod
+    def get(self) -> DagResult:
+        pass
+
+
+class Dag(IDag[I]):
+    """
+    Batch processors connected as a DAG, with items tracked by correlation id.
+
+    ``put`` returns the item's correlation id and ``get`` returns ``(id, outputs)``,
+    where outputs maps every sink node (one no other node runs after) to its result.
+    Edges into a node with a single predecessor go worker to worker; the parent only
+    joins the inputs of nodes with several predecessors and collects sink results.
+    At most ``max_in_flight`` items are in the DAG at once, which bounds the join
+    buffers; ``put`` blocks beyond that.
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, BatchProcessor[Any, Any]],
+        preds: Dict[str, Tuple[str, ...]],
+        collectors: Dict[str, GenMPQueue[TaskResult[Any]]],
+        max_in_flight: int,
+    ):
+        self.nodes = nodes
+        self.max_in_flight = max_in_flight
+        self._preds = preds
+        self._collectors = collectors
+        self._sources = {queue: name for name, queue in collectors.items()}
+        self._roots = [nodes[name].ctx.in_queue for name, p in preds.items() if not p]
+        self._sinks = {name for name in nodes if not any(name in p for p in preds.values())}
+        self._joins_after = {
+            name: [join for join, p in preds.items() if len(p) > 1 and name in p]
+            for name in nodes
+        }
+        self._control = next(iter(nodes.values())).ctx.control_ctx
+        self._next_id = 0
+        self._in_flight: Set[int] = set()
+        # Partial inputs of join nodes and partial sink outputs, per correlation id
+        self._join_parts: Dict[str, Dict[int, Dict[str, Any]]] = {join: {} for join in preds}
+        self._outputs: Dict[int, Dict[str, Any]] = {}
+        self._ready: Deque[DagResult] = deque()
+        self._reported: List[ExceptionInfo] = []
+        # Pickled items waiting for room in a full input queue, at most max_in_flight per queue
+        self._backlog: Dict[GenMPQueue[Any], Deque[bytes]] = {}
+
+    def start(self) -> None:
+        # Nodes are in topological order, start consumers first
+        for node in reversed(list(self.nodes.values())):
+            node.start()
+
+    def stop(self, drain: bool = False) -> None:
+        if drain:
+            self._ready.extend(self.drain())
+            return
+        self._shutdown()
+
+    def drain(self) -> List[DagResult]:
+        """Wait until every item put so far has completed or failed, then stop."""
+        while self._in_flight:
+            self._check_abort()
+            self._collect(0.1)
+        results = list(self._ready)
+        self._ready.clear()
+        self._shutdown()
+        return results
+
+    def _shutdown(self) -> None:
+        self._control.stop_event.set()
+        fatal = None
+        for node in self.nodes.values():
+            try:
+                node.stop()
+            except Exception as exc:
+                fatal = fatal or exc
+        if fatal:
+            raise fatal
+
+    def _check_abort(self) -> None:
+        if self._control.abort_event.is_set():
+            self._shutdown()
+            raise RuntimeError("DAG aborted")
+
+    def _send(self, queue: GenMPQueue[Any], data: bytes) -> None:
+        self._backlog.setdefault(queue, deque()).append(data)
+        self._flush()
+
+    def _flush(self) -> None:
+        # Never block on a full queue: the workers behind it may be waiting for us to
+        # read their results. What does not fit is retried on the next collect.
+        for queue, pending in list(self._backlog.items()):
+            while pending:
+                try:
+                    queue.put_pickled(pending[0], block=False)
+                except Full:
+                    break
+                pending.popleft()
+            if not pending:
+                del self._backlog[queue]
+
+    def _collect(self, timeout: float) -> None:
+        """Route every result waiting for the parent, then handle node errors."""
+        self._flush()
+        ready = GenMPQueue.wait(list(self._collectors.values()), timeout)
+        for queue in ready:
+            name = self._sources[queue]
+            while True:
+                try:
+                    result = queue.get_nowait()
+                except Empty:
+                    break
+                self._route(name, result)
+
+        for node in self.nodes.values():
+            for info in node.poll_exceptions():
+                self._fail(info)
+            for lost in node.pool.lost_tasks():
+                self._fail(ExceptionInfo(
+                    exc_type=type(lost.error),
+                    message=str(lost.error),
+                    tb="",
+                    item=None,
+                    task_id=lost.task_id,
+                ))
+
+    def _route(self, name: str, result: TaskResult[Any]) -> None:
+        cid = result.id
+        if cid not in self._in_flight:
+            return  # The item already failed in another branch
+
+        for join in self._joins_after[name]:
+            parts = self._join_parts[join].setdefault(cid, {})
+            parts[name] = result.result
+            if len(parts) == len(self._preds[join]):
+                del self._join_parts[join][cid]
+                self._send(self.nodes[join].ctx.in_queue, ForkingPickler.dumps(Task(cid, parts)))
+
+        if name in self._sinks:
+            outputs = self._outputs.setdefault(cid, {})
+            outputs[name] = result.result
+            if len(outputs) == len(self._sinks):
+                del self._outputs[cid]
+                self._in_flight.discard(cid)
+                self._ready.append((cid, outputs))
+
+    def _fail(self, info: ExceptionInfo) -> None:
+        self._reported.append(info)
+        cid = info.task_id
+        if cid not in self._in_flight:
+            return
+        self._in_flight.discard(cid)
+        self._outputs.pop(cid, None)
+        for parts in self._join_parts.values():
+            parts.pop(cid, None)
+
+    def poll_exceptions(self) -> List[ExceptionInfo]:
+        self._collect(0)
+        infos, self._reported = self._reported, []
+        return infos
+
+    def put(self, item: I) -> int:
+        while len(self._in_flight) >= self.max_in_flight:
+            self._check_abort()
+            self._collect(0.1)
+
+        cid = self._next_id
+        self._next_id += 1
+        self._in_flight.add(cid)
+        # Pickled once for all root nodes
+        data = ForkingPickler.dumps(Task(cid, item))
+        for queue in self._roots:
+            self._send(queue, data)
+        return cid
+
+    def get(self) -> DagResult:
+        while not self._ready:
+            self._check_abort()
+            self._collect(0.1)
+        return self._ready.popleft()
+
+    def get_nowait(self) -> DagResult:
+        if not self._ready:
+            self._collect(0)
+        if not self._ready:
+            raise Empty
+        return self._ready.popleft()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
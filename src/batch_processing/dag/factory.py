@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Sequence
+from .dag import Dag
+from .node import Node
+from ..batch_processor.configuration import BatchProcessorConfig
+from ..batch_processor.factory import BatchProcessorFactory
+from ..configuration import FailurePolicy
+from ..context import ControlContext
+from ..gen_mp_queue import FanOutQueue, GenMPQueue
+
+
+class DagFactory:
+    """
+    Factory responsible for creating Dag instances.
+
+    It builds one BatchProcessor per node sharing a single ControlContext, and wires
+    each node's workers straight to the nodes that only run after it.
+    """
+
+    def __init__(self):
+        self.batch_processor_factory = BatchProcessorFactory()
+
+    @staticmethod
+    def _topological_order(nodes: Sequence[Node]) -> List[Node]:
+        by_name: Dict[str, Node] = {}
+        for node in nodes:
+            if node.name in by_name:
+                raise ValueError(f"Duplicate node name {node.name!r}")
+            by_name[node.name] = node
+        for node in nodes:
+            for pred in node.after:
+                if pred not in by_name:
+                    raise ValueError(f"Node {node.name!r} runs after unknown node {pred!r}")
+
+        ordered: List[Node] = []
+        placed = set()
+        while len(ordered) < len(nodes):
+            ready = [n for n in nodes if n.name not in placed and placed.issuperset(n.after)]
+            if not ready:
+                raise ValueError("Nodes form a cycle")
+            ordered.extend(ready)
+            placed.update(n.name for n in ready)
+        return ordered
+
+    def create(
+        self, nodes: Sequence[Node], max_in_flight: int = 1024, logging: bool = True
+    ) -> Dag[Any]:
+        """
+        Create a Dag from its nodes, given in any order.
+
+        Args:
+            nodes (Sequence[Node]): The nodes; ``Node.after`` names the nodes each one runs after.
+            max_in_flight (int): Items allowed in the DAG at once; bounds the buffers where the
+                results of parallel branches wait to be joined. Defaults to 1024.
+            logging (bool): Enable logging for nodes without their own config. Defaults to True.
+
+        Returns:
+            Dag: A DAG that is fed with put() and read with get().
+
+        Raises:
+            ValueError: If the nodes are empty, names are duplicated or unknown, they form
+                a cycle, or a node config needs tracked tasks (item_timeout,
+                max_redeliveries, cache_size, coalesce).
+        """
+        if not nodes:
+            raise ValueError("A DAG needs at least one node")
+        ordered = self._topological_order(nodes)
+
+        control_ctx = ControlContext()
+        in_queues = {node.name: GenMPQueue(node.buffer_size) for node in ordered}
+        # Results the parent reads: sink outputs and inputs of joins
+        collectors: Dict[str, GenMPQueue] = {}
+
+        processors = {}
+        for node in ordered:
+            successors = [n for n in ordered if node.name in n.after]
+            direct = [in_queues[n.name] for n in successors if len(n.after) == 1]
+            if not successors or len(direct) < len(successors):
+                collectors[node.name] = GenMPQueue()
+                direct.append(collectors[node.name])
+
+            config = node.config or BatchProcessorConfig(
+                on_worker_exception=FailurePolicy.ABORT,
+                on_worker_death=FailurePolicy.RESTART,
+                logging=logging,
+            )
+            if config.tracks_tasks():
+                raise ValueError(f"Node {node.name!r} uses a setting that needs tracked tasks")
+            processors[node.name] = self.batch_processor_factory.create(
+                node.n_workers,
+                node.worker_factory,
+                config,
+                control_ctx=control_ctx,
+                in_queue=in_queues[node.name],
+                out_queue=direct[0] if len(direct) == 1 else FanOutQueue(direct),
+            )
+
+        preds = {node.name: tuple(node.after) for node in ordered}
+        return Dag(processors, preds, collectors, max_in_flight)
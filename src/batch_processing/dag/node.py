@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+from ..batch_processor.batch_worker import IBatchWorker
+from ..batch_processor.configuration import BatchProcessorConfig
+
+
+@dataclass
+class Node:
+    """
+    One processing step of a DAG.
+
+    A node without ``after`` receives every item put into the DAG. A node after a
+    single node receives that node's results directly from its workers; a node after
+    several receives, per item, a dict mapping each of those node names to its result.
+    """
+
+    name: str
+    worker_factory: Callable[[], IBatchWorker[Any, Any]]
+    n_workers: int = 1
+    after: Sequence[str] = ()
+    buffer_size: int = 1024
+    config: Optional[BatchProcessorConfig] = None
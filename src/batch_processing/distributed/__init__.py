@@ -0,0 +1,19 @@
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .broker import Broker
+    from .agent import WorkerAgent, start_local_agents
+    from .distributed_worker_pool import DistributedWorkerPool
+    from .factory import DistributedBatchProcessorFactory
+
+_EXPORTS = {
+    "Broker": ".broker",
+    "WorkerAgent": ".agent",
+    "start_local_agents": ".agent",
+    "DistributedWorkerPool": ".distributed_worker_pool",
+    "DistributedBatchProcessorFactory": ".factory",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
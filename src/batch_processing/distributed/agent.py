@@ -0,0 +1,129 @@
+import os
+from multiprocessing import Process
+from multiprocessing.connection import Client, Connection
+from queue import Empty
+from threading import Event, Thread
+from typing import Any, Callable, List, Optional
+from .broker import Address
+from ..batch_processor.batch_processor import BatchProcessor
+from ..batch_processor.batch_worker import IBatchWorker
+from ..batch_processor.configuration import BatchProcessorConfig
+from ..batch_processor.exception_info import ExceptionInfo
+from ..batch_processor.factory import BatchProcessorFactory
+from ..batch_processor.task import Task, TaskResult
+from ..configuration import FailurePolicy
+from ..gen_mp_queue import GenMPQueue
+
+
+class WorkerAgent:
+    """
+    Runs workers on this host for a remote Broker.
+
+    The agent connects to the broker, runs a local BatchProcessor with ``n_workers``
+    workers and asks for up to ``prefetch`` items per worker. Results and errors are
+    sent back in frames of up to ``batch_size``, waiting at most ``linger`` seconds
+    to fill a frame. Retries (``config.retry_policy``) happen on the agent; every
+    other failure policy is applied by the processor on the broker side.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        authkey: bytes,
+        worker_factory: Callable[[], IBatchWorker[Any, Any]],
+        n_workers: Optional[int] = None,
+        config: Optional[BatchProcessorConfig] = None,
+        prefetch: int = 2,
+        batch_size: int = 64,
+        linger: float = 0.005,
+    ):
+        self.address = address
+        self.authkey = authkey
+        self.worker_factory = worker_factory
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.config = config or BatchProcessorConfig(
+            on_worker_exception=FailurePolicy.IGNORE,
+            on_worker_death=FailurePolicy.RESTART,
+        )
+        self.prefetch = prefetch
+        self.batch_size = batch_size
+        self.linger = linger
+
+    def _take(self, processor: BatchProcessor, timeout: float) -> List[tuple]:
+        ctx = processor.ctx
+        frame = []
+        for queue in GenMPQueue.wait([ctx.out_queue, ctx.error_queue], timeout):
+            while len(frame) < self.batch_size:
+                try:
+                    obj = queue.get_nowait()
+                except Empty:
+                    break
+                if isinstance(obj, TaskResult):
+                    frame.append((obj.id, "out", obj.result))
+                else:
+                    frame.append((obj.task_id, "err", obj))
+        # A local worker died holding the item, report it like any other failure
+        for lost in processor.pool.lost_tasks():
+            info = ExceptionInfo(
+                exc_type=type(lost.error),
+                message=str(lost.error),
+                tb="",
+                item=None,
+                task_id=lost.task_id,
+            )
+            frame.append((lost.task_id, "err", info))
+        return frame
+
+    def _send_results(self, conn: Connection, processor: BatchProcessor, done: Event) -> None:
+        while not done.is_set():
+            frame = self._take(processor, 0.1)
+            if frame and len(frame) < self.batch_size:
+                frame += self._take(processor, self.linger)
+            if frame:
+                try:
+                    conn.send(("done", frame))
+                except OSError:
+                    return
+
+    def run(self) -> None:
+        """Serve the broker until it stops or disconnects."""
+        conn = Client(self.address, authkey=self.authkey)
+        # Workers must not hold the socket open, or the broker would not notice the agent dying
+        os.register_at_fork(after_in_child=conn.close)
+        processor = BatchProcessorFactory().create(self.n_workers, self.worker_factory, self.config)
+        processor.start()
+        done = Event()
+        sender = Thread(target=self._send_results, args=(conn, processor, done), daemon=True)
+        sender.start()
+        try:
+            conn.send(("hello", (self.n_workers * self.prefetch, self.n_workers)))
+            while True:
+                kind, payload = conn.recv()
+                if kind == "stop":
+                    break
+                for seq, item in payload:
+                    processor.ctx.in_queue.put(Task(seq, item))
+        except (EOFError, OSError):
+            pass
+        finally:
+            done.set()
+            sender.join()
+            conn.close()
+            processor.stop()
+
+
+def start_local_agents(
+    address: Address,
+    authkey: bytes,
+    worker_factory: Callable[[], IBatchWorker[Any, Any]],
+    n_agents: int,
+    **agent_kwargs,
+) -> List[Process]:
+    """Start ``n_agents`` agents as processes on this host, e.g. to test a broker."""
+    processes = []
+    for _ in range(n_agents):
+        agent = WorkerAgent(address, authkey, worker_factory, **agent_kwargs)
+        process = Process(target=agent.run)
+        process.start()
+        processes.append(process)
+    return processes
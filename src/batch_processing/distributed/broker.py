@@ -0,0 +1,204 @@
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from queue import Empty
+from threading import Condition, Thread
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from ..batch_processor.context import BatchProcessorContext
+from ..batch_processor.task import EndOfStream, Task
+from ..logger import logger
+
+Address = Union[Tuple[str, int], str]
+
+
+class _Agent:
+    def __init__(self, conn: Connection, capacity: int, workers: int):
+        self.conn = conn
+        self.credit = capacity
+        self.workers = workers
+        self.in_flight: Dict[int, Any] = {}
+
+
+class Broker:
+    """
+    Serves a BatchProcessorContext's queues to worker agents over a Listener.
+
+    Agents authenticate with ``authkey`` and announce how many items they accept to
+    hold (their credit). Items are read from ``in_queue`` only as far as agents have
+    credit, and sent in frames of up to ``batch_size``; every result or error that
+    comes back returns one credit. Items held by an agent that disconnects are sent
+    to the others. An ``EndOfStream`` is echoed once every item before it is done.
+    """
+
+    def __init__(
+        self,
+        ctx: BatchProcessorContext,
+        authkey: bytes,
+        address: Address = ("127.0.0.1", 0),
+        batch_size: int = 64,
+    ):
+        self.ctx = ctx
+        self.batch_size = batch_size
+        self.completed = 0
+        # Items read from in_queue, whether or not they reached an agent yet
+        self.taken = 0
+        self._authkey = authkey
+        # Bound now so that agents can be pointed at the address before start()
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+        self._agents: List[_Agent] = []
+        self._backlog: Deque[Any] = deque()
+        self._markers = 0
+        self._next_seq = 0
+        self._cond = Condition()
+        self._running = False
+        self._threads: List[Thread] = []
+
+    def start(self) -> None:
+        self._running = True
+        self._threads = [
+            Thread(target=self._accept_loop, daemon=True),
+            Thread(target=self._dispatch_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            agents = list(self._agents)
+        # accept() is not interrupted by closing the listener, connect to wake it up
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except OSError:
+            pass
+        for thread in self._threads:
+            thread.join()
+        self._listener.close()
+        for agent in agents:
+            try:
+                agent.conn.send(("stop", None))
+            except OSError:
+                pass
+            agent.conn.close()
+
+    def workers(self) -> int:
+        with self._cond:
+            return sum(agent.workers for agent in self._agents)
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                logger.warning("Rejected a worker agent with a wrong authkey")
+                continue
+            except OSError:
+                return
+            if not self._running:
+                conn.close()
+                return
+            # The agent says hello once its workers are up, do not hold accept() for it
+            Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _drop(self, agent: _Agent) -> None:
+        if agent not in self._agents:
+            return
+        self._agents.remove(agent)
+        agent.conn.close()
+        if agent.in_flight:
+            logger.warning("Worker agent disconnected, redelivering %d items", len(agent.in_flight))
+            self._backlog.extendleft(reversed(list(agent.in_flight.values())))
+        self._cond.notify_all()
+
+    def _serve(self, conn: Connection) -> None:
+        """Register an agent, then read its result frames until it disconnects."""
+        try:
+            kind, (capacity, workers) = conn.recv()
+        except (EOFError, OSError, ValueError, TypeError):
+            conn.close()
+            return
+        agent = _Agent(conn, capacity, workers)
+        with self._cond:
+            if not self._running:
+                conn.close()
+                return
+            self._agents.append(agent)
+            self._cond.notify_all()
+
+        try:
+            while True:
+                kind, payload = agent.conn.recv()
+                with self._cond:
+                    for seq, status, obj in payload:
+                        item = agent.in_flight.pop(seq, None)
+                        agent.credit += 1
+                        if item is None:
+                            continue
+                        self.completed += 1
+                        if status == "out":
+                            self.ctx.out_queue.put(obj)
+                        else:
+                            # The agent numbered items itself, restore the processor's id
+                            obj.task_id = item.id if isinstance(item, Task) else None
+                            self.ctx.error_queue.put(obj)
+                    self._cond.notify_all()
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self._cond:
+                self._drop(agent)
+
+    def _in_flight(self) -> int:
+        return sum(len(agent.in_flight) for agent in self._agents)
+
+    def _fill(self) -> None:
+        """Read items from in_queue while agents have credit for them."""
+        with self._cond:
+            wanted = sum(agent.credit for agent in self._agents) - len(self._backlog)
+            blocked = self._markers > 0
+        timeout = 0.05
+        while wanted > 0 and not blocked:
+            try:
+                item = self.ctx.in_queue.get(timeout=timeout)
+            except Empty:
+                return
+            timeout = 0.001
+            with self._cond:
+                if isinstance(item, EndOfStream):
+                    # Nothing after the marker is read until everything before it is done
+                    self._markers += 1
+                    return
+                self._backlog.append(item)
+                self.taken += 1
+            wanted -= 1
+
+    def _send(self) -> None:
+        for agent in list(self._agents):
+            while agent.credit > 0 and self._backlog:
+                batch = []
+                for _ in range(min(agent.credit, self.batch_size, len(self._backlog))):
+                    item = self._backlog.popleft()
+                    agent.in_flight[self._next_seq] = item
+                    batch.append((self._next_seq, item))
+                    self._next_seq += 1
+                agent.credit -= len(batch)
+                try:
+                    agent.conn.send(("items", batch))
+                except OSError:
+                    self._drop(agent)
+                    break
+
+    def _dispatch_loop(self) -> None:
+        while self._running:
+            self._fill()
+            with self._cond:
+                self._send()
+                if self._markers and not self._backlog and not self._in_flight():
+                    for _ in range(self._markers):
+                        self.ctx.out_queue.put(EndOfStream())
+                    self._markers = 0
+                has_credit = any(agent.credit for agent in self._agents)
+                if self._running and (not has_credit or self._markers):
+                    self._cond.wait(0.05)
@@ -0,0 +1,71 @@
+from typing import Collection, List, Optional, Tuple
+from .broker import Broker
+from ..worker_pool.item_timeout_error import ItemTimeoutError
+from ..worker_pool.lost_task import LostTask
+from ..worker_pool.worker_fatal_error import WorkerFatalError
+from ..worker_pool.worker_pool import IWorkerPool
+
+
+class DistributedWorkerPool(IWorkerPool):
+    """
+    Worker pool whose workers are remote agents connected to a Broker.
+
+    Agents manage their own worker processes, so there is nothing to restart, evict
+    or resize from here; items held by an agent that goes away are redelivered by
+    the broker rather than reported as lost.
+    """
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+
+    @property
+    def address(self):
+        return self.broker.address
+
+    def start(self) -> None:
+        self.broker.start()
+
+    def stop(self) -> None:
+        pass
+
+    def cleanup(self) -> None:
+        self.broker.stop()
+
+    def restart_dead(self, crashed_only: bool = False) -> int:
+        return 0
+
+    def fatal_errors(self) -> List[WorkerFatalError]:
+        return []
+
+    def alive_workers(self) -> int:
+        return self.broker.workers()
+
+    def evict_overdue(self, item_timeout: float) -> List[ItemTimeoutError]:
+        return []
+
+    def lost_tasks(self) -> List[LostTask]:
+        return []
+
+    def recycle(self) -> int:
+        return 0
+
+    def resize(self, n_workers: int) -> None:
+        pass
+
+    def size(self) -> int:
+        return self.broker.workers()
+
+    def completed_items(self) -> int:
+        return self.broker.completed
+
+    def taken_items(self) -> int:
+        return self.broker.taken
+
+    def worker_rss(self) -> Optional[float]:
+        return None
+
+    def in_flight(self) -> List[Tuple[Optional[int], float]]:
+        return []
+
+    def cancel_tasks(self, task_ids: Collection[int]) -> List[int]:
+        return []
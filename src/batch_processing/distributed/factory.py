@@ -0,0 +1,67 @@
+from typing import Any, Optional
+from .broker import Address, Broker
+from .distributed_worker_pool import DistributedWorkerPool
+from ..batch_processor.batch_processor import BatchProcessor
+from ..batch_processor.configuration import BatchProcessorConfig
+from ..batch_processor.context import BatchProcessorContext
+from ..batch_processor.factory import BatchProcessorFactory
+from ..configuration import FailurePolicy, SharedConfig
+from ..context import ControlContext
+from ..monitor.configuration import MonitorConfig
+from ..monitor.factory import MonitorFactory
+
+
+class DistributedBatchProcessorFactory:
+    """
+    Factory for BatchProcessors whose workers run in remote WorkerAgents.
+
+    The processor keeps the usual API; its queues are served to the agents by a
+    Broker listening on ``address``.
+    """
+
+    def __init__(self):
+        self.monitor_factory = MonitorFactory()
+
+    def create(
+        self,
+        authkey: bytes,
+        address: Address = ("127.0.0.1", 0),
+        config: Optional[BatchProcessorConfig] = None,
+        batch_size: int = 64,
+    ) -> BatchProcessor[Any, Any]:
+        """
+        Create a BatchProcessor served to worker agents.
+
+        Args:
+            authkey (bytes): Shared secret agents must present to connect.
+            address (Address): Host and port (or Unix socket path) to listen on. Port 0
+                picks a free port; read it back from ``processor.pool.address``.
+                Defaults to a free port on localhost.
+            config (Optional[BatchProcessorConfig]): Processor configuration. Worker-side
+                settings (retries, timeouts, affinity, recycling) are those of the agents.
+                Defaults to ABORT on worker exceptions.
+            batch_size (int): Maximum number of items per frame sent to an agent. Defaults to 64.
+
+        Returns:
+            BatchProcessor: A batch processor; put() items once agents are connected or
+            before, they wait in its queue.
+        """
+        config = config or BatchProcessorConfig(
+            on_worker_exception=FailurePolicy.ABORT,
+            on_worker_death=FailurePolicy.IGNORE,
+        )
+        shared_config = SharedConfig(logging=config.logging)
+        processor_config = BatchProcessorFactory._processor_config(config, shared_config)
+        control_ctx = ControlContext()
+        processor_ctx = BatchProcessorContext(processor_config, control_ctx)
+
+        pool = DistributedWorkerPool(Broker(processor_ctx, authkey, address, batch_size))
+        monitor_config = MonitorConfig(
+            shared=shared_config,
+            on_worker_death=config.on_worker_death,
+            worker_monitoring_frequency=config.worker_monitoring_frequency,
+        )
+        monitor = self.monitor_factory.create_with_shared_control_context(
+            pool, monitor_config, control_ctx
+        )
+        return BatchProcessor(pool, monitor, processor_ctx)
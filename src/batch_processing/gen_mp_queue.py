@@ -1,16 +1,47 @@
 from contextlib import AbstractContextManager
 from multiprocessing import Queue
-from typing import Generic, TypeVar, Optional
+from multiprocessing.connection import wait
+from multiprocessing.reduction import ForkingPickler
+from queue import Full
+from typing import Generic, List, TypeVar, Optional
 
 T = TypeVar("T")
 
 class GenMPQueue(Generic[T], AbstractContextManager):
     def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
         self._queue = Queue(maxsize)
 
     def put(self, obj: T, block: bool = True, timeout: Optional[float] = None) -> None:
         self._queue.put(obj, block, timeout)
 
+    def put_sync(self, obj: T, block: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Write the object to the pipe from the calling thread instead of the feeder thread.
+
+        The queue's write lock is only held during this call, so a process that is
+        killed later (for instance while its worker is computing) cannot leave the
+        lock held and block every other writer.
+        """
+        self.put_pickled(ForkingPickler.dumps(obj), block, timeout)
+
+    def put_pickled(self, data: bytes, block: bool = True, timeout: Optional[float] = None) -> None:
+        """``put_sync`` for an object already pickled with ForkingPickler."""
+        queue = self._queue
+        if not queue._sem.acquire(block, timeout):
+            raise Full
+        if queue._wlock is None:
+            queue._writer.send_bytes(data)
+        else:
+            with queue._wlock:
+                queue._writer.send_bytes(data)
+
+    @staticmethod
+    def wait(queues: List["GenMPQueue"], timeout: Optional[float] = None) -> List["GenMPQueue"]:
+        """Block until at least one of the queues has data, return the ones that do."""
+        readers = {queue._queue._reader: queue for queue in queues}
+        return [readers[reader] for reader in wait(list(readers), timeout)]
+
     def get(self, block: bool = True, timeout: Optional[float] = None) -> T:
         return self._queue.get(block, timeout)
 
@@ -42,4 +73,23 @@ class GenMPQueue(Generic[T], AbstractContextManager):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
-        self._queue.close()
\ No newline at end of file
+        self._queue.close()
+
+
+class FanOutQueue(Generic[T]):
+    """
+    Write-only queue that delivers every object to all of its member queues.
+
+    The object is pickled once and the same bytes are sent to each member, so
+    broadcasting a large payload costs one serialisation however many readers it has.
+    """
+
+    def __init__(self, queues: List[GenMPQueue[T]]):
+        self.queues = queues
+
+    def put_sync(self, obj: T, block: bool = True, timeout: Optional[float] = None) -> None:
+        data = ForkingPickler.dumps(obj)
+        for queue in self.queues:
+            queue.put_pickled(data, block, timeout)
+
+    put = put_sync
@@ -0,0 +1,18 @@
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .file_range import FileRange
+    from .input_source import IInputSource, MmapLineSource
+    from .range_worker import LineRangeWorker, iter_range_lines
+
+_EXPORTS = {
+    "FileRange": ".file_range",
+    "IInputSource": ".input_source",
+    "MmapLineSource": ".input_source",
+    "LineRangeWorker": ".range_worker",
+    "iter_range_lines": ".range_worker",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
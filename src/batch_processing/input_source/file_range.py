@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FileRange:
+    """Byte range of a file handed to a worker instead of the records it holds."""
+
+    path: str
+    offset: int
+    length: int
@@ -0,0 +1,41 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Generic, Iterator, TypeVar
+from .file_range import FileRange
+
+T = TypeVar("T")
+
+
+class IInputSource(Generic[T], ABC):
+    @abstractmethod
+    def __iter__(self) -> Iterator[T]:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class MmapLineSource(IInputSource[FileRange]):
+    """
+    Splits a newline-delimited file into fixed-size byte ranges.
+
+    The parent never reads the file: it only computes offsets. Ranges are not
+    aligned to record boundaries here, workers realign them when reading
+    (see ``iter_range_lines``), so every record is read by exactly one worker.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1 << 20):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self._path = os.path.abspath(os.fspath(path))
+        self._chunk_size = chunk_size
+        self._size = os.path.getsize(self._path)
+
+    def __iter__(self) -> Iterator[FileRange]:
+        for offset in range(0, self._size, self._chunk_size):
+            length = min(self._chunk_size, self._size - offset)
+            yield FileRange(self._path, offset, length)
+
+    def __len__(self) -> int:
+        return -(-self._size // self._chunk_size)
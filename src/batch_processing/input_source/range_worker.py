@@ -0,0 +1,61 @@
+import mmap
+from typing import Dict, Iterator, List, TypeVar
+from .file_range import FileRange
+from ..batch_processor.batch_worker import IBatchWorker
+
+O = TypeVar("O")
+
+_NEWLINE = 0x0A
+
+
+def iter_range_lines(buf: mmap.mmap, offset: int, length: int) -> Iterator[bytes]:
+    """
+    Yield the records that start inside ``[offset, offset + length)``.
+
+    A record belongs to the range it starts in: a range starting mid-record skips
+    to the next newline, and the last record is read past the range end if needed.
+    """
+    size = len(buf)
+    end = min(offset + length, size)
+    start = offset
+
+    if start > 0 and buf[start - 1] != _NEWLINE:
+        newline = buf.find(b"\n", start)
+        if newline == -1:
+            return
+        start = newline + 1
+
+    while start < end:
+        newline = buf.find(b"\n", start)
+        if newline == -1:
+            yield buf[start:size]
+            return
+        yield buf[start:newline]
+        start = newline + 1
+
+
+class LineRangeWorker(IBatchWorker[FileRange, List[O]]):
+    """
+    Worker that maps a file range itself and feeds each line to an inner worker.
+
+    Files are mapped once per worker process and reused for every range.
+    """
+
+    def __init__(self, line_worker: IBatchWorker[bytes, O]):
+        self._line_worker = line_worker
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    def _map(self, path: str) -> mmap.mmap:
+        buf = self._maps.get(path)
+        if buf is None:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[path] = buf
+        return buf
+
+    def work(self, item: FileRange) -> List[O]:
+        buf = self._map(item.path)
+        return [
+            self._line_worker.work(line)
+            for line in iter_range_lines(buf, item.offset, item.length)
+        ]
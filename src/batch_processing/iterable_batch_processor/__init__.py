@@ -1,6 +1,15 @@
-from .iterable_batch_processor import IIterableBatchProcessor, IterableBatchProcessor
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "IIterableBatchProcessor",
-    "IterableBatchProcessor",
-]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .iterable_batch_processor import IIterableBatchProcessor, IterableBatchProcessor
+    from .checkpoint import Checkpoint
+
+_EXPORTS = {
+    "IIterableBatchProcessor": ".iterable_batch_processor",
+    "IterableBatchProcessor": ".iterable_batch_processor",
+    "Checkpoint": ".checkpoint",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,91 @@
+import os
+import pickle
+import time
+from typing import BinaryIO, Dict, Generic, List, Optional, Tuple, TypeVar
+
+O = TypeVar("O")
+
+
+class Checkpoint(Generic[O]):
+    """
+    Append-only record of completed item indices and their results.
+
+    Results are buffered in memory and appended to the file as one pickle frame
+    per flush, so the cost of a flush is proportional to the new results only.
+    A frame cut short by a crash is discarded on the next load.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0, keep: bool = False):
+        self.path = os.fspath(path)
+        self.flush_interval = flush_interval
+        self.keep = keep
+        self._completed: Dict[int, O] = {}
+        self._buffer: List[Tuple[int, O]] = []
+        self._file: Optional[BinaryIO] = None
+        self._last_flush = time.monotonic()
+
+    def load(self) -> Dict[int, O]:
+        """Read every complete frame from disk and return index -> result."""
+        self._completed = {}
+        if not os.path.exists(self.path):
+            return {}
+
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            while True:
+                try:
+                    frame = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+                    break
+                self._completed.update(frame)
+                valid_size = f.tell()
+
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+
+        return dict(self._completed)
+
+    def record(self, index: int, result: O) -> None:
+        self._completed[index] = result
+        self._buffer.append((index, result))
+
+    def maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        pickle.dump(self._buffer, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """Close the checkpoint after a successful run, deleting it unless ``keep``."""
+        self.close()
+        if not self.keep and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def is_done(self, index: int) -> bool:
+        return index in self._completed
+
+    def completed_ranges(self) -> List[Tuple[int, int]]:
+        """Completed indices as half-open ``(start, stop)`` ranges."""
+        ranges: List[Tuple[int, int]] = []
+        for index in sorted(self._completed):
+            if ranges and ranges[-1][1] == index:
+                ranges[-1] = (ranges[-1][0], index + 1)
+            else:
+                ranges.append((index, index + 1))
+        return ranges
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Generic, Iterable, TypeVar, List
-import asyncio
+from typing import Generic, Iterable, TypeVar, List, Optional
 from queue import Empty
 
+from .checkpoint import Checkpoint
 from ..batch_processor.batch_processor import BatchProcessor
+from ..batch_processor.exception_info import ExceptionInfo
+from ..batch_processor.task import Task
 
 I = TypeVar("I")
 O = TypeVar("O")
@@ -21,46 +23,91 @@ class IterableBatchProcessor(IIterableBatchProcessor[I, O]):
         batch_processor: BatchProcessor[I, O],
         in_iterable: Iterable[I],
         n_items: int,
+        checkpoint: Optional[Checkpoint[O]] = None,
     ):
         self._batch_processor: BatchProcessor[I, O] = batch_processor
         self._in_iterable: Iterable[I] = in_iterable
         self._out_iterable: List[O] = []
         self._n_items: int = n_items
         self._items_queued: int = 0
+        self._checkpoint: Optional[Checkpoint[O]] = checkpoint
+        self._exceptions: List[ExceptionInfo] = []
+        self._input_exhausted: bool = False
+
+    @property
+    def exceptions(self) -> List[ExceptionInfo]:
+        """Errores de los elementos que no produjeron resultado."""
+        return self._exceptions
 
     async def _queue_in_iterable(self):
         """Encola hasta n_items del iterable de entrada al batch processor."""
         in_iter = iter(self._in_iterable)
-        for _ in range(self._n_items):
+        for index in range(self._n_items):
             try:
                 item = next(in_iter)
-                self._batch_processor.put(item)
-                self._items_queued += 1
             except StopIteration:
                 break  # Si no hay más elementos, parar
 
+            if self._checkpoint is None:
+                self._batch_processor.put(item)
+            elif self._checkpoint.is_done(index):
+                continue  # Ya procesado en una ejecución anterior
+            else:
+                self._batch_processor.put(Task(index, item))
+            self._items_queued += 1
+        self._input_exhausted = True
+
     async def _populate_out_iterable(self):
         """Saca elementos del batch processor y los mete al iterable de salida."""
         processed = 0
         while processed < self._items_queued:
             try:
                 result = self._batch_processor.get_nowait()
-                self._out_iterable.append(result)
-                processed += 1
             except Empty:
+                # Los elementos fallidos no producen resultado, se cuentan como procesados
+                failed = self._batch_processor.poll_exceptions()
+                self._exceptions.extend(failed)
+                processed += len(failed)
+                if self._batch_processor.ctx.abort_event.is_set():
+                    break
+                if self._input_exhausted:
+                    # Cola del trabajo: duplicar los rezagados en los workers libres (si está activado)
+                    self._batch_processor.speculate()
                 continue
                 #await asyncio.sleep(0.01)  # Esperar un poco antes de intentar de nuevo
 
+            if self._checkpoint is not None:
+                self._checkpoint.record(result.id, result.result)
+                self._checkpoint.maybe_flush()
+                result = result.result
+            self._out_iterable.append(result)
+            processed += 1
+
     async def process(self) -> Iterable[O]:
         """Procesa los elementos usando el batch processor y retorna el iterable de salida."""
-        with self._batch_processor:
-            #self._batch_processor.start()
+        if self._checkpoint is not None:
+            restored = self._checkpoint.load()
+            self._out_iterable.extend(restored[index] for index in sorted(restored))
+
+        try:
+            with self._batch_processor:
+                #self._batch_processor.start()
+
+                # asyncio se importa aquí: es caro y solo hace falta en este modo
+                import asyncio
+
+                # Crear tareas para encolar y poblar concurrentemente
+                queue_task = asyncio.create_task(self._queue_in_iterable())
+                populate_task = asyncio.create_task(self._populate_out_iterable())
 
-            # Crear tareas para encolar y poblar concurrentemente
-            queue_task = asyncio.create_task(self._queue_in_iterable())
-            populate_task = asyncio.create_task(self._populate_out_iterable())
+                # Ejecutar ambas tareas concurrentemente
+                await asyncio.gather(queue_task, populate_task)
+        except BaseException:
+            if self._checkpoint is not None:
+                self._checkpoint.close()
+            raise
 
-            # Ejecutar ambas tareas concurrentemente
-            await asyncio.gather(queue_task, populate_task)
+        if self._checkpoint is not None:
+            self._checkpoint.finish()
 
         return self._out_iterable
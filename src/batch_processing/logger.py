@@ -1,7 +1,287 @@
+import atexit
+import copy
+import json
 import logging
+import multiprocessing
+import sys
+from dataclasses import dataclass, field
+from logging.handlers import QueueHandler, QueueListener
+from queue import Empty
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(processName)s] %(levelname)s - %(message)s",
-)
\ No newline at end of file
+
+TEXT_FORMAT = "%(asctime)s [%(processName)s] %(levelname)s - %(message)s"
+
+
+@dataclass
+class LogConfig:
+    """
+    Settings for the parent-side log listener.
+
+    Records are written in batches of up to ``batch_size``, or as soon as no more are
+    waiting. A message (same logger, level and format string) is let through at most
+    ``max_repeats`` times per ``window`` seconds, the number dropped is appended to the
+    next one let through. ``handlers`` replaces the default stderr handler.
+    """
+
+    level: int = logging.INFO
+    json: bool = False
+    batch_size: int = 64
+    max_repeats: Optional[int] = 10
+    window: float = 60.0
+    stream: Optional[TextIO] = None  # Defaults to sys.stderr
+    handlers: List[logging.Handler] = field(default_factory=list)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as JSON lines."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets each message through at most ``max_repeats`` times per ``window`` seconds."""
+
+    def __init__(self, max_repeats: int, window: float):
+        super().__init__()
+        self.max_repeats = max_repeats
+        self.window = window
+        # (window start, let through, dropped) per message
+        self._seen: Dict[Tuple[str, int, str], List] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, getattr(record, "template", str(record.msg)))
+        state = self._seen.get(key)
+        if state is None or record.created - state[0] >= self.window:
+            dropped = state[2] if state else 0
+            self._seen[key] = [record.created, 1, 0]
+            if dropped:
+                # Filtered again by the listener, under the same key
+                record.template = key[2]
+                record.msg = f"{record.getMessage()} ({dropped} similar messages suppressed)"
+                record.args = None
+            return True
+        if state[1] < self.max_repeats:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return False
+
+    def summaries(self) -> List[logging.LogRecord]:
+        """Records reporting the messages dropped in the current windows."""
+        records = []
+        for (name, level, template), state in self._seen.items():
+            if state[2]:
+                records.append(logging.makeLogRecord({
+                    "name": name,
+                    "levelno": level,
+                    "levelname": logging.getLevelName(level),
+                    "msg": f"{state[2]} similar messages suppressed: {template}",
+                }))
+                state[2] = 0
+        return records
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """Buffers formatted records and writes up to ``batch_size`` of them at once."""
+
+    def __init__(self, stream: Optional[TextIO] = None, batch_size: int = 64):
+        super().__init__(stream)
+        # Without a stream, sys.stderr is looked up on each write, it may have been replaced
+        self._stderr = stream is None
+        self.batch_size = batch_size
+        self._buffer: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            if self._stderr:
+                self.stream = sys.stderr
+            if self._buffer:
+                self.stream.write("".join(self._buffer))
+                self._buffer.clear()
+            super().flush()
+
+
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like QueueHandler.prepare, but keeps the traceback apart from the message for
+        # the listener's formatter, and the format string for rate limiting
+        record = copy.copy(record)
+        record.template = getattr(record, "template", str(record.msg))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class _FlushingQueueListener(QueueListener):
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except Empty:
+            # Caught up: write out the partial batch before waiting for more
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+
+@dataclass
+class WorkerLogging:
+    """What a worker that did not inherit the queue handler needs to attach one."""
+
+    queue: Any
+    level: int
+    max_repeats: Optional[int]
+    window: float
+
+    def handler(self) -> logging.Handler:
+        handler = _RecordQueueHandler(self.queue)
+        # Repeats are dropped before they are formatted and pickled, the listener's
+        # filter only sees what every worker let through
+        if self.max_repeats is not None:
+            handler.addFilter(RateLimitFilter(self.max_repeats, self.window))
+        return handler
+
+
+class QueueLogging:
+    """
+    Routes the library's log records through a queue to one listener thread.
+
+    Worker processes forked once it is started inherit the queue handler, so logging
+    in a worker only pickles the record onto the queue: the writes to the output
+    happen in the parent, in batches, and never interleave. Spawned workers inherit
+    nothing and ``attach`` to the queue themselves.
+
+    A level already set on the library logger is kept, and its ``propagate`` flag is
+    restored on ``stop``.
+    """
+
+    def __init__(self):
+        self._queue: Optional[multiprocessing.Queue] = None
+        self._listener: Optional[QueueListener] = None
+        self._handler: Optional[QueueHandler] = None
+        self._worker_logging: Optional[WorkerLogging] = None
+        self._registered = False
+        # The logger's settings before start()
+        self._level = logging.NOTSET
+        self._propagate = True
+
+    @property
+    def started(self) -> bool:
+        return self._listener is not None
+
+    @property
+    def queue(self) -> Optional[multiprocessing.Queue]:
+        """The queue records go through, None unless started."""
+        return self._queue if self.started else None
+
+    @property
+    def worker_logging(self) -> Optional[WorkerLogging]:
+        """Settings for workers to ``attach`` with, None unless started."""
+        return self._worker_logging
+
+    @staticmethod
+    def attach(settings: WorkerLogging) -> None:
+        """Send this process's records to the queue, unless it inherited a queue handler already."""
+        if any(isinstance(handler, _RecordQueueHandler) for handler in logger.handlers):
+            return
+        logger.addHandler(settings.handler())
+        logger.setLevel(settings.level)
+        logger.propagate = False
+
+    @staticmethod
+    def report_suppressed() -> None:
+        """Log the repeats this process dropped and has not reported yet, e.g. before a worker exits."""
+        for handler in logger.handlers:
+            if isinstance(handler, _RecordQueueHandler):
+                for limit in handler.filters:
+                    if isinstance(limit, RateLimitFilter):
+                        for record in limit.summaries():
+                            handler.handle(record)
+
+    def _handlers(self, config: LogConfig) -> List[logging.Handler]:
+        handlers = config.handlers or [
+            BatchingStreamHandler(config.stream, config.batch_size)
+        ]
+        formatter = JsonFormatter() if config.json else logging.Formatter(TEXT_FORMAT)
+        for handler in handlers:
+            if not config.handlers:
+                handler.setFormatter(formatter)
+            if config.max_repeats is not None:
+                handler.addFilter(RateLimitFilter(config.max_repeats, config.window))
+        return handlers
+
+    def start(self, config: Optional[LogConfig] = None) -> None:
+        """Start the listener, or restart it with ``config`` if already running."""
+        if self.started:
+            if config is None:
+                return
+            self.stop()
+        config = config or LogConfig()
+        # Kept across restarts, workers already running still hold this queue
+        if self._queue is None:
+            self._queue = multiprocessing.Queue()
+        self._listener = _FlushingQueueListener(
+            self._queue, *self._handlers(config), respect_handler_level=True
+        )
+        self._listener.start()
+        self._level, self._propagate = logger.level, logger.propagate
+        if self._level == logging.NOTSET:
+            logger.setLevel(config.level)
+        self._worker_logging = WorkerLogging(
+            self._queue, logger.getEffectiveLevel(), config.max_repeats, config.window
+        )
+        self._handler = self._worker_logging.handler()
+        logger.addHandler(self._handler)
+        # The listener's handlers write these records, the root ones would repeat them
+        logger.propagate = False
+        if not self._registered:
+            atexit.register(self.stop)
+            self._registered = True
+
+    def stop(self) -> None:
+        """Write out every queued record and stop the listener."""
+        if not self.started:
+            return
+        self.report_suppressed()
+        logger.removeHandler(self._handler)
+        logger.setLevel(self._level)
+        logger.propagate = self._propagate
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            for limit in handler.filters:
+                if isinstance(limit, RateLimitFilter):
+                    for record in limit.summaries():
+                        handler.handle(record)
+            handler.flush()
+        self._listener = None
+        self._handler = None
+        self._worker_logging = None
+
+
+queue_logging = QueueLogging()
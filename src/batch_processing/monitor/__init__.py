@@ -1,10 +1,17 @@
-from .monitor import IWorkerMonitor, WorkerMonitor
-from .configuration import MonitorConfig
-from .factory import MonitorFactory
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "IWorkerMonitor",
-    "WorkerMonitor",
-    "MonitorConfig",
-    "MonitorFactory",
-]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .monitor import IWorkerMonitor, WorkerMonitor
+    from .configuration import MonitorConfig
+    from .factory import MonitorFactory
+
+_EXPORTS = {
+    "IWorkerMonitor": ".monitor",
+    "WorkerMonitor": ".monitor",
+    "MonitorConfig": ".configuration",
+    "MonitorFactory": ".factory",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 from ..configuration import FailurePolicy, SharedConfig
+from ..worker_pool.autotune import AutoTune
 
 @dataclass
 class MonitorConfig:
     shared: SharedConfig
     on_worker_death: FailurePolicy
-    worker_monitoring_frequency: float = 1.0
\ No newline at end of file
+    worker_monitoring_frequency: float = 1.0
+    item_timeout: Optional[float] = None
+    autotune: Optional[AutoTune] = None
@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
 import time
-from threading import Thread
+from threading import Event, Thread
 from queue import Queue
 from typing import Optional, Generic, TypeVar
 from .context import MonitorContext
 from ..worker_pool.worker_pool import IWorkerPool
+from ..worker_pool.autotune import WorkerCountTuner
+from ..logger import logger
 from ..configuration import FailurePolicy
 
 I = TypeVar("I")
@@ -12,6 +14,13 @@ O = TypeVar("O")
 
 
 class IWorkerMonitor(Generic[I, O], ABC):
+    tuner: Optional[WorkerCountTuner] = None
+    # While the processor drains, workers that exit on their end-of-stream marker
+    # are not restarted and the pool is neither recycled nor resized
+    draining: bool = False
+    # Whether workers that crash are replaced (FailurePolicy.RESTART)
+    restarts_dead: bool = False
+
     @abstractmethod
     def start(self) -> None:
         pass
@@ -27,17 +36,25 @@ class WorkerMonitor(IWorkerMonitor):
         self.ctx = ctx
         self.events = Queue()
         self._thread: Optional[Thread] = None
+        # Stops this monitor only, without signalling workers through stop_event
+        self._halt = Event()
+        self.restarts_dead = ctx.config.on_worker_death == FailurePolicy.RESTART
+        if ctx.config.autotune is not None:
+            self.tuner = WorkerCountTuner(ctx.config.autotune, pool.size())
 
     def start(self) -> None:
+        self._halt.clear()
+        self.draining = False
         self._thread = Thread(target=self._loop, daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
+        self._halt.set()
         if self._thread:
             self._thread.join()
 
     def _loop(self) -> None:
-        while not self.ctx.stop_event.is_set():
+        while not self.ctx.stop_event.is_set() and not self._halt.is_set():
             if self.ctx.config.on_worker_death != FailurePolicy.IGNORE:
                 for fatal in self.pool.fatal_errors():
                     self.events.put(fatal)
@@ -48,6 +65,31 @@ class WorkerMonitor(IWorkerMonitor):
                         self.ctx.stop_event.set()
 
             if self.ctx.config.on_worker_death == FailurePolicy.RESTART:
-                self.pool.restart_dead()
+                self.pool.restart_dead(crashed_only=self.draining)
+
+            # Workers only ask to be recycled when they have per-worker limits set
+            if not self.draining:
+                self.pool.recycle()
+
+            if self.ctx.config.item_timeout is not None:
+                for timeout in self.pool.evict_overdue(self.ctx.config.item_timeout):
+                    self.events.put(timeout)
+
+            if self.tuner is not None and not self.draining:
+                self._tune()
+
+            self._halt.wait(self.ctx.config.worker_monitoring_frequency)
 
-            time.sleep(self.ctx.config.worker_monitoring_frequency)
+    def _tune(self) -> None:
+        was_converged = self.tuner.converged
+        target = self.tuner.observe(
+            self.pool.completed_items(), self.pool.worker_rss(), time.monotonic()
+        )
+        if target is not None:
+            self.pool.resize(target)
+        if self.tuner.converged and not was_converged and self.ctx.config.shared.logging:
+            logger.info(
+                "Auto-tune settled on %d workers (%.1f items/s)",
+                self.tuner.best_workers,
+                self.tuner.best_throughput,
+            )
@@ -0,0 +1,17 @@
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .pipeline import IPipeline, Pipeline
+    from .stage import Stage
+    from .factory import PipelineFactory
+
+_EXPORTS = {
+    "IPipeline": ".pipeline",
+    "Pipeline": ".pipeline",
+    "Stage": ".stage",
+    "PipelineFactory": ".factory",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,64 @@
+from typing import Any, Sequence
+from .pipeline import Pipeline
+from .stage import Stage
+from ..batch_processor.configuration import BatchProcessorConfig
+from ..batch_processor.factory import BatchProcessorFactory
+from ..configuration import FailurePolicy
+from ..context import ControlContext
+from ..gen_mp_queue import GenMPQueue
+
+
+class PipelineFactory:
+    """
+    Factory responsible for creating Pipeline instances.
+
+    It builds one BatchProcessor per stage, wiring each stage's output queue to the
+    next stage's input queue and sharing a single ControlContext among them.
+    """
+
+    def __init__(self):
+        self.batch_processor_factory = BatchProcessorFactory()
+
+    def create(self, stages: Sequence[Stage], logging: bool = True) -> Pipeline[Any, Any]:
+        """
+        Create a Pipeline from its stages, in processing order.
+
+        Args:
+            stages (Sequence[Stage]): The stages; each one's results are the next one's items.
+            logging (bool): Enable logging for stages without their own config. Defaults to True.
+
+        Returns:
+            Pipeline: A pipeline that is fed with put() and read with get().
+
+        Raises:
+            ValueError: If there are no stages, or a stage config needs tracked tasks
+                (item_timeout, max_redeliveries, cache_size, coalesce), which only work
+                when the parent reads each result.
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+
+        control_ctx = ControlContext()
+        # The last queue is read by the parent only, so it is left unbounded
+        queues = [GenMPQueue(stage.buffer_size) for stage in stages] + [GenMPQueue()]
+
+        processors = []
+        for i, stage in enumerate(stages):
+            config = stage.config or BatchProcessorConfig(
+                on_worker_exception=FailurePolicy.ABORT,
+                on_worker_death=FailurePolicy.RESTART,
+                logging=logging,
+            )
+            if config.tracks_tasks():
+                raise ValueError(f"Stage {i} uses a setting that needs tracked tasks")
+            processors.append(
+                self.batch_processor_factory.create(
+                    stage.n_workers,
+                    stage.worker_factory,
+                    config,
+                    control_ctx=control_ctx,
+                    in_queue=queues[i],
+                    out_queue=queues[i + 1],
+                )
+            )
+        return Pipeline(processors)
@@ -0,0 +1,155 @@
+from abc import abstractmethod
+from collections import deque
+from contextlib import AbstractContextManager
+from queue import Empty, Full
+from typing import Any, Deque, Generic, List, Optional, TypeVar
+from ..batch_processor.batch_processor import BatchProcessor
+from ..batch_processor.exception_info import ExceptionInfo
+from ..batch_processor.task import EndOfStream
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+
+class IPipeline(Generic[I, O], AbstractContextManager):
+    @abstractmethod
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def stop(self, drain: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def drain(self) -> List[O]:
+        pass
+
+    @abstractmethod
+    def poll_exceptions(self) -> List[ExceptionInfo]:
+        pass
+
+    @abstractmethod
+    def put(self, item: I) -> None:
+        pass
+
+    @abstractmethod
+    def get_nowait(self) -> O:
+        pass
+
+    @abstractmethod
+    def get(self) -> O:
+        pass
+
+
+class Pipeline(IPipeline[I, O]):
+    """
+    Batch processors chained so that each stage's out_queue is the next one's in_queue.
+
+    Intermediate results go from worker to worker without passing through the parent,
+    which only feeds the first stage and reads the last. All stages share one
+    ControlContext, so stopping or aborting one stops the whole pipeline.
+    """
+
+    def __init__(self, stages: List[BatchProcessor[Any, Any]]):
+        self.stages = stages
+        self._ready: Deque[O] = deque()
+
+    def start(self) -> None:
+        # Consumers first, so the first items never wait for a stage to come up
+        for stage in reversed(self.stages):
+            stage.start()
+
+    def stop(self, drain: bool = False) -> None:
+        if drain:
+            self._ready.extend(self.drain())
+            return
+        self._shutdown()
+
+    def _collect(self, timeout: Optional[float]) -> List[O]:
+        out_queue = self.stages[-1].ctx.out_queue
+        results = []
+        try:
+            results.append(out_queue.get(timeout=timeout) if timeout else out_queue.get_nowait())
+            while True:
+                results.append(out_queue.get_nowait())
+        except Empty:
+            pass
+        return results
+
+    def drain(self) -> List[O]:
+        """
+        Let every stage finish its queued items, then stop; returns the unretrieved results.
+
+        Stages are drained in order: once every worker of a stage has exited, all
+        it produced is already queued for the next stage, so that stage's markers
+        can go behind it. Monitors keep evicting hung workers and replacing crashed
+        ones, but no longer restart the workers that exit on their marker.
+        """
+        for stage in self.stages:
+            stage.monitor.draining = True
+
+        results = list(self._ready)
+        self._ready.clear()
+        for stage in self.stages:
+            for _ in range(stage.pool.alive_workers()):
+                results.extend(self._put(stage, EndOfStream()))
+            while stage.pool.alive_workers() > 0 and not stage.ctx.abort_event.is_set():
+                # The last stage's queue is unbounded, reading it keeps the others moving
+                results.extend(self._collect(0.1))
+        results.extend(self._collect(None))
+
+        self._shutdown()
+        return results
+
+    def _put(self, stage: BatchProcessor[Any, Any], item: Any) -> List[O]:
+        """
+        Queue an item for a stage, returns the results read while its buffer was full.
+
+        Blocking on the full buffer could deadlock: the last stage's workers write
+        straight to the pipe, and block once it is full until the parent reads it.
+        """
+        results = []
+        while True:
+            try:
+                stage.ctx.in_queue.put(item, block=False)
+                return results
+            except Full:
+                if stage.ctx.abort_event.is_set():
+                    self._shutdown()
+                    raise RuntimeError("Pipeline aborted")
+                results.extend(self._collect(0.01))
+
+    def _shutdown(self) -> None:
+        # Shared by all stages: every worker starts stopping at once
+        self.stages[0].ctx.stop_event.set()
+        fatal = None
+        for stage in self.stages:
+            try:
+                stage.stop()
+            except Exception as exc:
+                fatal = fatal or exc
+        if fatal:
+            raise fatal
+
+    def poll_exceptions(self) -> List[ExceptionInfo]:
+        return [info for stage in self.stages for info in stage.poll_exceptions()]
+
+    def put(self, item: I) -> None:
+        self._ready.extend(self._put(self.stages[0], item))
+
+    def get(self) -> O:
+        if self._ready:
+            return self._ready.popleft()
+        return self.stages[-1].get()
+
+    def get_nowait(self) -> O:
+        if self._ready:
+            return self._ready.popleft()
+        return self.stages[-1].get_nowait()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
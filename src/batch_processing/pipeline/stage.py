@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from ..batch_processor.batch_worker import IBatchWorker
+from ..batch_processor.configuration import BatchProcessorConfig
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline: its workers, how many, and the bounded buffer feeding it.
+
+    ``buffer_size`` caps the items waiting for this stage (0 means unbounded); when it
+    is full the previous stage, or ``put`` for the first stage, blocks.
+    """
+
+    worker_factory: Callable[[], IBatchWorker[Any, Any]]
+    n_workers: int = 1
+    buffer_size: int = 1024
+    config: Optional[BatchProcessorConfig] = None
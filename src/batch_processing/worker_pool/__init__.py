@@ -1,10 +1,31 @@
-from .worker_pool import IWorkerPool, WorkerPool
-from .worker import IWorker
-from .factory import WorkerPoolFactory
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "IWorkerPool",
-    "WorkerPool",
-    "IWorker",
-    "WorkerPoolFactory",
-]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .worker_pool import IWorkerPool, WorkerPool
+    from .worker import IWorker
+    from .factory import WorkerPoolFactory
+    from .slot_table import SlotTable
+    from .lost_task import LostTask
+    from .item_timeout_error import ItemTimeoutError
+    from .affinity import Affinity
+    from .autotune import AutoTune, WorkerCountTuner
+    from .resource_limits import ResourceLimit, ResourceLimits
+
+_EXPORTS = {
+    "IWorkerPool": ".worker_pool",
+    "WorkerPool": ".worker_pool",
+    "IWorker": ".worker",
+    "WorkerPoolFactory": ".factory",
+    "SlotTable": ".slot_table",
+    "LostTask": ".lost_task",
+    "ItemTimeoutError": ".item_timeout_error",
+    "Affinity": ".affinity",
+    "AutoTune": ".autotune",
+    "WorkerCountTuner": ".autotune",
+    "ResourceLimit": ".resource_limits",
+    "ResourceLimits": ".resource_limits",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
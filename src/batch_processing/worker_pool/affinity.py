@@ -0,0 +1,72 @@
+import glob
+import os
+from enum import Enum, auto
+from typing import Iterable, List, Optional, Sequence, Set, Union
+
+_NODE_GLOB = "/sys/devices/system/node/node[0-9]*/cpulist"
+
+
+class Affinity(Enum):
+    CORE = auto()
+    """One CPU per worker, consecutive slots alternating between NUMA nodes."""
+    NUMA = auto()
+    """All CPUs of one NUMA node per worker, slots spread round-robin over nodes."""
+
+
+AffinitySpec = Union[Affinity, Sequence[Iterable[int]], None]
+
+
+def parse_cpulist(cpulist: str) -> Set[int]:
+    """Parse the kernel's CPU list format, e.g. ``0-3,8,10-11``."""
+    cpus: Set[int] = set()
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        start, _, stop = part.partition("-")
+        cpus.update(range(int(start), int(stop or start) + 1))
+    return cpus
+
+
+def numa_nodes() -> List[Set[int]]:
+    """CPUs usable by this process grouped by NUMA node (a single group without NUMA info)."""
+    usable = available_cpus()
+    nodes = []
+    for path in sorted(glob.glob(_NODE_GLOB), key=lambda p: int(p.split("node")[-1].split("/")[0])):
+        with open(path) as f:
+            cpus = parse_cpulist(f.read()) & usable
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [usable]
+
+
+def available_cpus() -> Set[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+def plan_affinity(spec: AffinitySpec, n_slots: int) -> List[Optional[Set[int]]]:
+    """CPU set for each worker slot, ``None`` where placement is left to the OS."""
+    if spec is None:
+        return [None] * n_slots
+
+    if isinstance(spec, Affinity):
+        nodes = [sorted(cpus) for cpus in numa_nodes()]
+        plan: List[Optional[Set[int]]] = []
+        for slot in range(n_slots):
+            node = nodes[slot % len(nodes)]
+            if spec == Affinity.NUMA:
+                plan.append(set(node))
+            else:
+                plan.append({node[(slot // len(nodes)) % len(node)]})
+        return plan
+
+    cpu_sets = [set(cpus) for cpus in spec]
+    if not cpu_sets:
+        raise ValueError("affinity needs at least one CPU set")
+    return [cpu_sets[slot % len(cpu_sets)] for slot in range(n_slots)]
+
+
+def pin(pid: int, cpus: Optional[Set[int]]) -> None:
+    if cpus is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(pid, cpus)
@@ -0,0 +1,95 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class AutoTune:
+    """
+    Settings for tuning the number of active workers while a job runs.
+
+    Throughput is measured over windows of ``interval`` seconds. A new worker count
+    only counts as better when it beats the best one by more than ``tolerance``
+    (relative), so ties settle on fewer workers.
+    """
+
+    min_workers: int = 1
+    max_workers: Optional[int] = None  # Defaults to os.cpu_count()
+    memory_budget: Optional[int] = None  # Bytes for all workers together
+    interval: float = 2.0
+    tolerance: float = 0.05
+
+    def upper_bound(self) -> int:
+        return self.max_workers or os.cpu_count() or 1
+
+
+class WorkerCountTuner:
+    """
+    Hill-climbs the worker count on measured throughput.
+
+    Starting from the initial count it adds workers while each one improves
+    throughput, then probes one below the best count, and settles on the best
+    count it has seen. ``observe`` is fed the pool's running total of completed
+    items and returns a new count whenever the pool should be resized.
+    """
+
+    def __init__(self, spec: AutoTune, initial: int):
+        self.spec = spec
+        self.current = max(spec.min_workers, min(initial, spec.upper_bound()))
+        self.history: Dict[int, float] = {}
+        self.best_workers = self.current
+        self.best_throughput = 0.0
+        self.converged = False
+        self._direction = 1
+        self._window: Optional[tuple] = None
+
+    def _upper(self, rss_per_worker: Optional[float]) -> int:
+        upper = self.spec.upper_bound()
+        if self.spec.memory_budget is not None and rss_per_worker:
+            upper = min(upper, int(self.spec.memory_budget // rss_per_worker))
+        return max(self.spec.min_workers, upper)
+
+    def _untried(self, n: int, upper: int) -> bool:
+        return self.spec.min_workers <= n <= upper and n not in self.history
+
+    def _next(self, upper: int) -> int:
+        if self.current == self.best_workers:
+            if self._untried(self.current + self._direction, upper):
+                return self.current + self._direction
+        # Adding workers stopped helping, check that fewer would not do as well
+        if self._direction == 1:
+            self._direction = -1
+            if self._untried(self.best_workers - 1, upper):
+                return self.best_workers - 1
+        self.converged = True
+        return self.best_workers
+
+    def observe(self, completed: int, rss_per_worker: Optional[float], now: float) -> Optional[int]:
+        """Record progress, returns the worker count to switch to, if it changes."""
+        if self._window is None:
+            self._window = (now, completed)
+            return None
+        started, completed_before = self._window
+        if now <= started or now - started < self.spec.interval:
+            return None
+        self._window = (now, completed)
+
+        throughput = (completed - completed_before) / (now - started)
+        self.history[self.current] = throughput
+        if self.current == self.best_workers or throughput > self.best_throughput * (1 + self.spec.tolerance):
+            self.best_workers, self.best_throughput = self.current, throughput
+
+        upper = self._upper(rss_per_worker)
+        if self.current > upper:
+            # Over the memory budget, shrink whether or not we have converged
+            self.best_workers = min(self.best_workers, upper)
+            target = upper
+        elif self.converged:
+            return None
+        else:
+            target = self._next(upper)
+
+        if target == self.current:
+            return None
+        self.current = target
+        return target
@@ -1,6 +1,8 @@
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 from .worker_pool import IWorkerPool, WorkerPool
 from .worker import IWorker
+from .affinity import AffinitySpec
+from .resource_limits import ResourceLimit
 
 
 class WorkerPoolFactory:
@@ -17,6 +19,10 @@ class WorkerPoolFactory:
         n_workers: int,
         worker_factory: Callable[[], IWorker],
         worker_timeout: Optional[float] = None,
+        startup_timeout: Optional[float] = None,
+        affinity: AffinitySpec = None,
+        max_workers: Optional[int] = None,
+        resource_limits: Optional[Dict[str, ResourceLimit]] = None,
     ) -> IWorkerPool:
         """
         Create and configure a WorkerPool instance.
@@ -34,6 +40,26 @@ class WorkerPoolFactory:
                         If None, workers will not have a timeout.
                         Defaults to None.
 
+                startup_timeout (Optional[float], optional):
+                        If set, start() waits until every worker reports it is ready,
+                        raising TimeoutError when that takes longer than this many seconds.
+                        Defaults to None (start() returns as soon as workers are launched).
+
+                affinity (AffinitySpec, optional):
+                        CPU placement of workers: Affinity.CORE pins each worker to one CPU,
+                        Affinity.NUMA to one NUMA node, and a sequence of CPU sets is assigned
+                        to slots in order. Replacements keep their slot's placement.
+                        Defaults to None (placement left to the OS).
+
+                max_workers (Optional[int], optional):
+                        Largest size the pool can be resized to while running.
+                        Defaults to None (n_workers).
+
+                resource_limits (Optional[Dict[str, ResourceLimit]], optional):
+                        Rate and concurrency limits per downstream resource name, shared
+                        by every worker of the pool.
+                        Defaults to None (no limits).
+
         Returns:
                 WorkerPool:
                         A fully initialized WorkerPool instance configured with
@@ -43,4 +69,8 @@ class WorkerPoolFactory:
             n_workers=n_workers,
             worker_factory=worker_factory,
             worker_timeout=worker_timeout,
+            startup_timeout=startup_timeout,
+            affinity=affinity,
+            max_workers=max_workers,
+            resource_limits=resource_limits,
         )
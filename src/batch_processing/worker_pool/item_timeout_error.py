@@ -0,0 +1,12 @@
+from typing import Optional
+
+
+class ItemTimeoutError(Exception):
+    def __init__(self, pid: Optional[int], slot: int, task_id: Optional[int], elapsed: float):
+        super().__init__(
+            f"Worker pid={pid} in slot {slot} exceeded the item timeout after {elapsed:.2f}s"
+        )
+        self.pid = pid
+        self.slot = slot
+        self.task_id = task_id
+        self.elapsed = elapsed
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LostTask:
+    """Task a worker was holding when the pool killed or lost that worker."""
+
+    task_id: Optional[int]
+    error: Exception
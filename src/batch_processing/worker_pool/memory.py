@@ -0,0 +1,33 @@
+import os
+import sys
+from typing import Optional
+
+_page_size = 0
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Resident set size of a process in bytes, None if it cannot be read."""
+    global _page_size
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    if not _page_size:
+        # Looked up on first use, sysconf only exists where procfs does
+        _page_size = os.sysconf("SC_PAGE_SIZE")
+    return pages * _page_size
+
+
+def current_rss() -> int:
+    """Resident set size of the calling process in bytes, 0 if it cannot be measured."""
+    rss = process_rss(os.getpid())
+    if rss is not None:
+        return rss
+    try:
+        import resource
+    except ImportError:
+        return 0  # Windows
+    # No procfs: fall back to the peak, which is all getrusage reports (in bytes on macOS, KiB elsewhere)
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
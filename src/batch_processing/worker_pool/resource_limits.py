@@ -0,0 +1,227 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import Lock
+from multiprocessing.sharedctypes import RawArray
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class ResourceLimit:
+    """
+    Limits on calls to one downstream resource, across every worker of a pool.
+
+    ``rate`` calls per second are allowed on average, in bursts of up to ``burst``
+    (defaults to one second's worth). At most ``concurrency`` calls run at once.
+    Either may be None for no limit.
+    """
+
+    rate: Optional[float] = None
+    burst: Optional[float] = None
+    concurrency: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.rate is not None and self.rate <= 0:
+            raise ValueError(f"rate must be positive, got {self.rate}")
+        # A bucket that never holds a whole token would never hand one out
+        if self.burst is not None and self.burst < 1:
+            raise ValueError(f"burst must be at least 1, got {self.burst}")
+        if self.concurrency is not None and self.concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {self.concurrency}")
+
+    def capacity(self) -> float:
+        return self.burst if self.burst is not None else max(1.0, self.rate or 0.0)
+
+
+_current: Optional["ResourceLimits"] = None
+# An update holds a resource's lock for microseconds, one held this long lost its holder
+_STUCK_AFTER = 1.0
+
+
+class ResourceLimits:
+    """
+    Token buckets and concurrency permits per resource name, in shared memory.
+
+    Each resource has its own lock, held only to update its bucket or its permits,
+    so workers using different resources never wait on each other and no process
+    hands them out. Bucket timestamps use ``time.monotonic``, shared by every
+    process on Linux.
+
+    Permits held are counted per worker slot, and those counts are the only record
+    of them: when a worker dies holding some, the pool gives back exactly those with
+    ``reclaim`` before starting its replacement. A worker killed in the middle of an
+    update holds that resource's lock, ``reclaim`` also releases it on its behalf.
+    """
+
+    def __init__(self, limits: Dict[str, ResourceLimit], n_slots: int):
+        self.limits = dict(limits)
+        self._index = {name: i for i, name in enumerate(self.limits)}
+        n = len(self.limits)
+        self._tokens = RawArray("d", [limit.capacity() for limit in self.limits.values()])
+        self._refilled = RawArray("d", [time.monotonic()] * n)
+        self._locks = [Lock() for _ in range(n)]
+        # Row + 1 of the process holding each lock, 0 when free
+        self._owner = RawArray("q", n)
+        # One row per slot plus one for callers not bound to a slot
+        self._n_slots = n_slots
+        self._held = RawArray("q", (n_slots + 1) * n)
+        self._slot = n_slots
+
+    @staticmethod
+    def current() -> Optional["ResourceLimits"]:
+        """The limits of the pool this worker process belongs to, if it has any."""
+        return _current
+
+    def attach(self, slot: int) -> None:
+        """Called in the worker process: count permits under its slot, see current()."""
+        global _current
+        self._slot = slot if slot >= 0 else self._n_slots
+        _current = self
+
+    def _resource(self, name: str) -> int:
+        try:
+            return self._index[name]
+        except KeyError:
+            raise ValueError(f"No limit configured for resource {name!r}") from None
+
+    @contextmanager
+    def _locked(self, i: int) -> Iterator[None]:
+        self._locks[i].acquire()
+        self._owner[i] = self._slot + 1
+        try:
+            yield
+        finally:
+            self._owner[i] = 0
+            self._locks[i].release()
+
+    def _take_token(self, i: int, limit: ResourceLimit, deadline: Optional[float]) -> bool:
+        while True:
+            with self._locked(i):
+                now = time.monotonic()
+                tokens = min(limit.capacity(), self._tokens[i] + (now - self._refilled[i]) * limit.rate)
+                self._refilled[i] = now
+                if tokens >= 1.0:
+                    self._tokens[i] = tokens - 1.0
+                    return True
+                self._tokens[i] = tokens
+            wait = (1.0 - tokens) / limit.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def _take_permit(self, i: int, limit: ResourceLimit, deadline: Optional[float]) -> bool:
+        at = self._slot * len(self._index) + i
+        pause = 0.0005
+        while True:
+            with self._locked(i):
+                if self._in_use(i) < limit.concurrency:
+                    self._held[at] += 1
+                    return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                pause = min(pause, remaining)
+            time.sleep(pause)
+            pause = min(2 * pause, 0.01)
+
+    def acquire(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Take a concurrency permit and a rate token for ``name``, waiting up to ``timeout``."""
+        i = self._resource(name)
+        limit = self.limits[name]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if limit.concurrency is not None and not self._take_permit(i, limit, deadline):
+            return False
+        if limit.rate is not None and not self._take_token(i, limit, deadline):
+            self.release(name)
+            return False
+        return True
+
+    def release(self, name: str) -> None:
+        """Give back the concurrency permit taken by acquire(); tokens are not returned."""
+        i = self._resource(name)
+        if self.limits[name].concurrency is None:
+            return
+        at = self._slot * len(self._index) + i
+        with self._locked(i):
+            if self._held[at] == 0:
+                raise ValueError(f"Resource {name!r} released more times than acquired")
+            self._held[at] -= 1
+
+    def acquire_all(self, names: Sequence[str], timeout: Optional[float] = None) -> None:
+        """
+        Acquire several resources, raising TimeoutError if one is not available in time.
+
+        Names should be given in the same order everywhere, e.g. sorted, so two callers
+        never each hold what the other waits for.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken: List[str] = []
+        for name in names:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self.acquire(name, remaining):
+                self.release_all(taken)
+                raise TimeoutError(f"Resource {name!r} not available after {timeout}s")
+            taken.append(name)
+
+    def release_all(self, names: Sequence[str]) -> None:
+        for name in reversed(names):
+            self.release(name)
+
+    @contextmanager
+    def hold(self, *names: str, timeout: Optional[float] = None) -> Iterator[None]:
+        names = sorted(set(names))
+        self.acquire_all(names, timeout)
+        try:
+            yield
+        finally:
+            self.release_all(names)
+
+    def _in_use(self, i: int) -> int:
+        n = len(self._index)
+        return sum(self._held[row * n + i] for row in range(self._n_slots + 1))
+
+    def in_use(self, name: str) -> int:
+        """Concurrency permits of ``name`` currently held."""
+        return self._in_use(self._resource(name))
+
+    def tokens(self, name: str) -> float:
+        """Rate tokens of ``name`` available now."""
+        i = self._resource(name)
+        limit = self.limits[name]
+        if limit.rate is None:
+            return float("inf")
+        with self._locked(i):
+            elapsed = time.monotonic() - self._refilled[i]
+            return min(limit.capacity(), self._tokens[i] + elapsed * limit.rate)
+
+    def reclaim(self, slot: int) -> int:
+        """
+        Release the permits still held under a slot whose worker is gone, returns how many.
+
+        Called by the parent, for a worker that is known dead: multiprocessing locks
+        can be released by any process.
+        """
+        n = len(self._index)
+        reclaimed = 0
+        for i, lock in enumerate(self._locks):
+            if self._owner[i] == slot + 1:
+                # Killed in the middle of an update
+                self._owner[i] = 0
+                lock.release()
+            while not lock.acquire(timeout=_STUCK_AFTER):
+                if self._owner[i] == 0:
+                    # Taken without an owner recorded: killed right after acquiring it
+                    # or right before releasing it
+                    try:
+                        lock.release()
+                    except ValueError:
+                        pass  # Free again meanwhile
+            at = slot * n + i
+            reclaimed += self._held[at]
+            self._held[at] = 0
+            lock.release()
+        return reclaimed
@@ -0,0 +1,88 @@
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import Optional
+
+
+class SlotTable:
+    """
+    Per-slot worker state in shared memory, written by workers and read by the parent.
+
+    Each slot holds the id of the task being worked on, the monotonic time the work
+    started (``IDLE`` when not working), how many items it has taken and completed
+    and whether the worker finished initialising.
+    Every slot has a single writer, the worker bound to it, so no lock is needed.
+
+    The recycle state is the exception: the worker moves it to ``RECYCLE`` when it
+    wants to be replaced and the pool moves it to ``RETIRE`` once the replacement
+    is up, telling the worker to exit after its current item.
+    """
+
+    IDLE = 0.0
+    NO_TASK = -1
+    RUNNING, RECYCLE, RETIRE = 0, 1, 2
+
+    def __init__(self, n_slots: int):
+        self._started_at = RawArray("d", n_slots)
+        self._task_ids = RawArray("q", [self.NO_TASK] * n_slots)
+        self._ready = RawArray("b", n_slots)
+        self._recycle = RawArray("b", n_slots)
+        self._completed = RawArray("q", n_slots)
+        self._taken = RawArray("q", n_slots)
+
+    def __len__(self) -> int:
+        return len(self._started_at)
+
+    def reset(self, slot: int) -> None:
+        # Taken and completed counts carry over to the next worker in the slot
+        self._started_at[slot] = self.IDLE
+        self._task_ids[slot] = self.NO_TASK
+        self._ready[slot] = 0
+        self._recycle[slot] = self.RUNNING
+
+    def mark_ready(self, slot: int) -> None:
+        self._ready[slot] = 1
+
+    def is_ready(self, slot: int) -> bool:
+        return bool(self._ready[slot])
+
+    def take(self, slot: int, task_id: Optional[int] = None) -> None:
+        # The id is recorded from here on, a worker killed before starting the item still has it
+        self._task_ids[slot] = self.NO_TASK if task_id is None else task_id
+        self._taken[slot] += 1
+
+    def taken(self) -> int:
+        """Items taken off the input queue across all slots, including those skipped."""
+        return sum(self._taken)
+
+    def begin(self, slot: int, task_id: Optional[int]) -> None:
+        self._task_ids[slot] = self.NO_TASK if task_id is None else task_id
+        self._started_at[slot] = time.monotonic()
+
+    def end(self, slot: int) -> None:
+        self._started_at[slot] = self.IDLE
+        self._task_ids[slot] = self.NO_TASK
+        self._completed[slot] += 1
+
+    def completed(self) -> int:
+        """Items finished (successfully or not) across all slots."""
+        return sum(self._completed)
+
+    def started_at(self, slot: int) -> float:
+        return self._started_at[slot]
+
+    def task_id(self, slot: int) -> Optional[int]:
+        task_id = self._task_ids[slot]
+        return None if task_id == self.NO_TASK else task_id
+
+    def request_recycle(self, slot: int) -> None:
+        if self._recycle[slot] == self.RUNNING:
+            self._recycle[slot] = self.RECYCLE
+
+    def recycle_requested(self, slot: int) -> bool:
+        return self._recycle[slot] == self.RECYCLE
+
+    def retire(self, slot: int) -> None:
+        self._recycle[slot] = self.RETIRE
+
+    def should_retire(self, slot: int) -> bool:
+        return self._recycle[slot] == self.RETIRE
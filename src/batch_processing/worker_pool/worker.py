@@ -1,11 +1,38 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from typing import Optional, Set, TypeVar
+from .affinity import pin
+from .resource_limits import ResourceLimits
+from .slot_table import SlotTable
 
 I = TypeVar("I")
 O = TypeVar("O")
 
 
 class IWorker(ABC):
+    slot: int = -1
+    slots: Optional[SlotTable] = None
+    limits: Optional[ResourceLimits] = None
+    cpus: Optional[Set[int]] = None
+
+    def bind(
+        self,
+        slot: int,
+        slots: SlotTable,
+        limits: Optional[ResourceLimits] = None,
+        cpus: Optional[Set[int]] = None,
+    ) -> None:
+        """Called by the pool before the worker process starts."""
+        self.slot = slot
+        self.slots = slots
+        self.limits = limits
+        self.cpus = cpus
+
+    def run(self) -> None:
+        """Entry point of the worker process."""
+        # Pinned from inside the process before anything runs, so every thread it starts inherits the CPU set
+        pin(0, self.cpus)
+        self.target()
+
     @abstractmethod
     def target(self) -> None:
         pass
@@ -1,5 +1,8 @@
+from typing import Optional
+
+
 class WorkerFatalError(Exception):
-    def __init__(self, pid: int | None, exitcode: int | None):
+    def __init__(self, pid: Optional[int], exitcode: Optional[int]):
         super().__init__(f"Worker pid={pid} died with exitcode={exitcode}")
         self.pid = pid
         self.exitcode = exitcode
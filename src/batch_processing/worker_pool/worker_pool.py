@@ -1,9 +1,17 @@
 from abc import ABC, abstractmethod
+import time
 from multiprocessing import Process
+from multiprocessing.connection import wait
 from threading import Lock
-from typing import Callable, Optional, List
+from typing import Callable, Collection, Dict, Optional, List, Tuple
 from .worker import IWorker
 from .worker_fatal_error import WorkerFatalError
+from .item_timeout_error import ItemTimeoutError
+from .lost_task import LostTask
+from .slot_table import SlotTable
+from .resource_limits import ResourceLimit, ResourceLimits
+from .affinity import AffinitySpec, plan_affinity
+from .memory import process_rss
 
 class IWorkerPool(ABC):
 	@abstractmethod
@@ -19,13 +27,70 @@ class IWorkerPool(ABC):
 		pass
 
 	@abstractmethod
-	def restart_dead(self) -> int:
+	def restart_dead(self, crashed_only: bool = False) -> int:
 		pass
 
 	@abstractmethod
 	def fatal_errors(self) -> List[WorkerFatalError]:
 		pass
 
+	@abstractmethod
+	def alive_workers(self) -> int:
+		pass
+
+	@abstractmethod
+	def evict_overdue(self, item_timeout: float) -> List[ItemTimeoutError]:
+		pass
+
+	@abstractmethod
+	def lost_tasks(self) -> List[LostTask]:
+		pass
+
+	@abstractmethod
+	def recycle(self) -> int:
+		pass
+
+	@abstractmethod
+	def resize(self, n_workers: int) -> None:
+		pass
+
+	@abstractmethod
+	def size(self) -> int:
+		pass
+
+	@abstractmethod
+	def completed_items(self) -> int:
+		pass
+
+	@abstractmethod
+	def taken_items(self) -> int:
+		pass
+
+	@abstractmethod
+	def worker_rss(self) -> Optional[float]:
+		pass
+
+	@abstractmethod
+	def in_flight(self) -> List[Tuple[Optional[int], float]]:
+		pass
+
+	@abstractmethod
+	def cancel_tasks(self, task_ids: Collection[int]) -> List[int]:
+		pass
+
+
+def _wait_exit(processes: List[Process], timeout: Optional[float]) -> List[Process]:
+	"""Wait on all process sentinels at once, return the ones still alive at the deadline."""
+	deadline = None if timeout is None else time.monotonic() + timeout
+	alive = [p for p in processes if p.is_alive()]
+	while alive:
+		remaining = None if deadline is None else deadline - time.monotonic()
+		if remaining is not None and remaining <= 0:
+			break
+		wait([p.sentinel for p in alive], remaining)
+		alive = [p for p in alive if p.is_alive()]
+	return alive
+
 
 class WorkerPool(IWorkerPool):
 	def __init__(
@@ -33,47 +98,119 @@ class WorkerPool(IWorkerPool):
 		n_workers: int,
 		worker_factory: Callable[[], IWorker],
 		worker_timeout: Optional[float],
+		startup_timeout: Optional[float] = None,
+		kill_timeout: float = 1.0,
+		affinity: AffinitySpec = None,
+		max_workers: Optional[int] = None,
+		resource_limits: Optional[Dict[str, ResourceLimit]] = None,
 	):
 		self._n_workers = n_workers
+		# Upper bound for resize(), slot table and placement are sized for it
+		self._max_workers = max(n_workers, max_workers or n_workers)
 		self._worker_factory = worker_factory
 		self._timeout = worker_timeout
+		self._startup_timeout = startup_timeout
+		self._kill_timeout = kill_timeout
 		self._workers: List[Process] = []
+		# Worker i alternates between slots i and i + max_workers across recycles,
+		# so a replacement never shares a slot with the worker it replaces
+		self._worker_slots: List[int] = []
+		self._incoming: Dict[int, Tuple[Process, int]] = {}
+		self._retiring: List[Tuple[Process, int]] = []
 		self._lock = Lock()
 		self._started = False
+		self._lost: List[LostTask] = []
+		self.slots = SlotTable(2 * self._max_workers)
+		self.limits = ResourceLimits(resource_limits, len(self.slots)) if resource_limits else None
+		# Decided once per slot so a replacement worker runs where its predecessor did
+		self._affinity = plan_affinity(affinity, self._max_workers)
 
-	def _spawn(self) -> Process:
+	def _spawn(self, slot: int) -> Process:
 		worker = self._worker_factory()
-		p = Process(target=worker.target)
+		worker.bind(slot, self.slots, self.limits, self._affinity[slot % self._max_workers])
+		if self.limits is not None:
+			# Permits the slot's previous worker died holding
+			self.limits.reclaim(slot)
+		self.slots.reset(slot)
+		p = Process(target=worker.run)
 		p.start()
 		return p
 
+	def _record_lost(self, slot: int, error: Exception) -> None:
+		# Only tracked tasks can be recovered, untracked items are not recorded
+		task_id = self.slots.task_id(slot)
+		if task_id is not None:
+			self._lost.append(LostTask(task_id, error))
+
+	def _wait_ready(self, timeout: float) -> None:
+		deadline = time.monotonic() + timeout
+		while True:
+			waiting = [
+				(p, slot) for p, slot in zip(self._workers, self._worker_slots)
+				if p.is_alive() and not self.slots.is_ready(slot)
+			]
+			if not waiting:
+				return
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				slots = [slot for _, slot in waiting]
+				raise TimeoutError(f"Workers in slots {slots} not ready after {timeout}s")
+			# Wake up early if a worker dies during its initialisation
+			wait([p.sentinel for p, _ in waiting], min(remaining, 0.005))
+
+	def _processes(self) -> List[Tuple[Process, int]]:
+		"""Every process owned by the pool with its slot, including recycle overlaps."""
+		return (
+			list(zip(self._workers, self._worker_slots))
+			+ list(self._incoming.values())
+			+ self._retiring
+		)
+
 	def start(self) -> None:
 		with self._lock:
 			if self._started:
 				raise RuntimeError("WorkerPool already started")
-			self._workers = [self._spawn() for _ in range(self._n_workers)]
+			# Process.start() does not wait for the child, so workers initialise concurrently
+			self._worker_slots = list(range(self._n_workers))
+			self._workers = [self._spawn(slot) for slot in self._worker_slots]
 			self._started = True
 
+		if self._startup_timeout is not None:
+			try:
+				self._wait_ready(self._startup_timeout)
+			except TimeoutError:
+				self.cleanup()
+				raise
+
 	def stop(self) -> None:
 		with self._lock:
-			for p in self._workers:
-				p.join(timeout=self._timeout)
+			_wait_exit([p for p, _ in self._processes()], self._timeout)
 
 	def cleanup(self) -> None:
 		with self._lock:
-			for p in self._workers:
-				if p.is_alive():
-					p.terminate()
+			alive = [p for p, _ in self._processes() if p.is_alive()]
+			for p in alive:
+				p.terminate()
+			for p in _wait_exit(alive, self._kill_timeout):
+				p.kill()
+			for p in alive:
+				p.join()
 			self._workers.clear()
+			self._worker_slots.clear()
+			self._incoming.clear()
+			self._retiring.clear()
 			self._started = False
 
-	def restart_dead(self) -> int:
+	def restart_dead(self, crashed_only: bool = False) -> int:
+		"""Replace the workers that exited, with ``crashed_only`` only those that did not exit cleanly."""
 		with self._lock:
-			alive = [p for p in self._workers if p.is_alive()]
-			dead = self._n_workers - len(alive)
-			self._workers = alive
-			for _ in range(dead):
-				self._workers.append(self._spawn())
+			dead = 0
+			for i, p in enumerate(self._workers):
+				if not p.is_alive() and not (crashed_only and p.exitcode == 0):
+					slot = self._worker_slots[i]
+					self._record_lost(slot, WorkerFatalError(p.pid, p.exitcode))
+					self._workers[i] = self._spawn(slot)
+					dead += 1
 			return dead
 
 	def fatal_errors(self) -> List[WorkerFatalError]:
@@ -82,3 +219,171 @@ class WorkerPool(IWorkerPool):
 			for p in self._workers
 			if p.exitcode not in (None, 0)
 		]
+
+	def alive_workers(self) -> int:
+		return sum(1 for p, _ in self._processes() if p.is_alive())
+
+	def evict_overdue(self, item_timeout: float) -> List[ItemTimeoutError]:
+		"""Kill and replace every worker that has been on its current item too long."""
+		errors = []
+		with self._lock:
+			now = time.monotonic()
+			for p, slot in self._processes():
+				started_at = self.slots.started_at(slot)
+				if started_at == SlotTable.IDLE or now - started_at < item_timeout:
+					continue
+
+				p.kill()
+				p.join()
+				error = ItemTimeoutError(p.pid, slot, self.slots.task_id(slot), now - started_at)
+				self._record_lost(slot, error)
+				errors.append(error)
+				self._replace_killed(p, slot)
+		return errors
+
+	def _replace_killed(self, p: Process, slot: int) -> None:
+		if p in self._workers:
+			i = self._workers.index(p)
+			self._workers[i] = self._spawn(slot)
+		# A killed replacement is spawned again by recycle(), a retiring worker is not
+		self._incoming = {i: e for i, e in self._incoming.items() if e[0] is not p}
+		self._retiring = [e for e in self._retiring if e[0] is not p]
+
+	def in_flight(self) -> List[Tuple[Optional[int], float]]:
+		"""Task id (None if untracked) and seconds spent so far of every item being worked on."""
+		now = time.monotonic()
+		busy = []
+		with self._lock:
+			for _, slot in self._processes():
+				started_at = self.slots.started_at(slot)
+				if started_at != SlotTable.IDLE:
+					busy.append((self.slots.task_id(slot), now - started_at))
+		return busy
+
+	def cancel_tasks(self, task_ids: Collection[int]) -> List[int]:
+		"""
+		Kill and replace the workers busy with any of these tracked tasks.
+
+		Meant for work whose result is no longer needed, e.g. the losing copy of a task
+		run twice. Returns the ids of the other tasks killed workers had just taken
+		instead: they did not fail, the caller queues them again.
+		"""
+		displaced = []
+		with self._lock:
+			for p, slot in self._processes():
+				if self.slots.task_id(slot) not in task_ids or not p.is_alive():
+					continue
+				p.kill()
+				p.join()
+				task_id = self.slots.task_id(slot)
+				if task_id is not None and task_id not in task_ids:
+					displaced.append(task_id)
+				self._replace_killed(p, slot)
+		return displaced
+
+	def lost_tasks(self) -> List[LostTask]:
+		with self._lock:
+			lost, self._lost = self._lost, []
+		return lost
+
+	def _retire(self, p: Process, slot: int) -> None:
+		self.slots.retire(slot)
+		self._retiring.append((p, slot))
+
+	def _grow(self) -> None:
+		if not self._started:
+			return
+		busy = {slot for _, slot in self._retiring}
+		while len(self._workers) < self._n_workers:
+			i = len(self._workers)
+			free = [slot for slot in (i, i + self._max_workers) if slot not in busy]
+			if not free:
+				return  # Both slots still held by retiring workers, recycle() grows later
+			self._worker_slots.append(free[0])
+			self._workers.append(self._spawn(free[0]))
+
+	def _reap_retiring(self) -> None:
+		still_running = []
+		for p, slot in self._retiring:
+			if p.is_alive():
+				still_running.append((p, slot))
+				continue
+			if p.exitcode != 0:
+				self._record_lost(slot, WorkerFatalError(p.pid, p.exitcode))
+			p.join()
+		self._retiring = still_running
+
+	def recycle(self) -> int:
+		"""
+		Replace the workers that asked to be recycled, returns how many were retired.
+
+		The replacement is started in the worker's spare slot while the old worker keeps
+		taking items, and only once it is ready is the old one told to exit after its
+		current item, so capacity never drops. Meant to be called periodically.
+		"""
+		retired = 0
+		with self._lock:
+			self._reap_retiring()
+			self._grow()
+			for i, p in enumerate(self._workers):
+				slot = self._worker_slots[i]
+				if i not in self._incoming:
+					spare = (slot + self._max_workers) % len(self.slots)
+					spare_busy = any(s == spare for _, s in self._retiring)
+					if p.is_alive() and self.slots.recycle_requested(slot) and not spare_busy:
+						self._incoming[i] = (self._spawn(spare), spare)
+					continue
+
+				replacement, spare = self._incoming[i]
+				if not replacement.is_alive():
+					# Died while starting, try again on the next call
+					del self._incoming[i]
+					self._record_lost(spare, WorkerFatalError(replacement.pid, replacement.exitcode))
+					replacement.join()
+					continue
+				if not self.slots.is_ready(spare):
+					continue
+
+				del self._incoming[i]
+				self._retire(p, slot)
+				self._workers[i] = replacement
+				self._worker_slots[i] = spare
+				retired += 1
+		return retired
+
+	def resize(self, n_workers: int) -> None:
+		"""
+		Change the number of active workers, between 1 and the pool's max_workers.
+
+		New workers start right away; removed ones are retired and exit after their
+		current item, like recycled workers, and are reaped by recycle().
+		"""
+		n_workers = max(1, min(n_workers, self._max_workers))
+		with self._lock:
+			self._n_workers = n_workers
+			if not self._started:
+				return
+			self._reap_retiring()
+			while len(self._workers) > n_workers:
+				i = len(self._workers) - 1
+				if i in self._incoming:
+					self._retire(*self._incoming.pop(i))
+				self._retire(self._workers.pop(), self._worker_slots.pop())
+			self._grow()
+
+	def size(self) -> int:
+		return self._n_workers
+
+	def completed_items(self) -> int:
+		return self.slots.completed()
+
+	def taken_items(self) -> int:
+		"""Items workers have taken off the input queue, portable unlike Queue.qsize()."""
+		return self.slots.taken()
+
+	def worker_rss(self) -> Optional[float]:
+		"""Mean resident memory of the active workers in bytes, None if unknown."""
+		with self._lock:
+			rss = [process_rss(p.pid) for p in self._workers if p.is_alive()]
+		rss = [r for r in rss if r is not None]
+		return sum(rss) / len(rss) if rss else None
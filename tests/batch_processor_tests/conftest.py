@@ -0,0 +1,21 @@
+import pytest
+
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.configuration import FailurePolicy
+
+
+@pytest.fixture
+def make_processor():
+    """Builds local processors that ignore failures and do not log, unless overridden by keyword."""
+
+    def make(worker, n_workers=2, **config_kwargs):
+        config = BatchProcessorConfig(**{
+            "on_worker_exception": FailurePolicy.IGNORE,
+            "on_worker_death": FailurePolicy.IGNORE,
+            "logging": False,
+            **config_kwargs,
+        })
+        return BatchProcessorFactory().create(n_workers, worker, config)
+
+    return make
@@ -4,9 +4,14 @@ from queue import Empty
 
 from batch_processing.batch_processor.batch_processor import BatchProcessor
 from batch_processing.batch_processor.context import BatchProcessorContext
-from batch_processing.batch_processor.configuration import ProcessorConfig
+from batch_processing.batch_processor.configuration import BatchProcessorConfig, ProcessorConfig, RetryPolicy
 from batch_processing.batch_processor.exception_info import ExceptionInfo
+from batch_processing.batch_processor.factory import BatchProcessorFactory
 from batch_processing.batch_processor.worker_reported_error import WorkerReportedError
+from batch_processing.batch_processor.task import EndOfStream, Task, TaskResult
+from batch_processing.worker_pool.item_timeout_error import ItemTimeoutError
+from batch_processing.worker_pool.lost_task import LostTask
+from batch_processing.worker_pool.worker_fatal_error import WorkerFatalError
 from batch_processing.context import ControlContext
 from batch_processing.configuration import FailurePolicy, SharedConfig
 
@@ -157,4 +162,230 @@ class TestBatchProcessor:
         
         assert processor._fatal_exception is None
         assert not control_ctx.abort_event.is_set()
-        assert not control_ctx.stop_event.is_set()
\ No newline at end of file
+        assert not control_ctx.stop_event.is_set()
+
+    def test_handle_worker_exceptions_retry_exhausted(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        retry_policy = RetryPolicy(on_exhausted=FailurePolicy.IGNORE)
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.RETRY, retry_policy=retry_policy)
+        control_ctx = ControlContext()
+        ctx = BatchProcessorContext(config, control_ctx)
+        exception_info = ExceptionInfo.from_exception(ValueError("error"), "test_item", attempts=3)
+        ctx.error_queue.get_nowait = MagicMock(side_effect=[exception_info, Empty()])
+        processor = BatchProcessor(pool, monitor, ctx)
+
+        processor._handle_worker_exceptions()
+
+        assert processor._fatal_exception is None
+        assert not control_ctx.abort_event.is_set()
+
+    def test_tracked_put_and_get(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.lost_tasks.return_value = []
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+
+        processor.put("test_item")
+        task = ctx.in_queue.get()
+        ctx.out_queue.put(TaskResult(task.id, "result"))
+        ctx.out_queue.put(TaskResult(task.id, "duplicate"))
+
+        assert task == Task(0, "test_item")
+        assert processor.get() == "result"
+        assert processor._pending == {}
+        with pytest.raises(Empty):
+            processor.get_nowait()
+
+    def test_lost_task_reported_with_item(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        processor.put("slow_item")
+        error = ItemTimeoutError(123, 0, 0, 2.0)
+        pool.lost_tasks.return_value = [LostTask(0, error)]
+
+        exceptions = processor.poll_exceptions()
+
+        assert len(exceptions) == 1
+        assert exceptions[0].exc_type is ItemTimeoutError
+        assert exceptions[0].item == "slow_item"
+        assert processor._pending == {}
+
+    def test_lost_task_requeued_with_retry_policy(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.RETRY, track_tasks=True)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        processor.put("slow_item")
+        ctx.in_queue.get()
+        pool.lost_tasks.return_value = [LostTask(0, ItemTimeoutError(123, 0, 0, 2.0))]
+
+        assert processor.poll_exceptions() == []
+        assert ctx.in_queue.get(timeout=1) == Task(0, "slow_item")
+
+    def test_lost_task_poison_pill_limit(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True, max_redeliveries=1)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        processor.put("crashing_item")
+        ctx.in_queue.get()
+        pool.lost_tasks.return_value = [LostTask(0, WorkerFatalError(123, -9))]
+
+        assert processor.poll_exceptions() == []
+        assert ctx.in_queue.get(timeout=1) == Task(0, "crashing_item")
+
+        exceptions = processor.poll_exceptions()
+        assert len(exceptions) == 1
+        assert exceptions[0].exc_type is WorkerFatalError
+        assert exceptions[0].attempts == 2
+        assert processor._pending == {}
+
+    def test_drain_collects_results_until_every_marker(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.alive_workers.return_value = 2
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        for item in ["result1", EndOfStream(), "result2", EndOfStream()]:
+            ctx.out_queue.put(item)
+
+        results = processor.drain()
+
+        assert results == ["result1", "result2"]
+        assert isinstance(ctx.in_queue.get(timeout=1), EndOfStream)
+        assert isinstance(ctx.in_queue.get(timeout=1), EndOfStream)
+        monitor.stop.assert_called()
+        pool.cleanup.assert_called_once()
+        assert ctx.stop_event.is_set()
+
+    def test_drain_runs_another_round_for_tasks_lost_meanwhile(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.alive_workers.return_value = 1
+        lost = [[LostTask(0, WorkerFatalError(123, -9))]]
+        pool.lost_tasks.side_effect = lambda: lost.pop() if lost else []
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True, max_redeliveries=1)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        processor.put("item")
+        ctx.in_queue.get(timeout=1)
+        for item in [EndOfStream(), TaskResult(0, "result"), EndOfStream()]:
+            ctx.out_queue.put(item)
+
+        results = processor.drain()
+
+        assert results == ["result"]
+        assert monitor.draining is True
+        pool.restart_dead.assert_called_once_with()
+        assert isinstance(ctx.in_queue.get(timeout=1), EndOfStream)
+        assert ctx.in_queue.get(timeout=1) == Task(0, "item")
+        assert isinstance(ctx.in_queue.get(timeout=1), EndOfStream)
+        assert processor._pending == {}
+
+    def test_stop_with_drain_keeps_results_available(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.alive_workers.return_value = 1
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        ctx.out_queue.put("result")
+        ctx.out_queue.put(EndOfStream())
+
+        processor.stop(drain=True)
+
+        assert processor.get_nowait() == "result"
+        with pytest.raises(Empty):
+            processor.get_nowait()
+
+    def test_cache_hit_skips_workers(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.lost_tasks.return_value = []
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True, cache_size=10, key_fn=str.lower)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+
+        processor.put("URL")
+        task = ctx.in_queue.get(timeout=1)
+        ctx.out_queue.put(TaskResult(task.id, "page"))
+        assert processor.get() == "page"
+
+        processor.put("url")
+        assert ctx.in_queue.empty()
+        assert processor.get_nowait() == "page"
+        assert processor.cache.hits == 1
+
+    def test_cache_keys_items_inside_envelopes(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.lost_tasks.return_value = []
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True, cache_size=10)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+
+        # As queued by IterableBatchProcessor with a checkpoint
+        processor.put(Task(0, "url"))
+        task = ctx.in_queue.get(timeout=1)
+        ctx.out_queue.put(TaskResult(task.id, TaskResult(0, "page")))
+        assert processor.get() == TaskResult(0, "page")
+
+        processor.put(Task(5, "url"))
+        processor.put("url")
+        assert ctx.in_queue.empty()
+        assert processor.get_nowait() == TaskResult(5, "page")
+        assert processor.get_nowait() == "page"
+
+    def test_coalesce_duplicate_in_flight_items(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.lost_tasks.return_value = []
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True, coalesce=True)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+
+        for item in ["a", "a", "b", "a"]:
+            processor.put(item)
+        task_a = ctx.in_queue.get(timeout=1)
+        task_b = ctx.in_queue.get(timeout=1)
+        assert ctx.in_queue.empty()
+        ctx.out_queue.put(TaskResult(task_a.id, "A"))
+        ctx.out_queue.put(TaskResult(task_b.id, "B"))
+
+        assert [processor.get() for _ in range(4)] == ["A", "A", "A", "B"]
+
+        processor.put("a")
+        assert ctx.in_queue.get(timeout=1).item == "a"
+
+    def test_coalesced_items_share_errors(self):
+        pool = MagicMock()
+        monitor = MagicMock()
+        pool.lost_tasks.return_value = []
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE, track_tasks=True, coalesce=True)
+        ctx = BatchProcessorContext(config, ControlContext())
+        processor = BatchProcessor(pool, monitor, ctx)
+        processor.put("a")
+        processor.put("a")
+        task = ctx.in_queue.get(timeout=1)
+        exception_info = ExceptionInfo.from_exception(ValueError("error"), "a", task.id)
+        ctx.error_queue.get_nowait = MagicMock(side_effect=[exception_info, Empty()])
+
+        exceptions = processor.poll_exceptions()
+
+        assert exceptions == [exception_info, exception_info]
+        assert processor._inflight == {}
+
+    def test_existing_monitor_cannot_take_an_item_timeout(self):
+        config = BatchProcessorConfig(FailurePolicy.IGNORE, FailurePolicy.IGNORE, item_timeout=1.0)
+
+        with pytest.raises(ValueError, match="item_timeout"):
+            BatchProcessorFactory().create_from_existing_monitor(MagicMock(), 1, MagicMock(), config)
@@ -0,0 +1,163 @@
+from unittest.mock import patch
+
+import pytest
+
+from batch_processing.batch_processor.batch_worker import BatchWorkerExecutor, IBatchWorker
+from batch_processing.batch_processor.configuration import ProcessorConfig, RetryPolicy
+from batch_processing.batch_processor.context import BatchProcessorContext
+from batch_processing.batch_processor.exception_info import ErrorCapture
+from batch_processing.batch_processor.task import EndOfStream, Task, TaskResult
+from batch_processing.context import ControlContext
+from batch_processing.configuration import FailurePolicy, SharedConfig
+from batch_processing.worker_pool.slot_table import SlotTable
+
+
+class ScriptedWorker(IBatchWorker[int, int]):
+    """Raises the scripted exceptions in order, then doubles items; stops the executor after ``stop_after`` calls."""
+
+    def __init__(self, ctx, errors, stop_after):
+        self.ctx = ctx
+        self.errors = list(errors)
+        self.stop_after = stop_after
+        self.calls = 0
+
+    def work(self, item: int) -> int:
+        self.calls += 1
+        if self.calls >= self.stop_after:
+            self.ctx.stop_event.set()
+        if self.errors:
+            raise self.errors.pop(0)
+        return item * 2
+
+
+def make_ctx(policy, retry_policy=None, **config_kwargs):
+    config = ProcessorConfig(
+        shared=SharedConfig(logging=False),
+        on_worker_exception=policy,
+        retry_policy=retry_policy or RetryPolicy(base_delay=0.0),
+        **config_kwargs,
+    )
+    return BatchProcessorContext(config, ControlContext())
+
+
+def run(ctx, worker):
+    BatchWorkerExecutor(ctx, lambda: worker).target()
+
+
+class TestBatchWorkerExecutor:
+    def test_task_envelope_is_preserved(self):
+        ctx = make_ctx(FailurePolicy.IGNORE)
+        ctx.in_queue.put(Task(7, 21))
+
+        run(ctx, ScriptedWorker(ctx, [], stop_after=1))
+
+        assert ctx.out_queue.get(timeout=1) == TaskResult(7, 42)
+
+    def test_retry_recovers_transient_error(self):
+        ctx = make_ctx(FailurePolicy.RETRY)
+        worker = ScriptedWorker(ctx, [ConnectionError(), ConnectionError()], stop_after=3)
+        ctx.in_queue.put(5)
+
+        run(ctx, worker)
+
+        assert worker.calls == 3
+        assert ctx.out_queue.get(timeout=1) == 10
+        assert ctx.error_queue.empty()
+
+    def test_retry_gives_up_after_max_attempts(self):
+        ctx = make_ctx(FailurePolicy.RETRY, RetryPolicy(max_attempts=2, base_delay=0.0))
+        worker = ScriptedWorker(ctx, [ConnectionError()] * 5, stop_after=2)
+        ctx.in_queue.put(5)
+
+        run(ctx, worker)
+
+        info = ctx.error_queue.get(timeout=1)
+        assert worker.calls == 2
+        assert info.attempts == 2
+        assert info.item == 5
+
+    def test_non_retryable_exception_is_reported_immediately(self):
+        retry_policy = RetryPolicy(base_delay=0.0, retry_on=(ConnectionError,))
+        ctx = make_ctx(FailurePolicy.RETRY, retry_policy)
+        worker = ScriptedWorker(ctx, [ValueError()], stop_after=1)
+        ctx.in_queue.put(5)
+
+        run(ctx, worker)
+
+        info = ctx.error_queue.get(timeout=1)
+        assert worker.calls == 1
+        assert info.exc_type is ValueError
+        assert info.attempts == 1
+
+    @pytest.mark.parametrize("capture, tracebacks", [(ErrorCapture.FULL, 3), (ErrorCapture.COMPACT, 1), (ErrorCapture.ID_ONLY, 1)])
+    def test_repeated_errors_are_logged_without_traceback(self, capture, tracebacks):
+        ctx = make_ctx(FailurePolicy.IGNORE, error_capture=capture)
+        ctx.config.shared.logging = True
+        for i in range(3):
+            ctx.in_queue.put(i)
+
+        with patch("batch_processing.batch_processor.batch_worker.logger") as logger:
+            run(ctx, ScriptedWorker(ctx, [ValueError() for _ in range(3)], stop_after=3))
+
+        assert logger.exception.call_count == tracebacks
+        assert logger.error.call_count == 3 - tracebacks
+
+    def test_resources_without_limits_fail_every_item(self):
+        ctx = make_ctx(FailurePolicy.IGNORE)
+        worker = ScriptedWorker(ctx, [], stop_after=1)
+        worker.resources = ("api",)
+        ctx.in_queue.put(5)
+        ctx.in_queue.put(EndOfStream())
+
+        run(ctx, worker)
+
+        info = ctx.error_queue.get(timeout=1)
+        assert info.exc_type is ValueError
+        assert "'api'" in info.message
+        assert worker.calls == 0
+        assert isinstance(ctx.out_queue.get(timeout=1), EndOfStream)
+
+    def test_retry_delay_is_bounded(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, multiplier=2.0, jitter=0.0)
+
+        assert [policy.delay(n) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+
+    def test_end_of_stream_is_echoed_and_stops_worker(self):
+        ctx = make_ctx(FailurePolicy.IGNORE)
+        ctx.in_queue.put(4)
+        ctx.in_queue.put(EndOfStream())
+
+        run(ctx, ScriptedWorker(ctx, [], stop_after=100))
+
+        assert ctx.out_queue.get(timeout=1) == 8
+        assert isinstance(ctx.out_queue.get(timeout=1), EndOfStream)
+        assert not ctx.stop_event.is_set()
+
+    def test_requests_recycle_after_max_items(self):
+        ctx = make_ctx(FailurePolicy.IGNORE, max_items_per_worker=2)
+        slots = SlotTable(1)
+        executor = BatchWorkerExecutor(ctx, lambda: ScriptedWorker(ctx, [], stop_after=3))
+        executor.bind(0, slots)
+        for item in (1, 2, 3):
+            ctx.in_queue.put(item)
+
+        executor.target()
+
+        # The request does not stop the worker, it keeps going until the pool retires it
+        assert [ctx.out_queue.get(timeout=1) for _ in range(3)] == [2, 4, 6]
+        assert slots.recycle_requested(0)
+        assert slots.taken() == slots.completed() == 3
+
+    def test_retired_worker_exits_before_taking_items(self):
+        ctx = make_ctx(FailurePolicy.IGNORE)
+        slots = SlotTable(1)
+        worker = ScriptedWorker(ctx, [], stop_after=1)
+        executor = BatchWorkerExecutor(ctx, lambda: worker)
+        executor.bind(0, slots)
+        slots.retire(0)
+        ctx.in_queue.put(1)
+
+        executor.target()
+
+        assert worker.calls == 0
+        assert ctx.in_queue.get(timeout=1) == 1
@@ -0,0 +1,168 @@
+import threading
+import time
+
+from batch_processing.batch_processor.batch_worker import BatchWorkerExecutor, IBatchWorker
+from batch_processing.batch_processor.configuration import ProcessorConfig
+from batch_processing.batch_processor.context import BatchProcessorContext
+from batch_processing.batch_processor.deadline_expired_error import DeadlineExpiredError
+from batch_processing.batch_processor.edf_dispatcher import EdfDispatcher
+from batch_processing.batch_processor.task import Task, TaskResult
+from batch_processing.configuration import FailurePolicy, SharedConfig
+from batch_processing.context import ControlContext
+from batch_processing.gen_mp_queue import GenMPQueue
+
+
+class Double(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        return item * 2
+
+
+class Slow(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        if item < 0:
+            time.sleep(0.3)
+        return item
+
+
+class TestWorkerSide:
+    def test_expired_item_is_skipped_and_reported(self):
+        config = ProcessorConfig(shared=SharedConfig(logging=False), on_worker_exception=FailurePolicy.IGNORE)
+        ctx = BatchProcessorContext(config, ControlContext())
+        ctx.in_queue.put(Task(1, 10, time.monotonic() - 1))
+        ctx.in_queue.put(Task(None, 20, time.monotonic() + 60))
+        ctx.in_queue.put(Task(2, 30, time.monotonic() + 60))
+
+        worker = Double()
+        executor = BatchWorkerExecutor(ctx, lambda: worker)
+        original = worker.work
+
+        def work(item):
+            if item == 30:
+                ctx.stop_event.set()
+            return original(item)
+
+        worker.work = work
+        executor.target()
+
+        info = ctx.error_queue.get(timeout=1)
+        assert info.exc_type is DeadlineExpiredError
+        assert info.task_id == 1
+        # An id of None is a deadline only, the result is not wrapped
+        assert ctx.out_queue.get(timeout=1) == 40
+        assert ctx.out_queue.get(timeout=1) == TaskResult(2, 60)
+        assert ctx.error_queue.empty()
+
+
+class TestEdfDispatcher:
+    def test_flush_sends_in_deadline_order_and_expires_late_items(self):
+        in_queue = GenMPQueue()
+        expired = []
+        dispatcher = EdfDispatcher(in_queue, lambda: 1, lambda: 0, lambda entry, deadline: expired.append(entry))
+        now = time.monotonic()
+        dispatcher.push("none", None)
+        dispatcher.push("late", now + 30)
+        dispatcher.push("soon", now + 10)
+        dispatcher.push("past", now - 1)
+
+        dispatcher.flush()
+
+        assert [in_queue.get(timeout=1) for _ in range(3)] == ["soon", "late", "none"]
+        assert expired == ["past"]
+        assert len(dispatcher) == 0
+        # Flushed: later items are not held back
+        dispatcher.push("requeued", now + 5)
+        assert in_queue.get(timeout=1) == "requeued"
+
+    def test_thread_keeps_only_window_items_queued(self):
+        in_queue = GenMPQueue()
+        taken = []
+
+        def take():
+            taken.append(in_queue.get(timeout=1))
+
+        dispatcher = EdfDispatcher(in_queue, lambda: 2, lambda: len(taken), lambda entry, deadline: None)
+        dispatcher.start()
+        for i in range(5):
+            dispatcher.push(i, time.monotonic() + 60)
+        time.sleep(0.1)
+
+        assert len(dispatcher) == 3
+        assert dispatcher.waiting() == 2
+        take()
+        time.sleep(0.1)
+        assert taken == [0]
+        assert len(dispatcher) == 2
+        dispatcher.stop()
+
+    def test_push_blocks_while_heap_is_full(self):
+        in_queue = GenMPQueue(maxsize=2)
+        taken = []
+        dispatcher = EdfDispatcher(in_queue, lambda: 1, lambda: len(taken), lambda entry, deadline: None)
+        dispatcher.start()
+        for i in range(3):
+            dispatcher.push(i, None)  # One sent, two held
+
+        pusher = threading.Thread(target=dispatcher.push, args=(3, None))
+        pusher.start()
+        pusher.join(0.1)
+        assert pusher.is_alive()
+
+        taken.append(in_queue.get(timeout=1))
+        pusher.join(1)
+        assert not pusher.is_alive()
+        dispatcher.stop()
+
+
+class TestBatchProcessorDeadlines:
+    def test_items_run_earliest_deadline_first(self, make_processor):
+        processor = make_processor(Slow, n_workers=1, edf=True)
+        with processor:
+            processor.put(-1)
+            time.sleep(0.1)  # The worker is busy with it, the rest waits in the dispatcher
+            now = time.monotonic()
+            for i in range(5):
+                processor.put(i, deadline=now + 10 - i)
+            results = [processor.get() for _ in range(6)]
+
+        assert results == [-1, 4, 3, 2, 1, 0]
+
+    def test_expired_items_are_reported_apart_from_errors(self, make_processor):
+        processor = make_processor(Slow, n_workers=1, edf=True)
+        with processor:
+            processor.put(-1)
+            time.sleep(0.1)
+            processor.put(1, deadline=time.monotonic() + 0.05)
+            processor.put(2, deadline=time.monotonic() + 60)
+            assert [processor.get(), processor.get()] == [-1, 2]
+
+            expired = processor.expired()
+            assert [info.item for info in expired] == [1]
+            assert expired[0].exc_type is DeadlineExpiredError
+            assert processor.poll_exceptions() == []
+            assert processor.expired_count == 1
+            assert processor.expired() == []
+
+    def test_tracked_expired_task_is_finished(self, make_processor):
+        processor = make_processor(Double, n_workers=1, max_redeliveries=1)
+        with processor:
+            processor.put(1, deadline=time.monotonic() - 1)
+            processor.put(2)
+            assert processor.get() == 4
+            deadline = time.monotonic() + 5
+            while not processor.expired_count and time.monotonic() < deadline:
+                processor.poll_exceptions()
+                time.sleep(0.01)
+
+            assert processor.expired_count == 1
+            assert processor._pending == {}
+            assert processor.expired()[0].task_id is not None
+
+    def test_drain_without_edf_skips_expired(self, make_processor):
+        processor = make_processor(Double, n_workers=1)
+        processor.start()
+        processor.put(1, deadline=time.monotonic() - 1)
+        processor.put(2, deadline=time.monotonic() + 60)
+        processor.put(3)
+
+        assert sorted(processor.drain()) == [4, 6]
+        assert processor.expired_count == 1
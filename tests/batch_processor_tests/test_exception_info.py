@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock
+from queue import Empty
+
+from batch_processing.batch_processor.batch_processor import BatchProcessor
+from batch_processing.batch_processor.configuration import ProcessorConfig
+from batch_processing.batch_processor.context import BatchProcessorContext
+from batch_processing.batch_processor.exception_info import ErrorCapture, ExceptionInfo
+from batch_processing.context import ControlContext
+from batch_processing.configuration import FailurePolicy, SharedConfig
+
+
+def fail(message="bad"):
+    raise ValueError(message)
+
+
+def capture(**kwargs):
+    try:
+        fail(kwargs.pop("message", "bad"))
+    except ValueError as exc:
+        return ExceptionInfo.from_exception(exc, "item", 3, **kwargs)
+
+
+class TestExceptionInfo:
+    def test_full_capture(self):
+        info = capture()
+
+        assert "ValueError: bad" in info.tb
+        assert info.frames is None
+        assert info.item == "item"
+        assert info.format_traceback() == info.tb
+
+    def test_compact_capture_formats_lazily(self):
+        info = capture(capture=ErrorCapture.COMPACT, include_item=False)
+
+        assert info.tb == ""
+        assert info.frames[-1][2] == "fail"
+        assert info.item is None
+        formatted = info.format_traceback()
+        assert 'raise ValueError(message)' in formatted
+        assert formatted.endswith("ValueError: bad\n")
+
+    def test_compact_capture_sends_frames_once_per_signature(self):
+        seen = set()
+        first = capture(capture=ErrorCapture.COMPACT, seen=seen)
+        second = capture(capture=ErrorCapture.COMPACT, seen=seen, message="other")
+
+        assert first.signature == second.signature
+        assert first.frames is not None
+        assert second.frames is None
+        assert second.message == "other"
+
+    def test_id_only_capture(self):
+        info = capture(capture=ErrorCapture.ID_ONLY, include_item=False)
+
+        assert (info.exc_type, info.message, info.tb, info.frames, info.item) == (ValueError, "", "", None, None)
+        assert info.task_id == 3
+        assert info.signature is not None
+
+
+class TestErrorSummary:
+    def test_errors_grouped_by_signature(self):
+        config = ProcessorConfig(shared=SharedConfig(), on_worker_exception=FailurePolicy.IGNORE)
+        ctx = BatchProcessorContext(config, ControlContext())
+        seen = set()
+        infos = [capture(capture=ErrorCapture.COMPACT, seen=seen) for _ in range(3)]
+        try:
+            raise KeyError("other")
+        except KeyError as exc:
+            infos.append(ExceptionInfo.from_exception(exc, "item"))
+        ctx.error_queue.get_nowait = MagicMock(side_effect=infos + [Empty()])
+        processor = BatchProcessor(MagicMock(), MagicMock(), ctx)
+
+        processor.poll_exceptions()
+        summary = processor.error_summary()
+
+        assert [(group.info.exc_type, group.count) for group in summary] == [(ValueError, 3), (KeyError, 1)]
+        assert summary[0].info.frames is not None
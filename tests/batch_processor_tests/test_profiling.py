@@ -0,0 +1,82 @@
+import cProfile
+import os
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.profiling import (
+    ProfileChannel,
+    ProfileMode,
+    ProfileReport,
+    ProfileResult,
+    WorkerProfiler,
+)
+
+
+def hot_loop(n: int) -> int:
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+class Spin(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        return hot_loop(200000) and item
+
+
+def profile_under_load(make_processor, mode, duration=0.3):
+    # Workers not started yet when the profiling time is over are given up on
+    processor = make_processor(Spin, startup_timeout=30.0)
+    with processor:
+        for i in range(60):
+            processor.put(i)
+        result = processor.profile(duration, mode=mode, interval=0.001)
+        # Results that came in while profiling are still served by get()
+        assert sorted(processor.get() for _ in range(60)) == list(range(60))
+    return result
+
+
+def test_cprofile_stats_are_merged_across_workers(make_processor, tmp_path):
+    # Long enough for both workers to acknowledge it on a loaded machine
+    result = profile_under_load(make_processor, ProfileMode.CPROFILE, duration=1.0)
+
+    assert len(set(result.pids)) == 2
+    assert os.getpid() not in result.pids
+    stats = result.stats()
+    assert any(name == "hot_loop" for _, _, name in stats.stats)
+    result.dump_stats(str(tmp_path / "workers.prof"))
+    assert (tmp_path / "workers.prof").stat().st_size > 0
+
+
+def test_sampled_stacks_are_collapsed(make_processor):
+    result = profile_under_load(make_processor, ProfileMode.SAMPLE)
+
+    assert result.stats() is None
+    lines = result.collapsed().splitlines()
+    assert any("hot_loop" in line.split(";")[-1] for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+def test_worker_started_after_the_request_picks_it_up():
+    channel = ProfileChannel(1)
+    request = channel.request([0], ProfileMode.SAMPLE, 0.01, 0.001)
+    WorkerProfiler(channel, 0).poll()
+
+    assert channel.acked(0) == request
+    assert channel.reports.get(timeout=1).request == request
+
+
+def test_result_merges_reports():
+    profile = cProfile.Profile()
+    profile.runcall(hot_loop, 10)
+    profile.create_stats()
+    reports = [
+        ProfileReport(0, 1, 10, ProfileMode.CPROFILE, profile.stats, None),
+        ProfileReport(1, 1, 11, ProfileMode.CPROFILE, profile.stats, None),
+        ProfileReport(2, 1, 12, ProfileMode.SAMPLE, None, {"a;b": 2}),
+        ProfileReport(3, 1, 13, ProfileMode.SAMPLE, None, {"a;b": 3, "a": 1}),
+    ]
+    result = ProfileResult(reports)
+
+    calls = [stat[1] for func, stat in result.stats().stats.items() if func[2] == "hot_loop"]
+    assert calls == [2]
+    assert result.collapsed() == "a;b 5\na 1\n"
@@ -0,0 +1,59 @@
+import pickle
+import time
+from multiprocessing import Process
+
+from batch_processing.batch_processor.result_cache import LRUResultCache, SqliteResultCache
+
+
+def _fill_cache(cache):
+    cache.put("shared", 42)
+
+
+class TestLRUResultCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUResultCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("a") == (True, 1)
+        assert cache.get("b") == (False, None)
+        assert cache.get("c") == (True, 3)
+        assert len(cache) == 2
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_entries_expire(self):
+        cache = LRUResultCache(max_size=10, ttl=0.05)
+        cache.put("a", 1)
+
+        assert cache.get("a") == (True, 1)
+        time.sleep(0.06)
+        assert cache.get("a") == (False, None)
+        assert len(cache) == 0
+
+
+class TestSqliteResultCache:
+    def test_shared_between_processes(self, tmp_path):
+        cache = SqliteResultCache(tmp_path / "cache.db")
+        assert cache.get("shared") == (False, None)
+
+        p = Process(target=_fill_cache, args=(cache,))
+        p.start()
+        p.join()
+
+        assert cache.get("shared") == (True, 42)
+
+    def test_pickled_after_use(self, tmp_path):
+        cache = SqliteResultCache(tmp_path / "cache.db")
+        cache.put("a", 1)
+
+        # As sent to a spawned worker
+        copy = pickle.loads(pickle.dumps(cache))
+        assert copy.get("a") == (True, 1)
+
+    def test_entries_expire(self, tmp_path):
+        cache = SqliteResultCache(tmp_path / "cache.db", ttl=-1.0)
+        cache.put(("tuple", 1), "result")
+
+        assert cache.get(("tuple", 1)) == (False, None)
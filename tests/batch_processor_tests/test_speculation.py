@@ -0,0 +1,172 @@
+import asyncio
+import time
+from functools import partial
+from multiprocessing import Value
+from unittest.mock import MagicMock
+
+import pytest
+
+from batch_processing.batch_processor.batch_processor import BatchProcessor
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import ProcessorConfig
+from batch_processing.batch_processor.exception_info import ExceptionInfo
+from batch_processing.batch_processor.context import BatchProcessorContext
+from batch_processing.batch_processor.speculation import ServiceTimes, SpeculationConfig
+from batch_processing.batch_processor.task import Task, TaskResult
+from batch_processing.configuration import FailurePolicy, SharedConfig
+from batch_processing.context import ControlContext
+from batch_processing.iterable_batch_processor.iterable_batch_processor import IterableBatchProcessor
+
+STRAGGLER = 0
+
+
+class StragglesOnce(IBatchWorker[int, int]):
+    """Only the first copy of the straggler is slow, ``straggled`` is shared by the workers."""
+
+    def __init__(self, straggled):
+        self.straggled = straggled
+
+    def work(self, item: int) -> int:
+        if item == STRAGGLER:
+            with self.straggled.get_lock():
+                first, self.straggled.value = self.straggled.value == 0, 1
+            if first:
+                time.sleep(10)
+        else:
+            time.sleep(0.01)
+        return item
+
+
+def speculated_processor():
+    """A processor over a mocked pool, for driving the settling of speculated tasks by hand."""
+    pool = MagicMock()
+    pool.lost_tasks.return_value = []
+    pool.cancel_tasks.return_value = []
+    config = ProcessorConfig(
+        shared=SharedConfig(),
+        on_worker_exception=FailurePolicy.IGNORE,
+        track_tasks=True,
+        speculation=SpeculationConfig(),
+    )
+    ctx = BatchProcessorContext(config, ControlContext())
+    return BatchProcessor(pool, MagicMock(), ctx), pool, ctx
+
+
+@pytest.fixture
+def make_speculating(make_processor):
+    def make(speculation):
+        return make_processor(
+            partial(StragglesOnce, Value("b", 0)),
+            on_worker_exception=FailurePolicy.ABORT,
+            on_worker_death=FailurePolicy.RESTART,
+            worker_monitoring_frequency=0.1,
+            speculation=speculation,
+        )
+
+    return make
+
+
+class TestServiceTimes:
+    def test_quantile_is_the_upper_bound_of_its_bucket(self):
+        times = ServiceTimes(2)
+        for _ in range(95):
+            times.record(0, 0.01)
+        for _ in range(5):
+            times.record(-1, 1.0)
+
+        assert times.count() == 100
+        assert 0.01 <= times.quantile(0.95) <= 0.0125
+        assert 1.0 <= times.quantile(0.99) <= 1.25
+        assert times.quantile(0.5, min_samples=101) is None
+
+
+class TestSpeculation:
+    def test_straggler_is_duplicated_and_first_copy_wins(self, make_speculating):
+        processor = make_speculating(SpeculationConfig(quantile=0.9, min_samples=10, interval=0.01))
+        job = IterableBatchProcessor(processor, range(30), 30)
+
+        start = time.monotonic()
+        results = asyncio.run(job.process())
+
+        # The losing copy was cancelled, shutdown did not wait for it
+        assert time.monotonic() - start < 5
+        assert sorted(results) == list(range(30))
+        assert processor.speculated_count == 1
+        assert job.exceptions == []
+
+    def test_no_speculation_before_enough_samples(self, make_speculating):
+        processor = make_speculating(SpeculationConfig(min_samples=1000, interval=0.0))
+        processor.start()
+        processor.put(1)
+        assert processor.get() == 1
+        assert processor.speculate() == 0
+        processor.stop()
+
+    def test_queued_items_are_not_counted_as_idle_workers(self):
+        pool = MagicMock()
+        pool.size.return_value = 2
+        pool.in_flight.return_value = [(0, 10.0)]
+        pool.taken_items.return_value = 1
+        config = ProcessorConfig(
+            shared=SharedConfig(),
+            on_worker_exception=FailurePolicy.IGNORE,
+            track_tasks=True,
+            speculation=SpeculationConfig(min_samples=1, interval=0.0),
+        )
+        ctx = BatchProcessorContext(config, ControlContext())
+        ctx.service_times = ServiceTimes(2)
+        ctx.service_times.record(0, 0.01)
+        # Not implemented on macOS, speculation must not need it
+        ctx.in_queue.qsize = MagicMock(side_effect=NotImplementedError)
+        processor = BatchProcessor(pool, MagicMock(), ctx)
+        processor.put("slow")
+        processor.put("queued")
+
+        # One worker on "slow", the other has "queued" waiting for it
+        assert processor.speculate() == 0
+        pool.taken_items.return_value = 2
+        assert processor.speculate() == 1
+        assert [ctx.in_queue.get(timeout=1) for _ in range(3)][-1] == Task(0, "slow")
+
+    def test_task_displaced_by_cancelling_the_loser_is_requeued(self):
+        processor, pool, ctx = speculated_processor()
+        # The worker on the losing copy had moved on to task 1 when it was killed
+        pool.cancel_tasks.return_value = [1]
+        processor.put("slow")
+        processor.put("next")
+        assert [ctx.in_queue.get(timeout=1) for _ in range(2)] == [Task(0, "slow"), Task(1, "next")]
+        processor._speculated.add(0)
+
+        ctx.out_queue.put(TaskResult(0, "done"))
+        assert processor.get() == "done"
+        pool.cancel_tasks.assert_called_once_with([0])
+        assert ctx.in_queue.get(timeout=1) == Task(1, "next")
+        assert processor.poll_exceptions() == []
+
+    def test_error_of_one_copy_waits_for_the_other(self):
+        processor, pool, ctx = speculated_processor()
+        processor.put("flaky")
+        processor._speculated.add(0)
+
+        ctx.error_queue.put(ExceptionInfo(ValueError, "first copy", "", "flaky", task_id=0))
+        time.sleep(0.1)
+        assert processor.poll_exceptions() == []
+        ctx.out_queue.put(TaskResult(0, "done"))
+        assert processor.get() == "done"
+        assert processor.poll_exceptions() == []
+
+    def test_error_once_both_copies_failed(self):
+        processor, pool, ctx = speculated_processor()
+        processor.put("bad")
+        processor._speculated.add(0)
+
+        ctx.error_queue.put(ExceptionInfo(ValueError, "first copy", "", "bad", task_id=0))
+        ctx.error_queue.put(ExceptionInfo(ValueError, "second copy", "", "bad", task_id=0))
+        time.sleep(0.1)
+        assert [info.message for info in processor.poll_exceptions()] == ["second copy"]
+        pool.cancel_tasks.assert_called_once_with([0])
+
+    def test_off_by_default(self, make_speculating):
+        processor = make_speculating(None)
+        assert processor.ctx.service_times is None
+        assert processor.speculate() == 0
@@ -0,0 +1,70 @@
+import json
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.tracing import ITraceHook, Phase, TraceConfig, Tracer
+
+
+class Square(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        return item * item
+
+
+class RecordingHook(ITraceHook):
+    def __init__(self):
+        self.calls = []
+
+    def before(self, phase, task_id):
+        self.calls.append(("before", phase, task_id))
+
+    def after(self, phase, task_id, duration_ns):
+        assert duration_ns >= 0
+        self.calls.append(("after", phase, task_id))
+
+
+def test_ring_keeps_the_latest_events():
+    tracer = Tracer(2, TraceConfig(capacity=3))
+    for task_id in range(5):
+        start = tracer.begin(Phase.WORK, task_id)
+        tracer.end(1, Phase.WORK, start, task_id)
+    tracer.end(tracer.parent_ring, Phase.PUT, tracer.begin(Phase.PUT))
+
+    events = tracer.events()
+    assert [(e.ring, e.task_id) for e in events] == [(1, 2), (1, 3), (1, 4), (2, None)]
+    assert all(e.end_ns >= e.start_ns for e in events)
+    assert tracer.dropped() == 2
+
+
+def test_hooks_wrap_each_phase():
+    hook = RecordingHook()
+    tracer = Tracer(1, TraceConfig(hooks=[hook]))
+    tracer.end(0, Phase.WORK, tracer.begin(Phase.WORK, 7), 7)
+    assert hook.calls == [("before", Phase.WORK, 7), ("after", Phase.WORK, 7)]
+
+
+def test_tracing_is_off_by_default(make_processor):
+    processor = make_processor(Square)
+    assert processor.tracer is None
+
+
+def test_processor_traces_worker_and_parent_phases(make_processor, tmp_path):
+    processor = make_processor(Square, trace=TraceConfig())
+    with processor:
+        for i in range(20):
+            processor.put(i)
+        assert sorted(processor.get() for _ in range(20)) == [i * i for i in range(20)]
+
+    events = processor.tracer.events()
+    counts = {phase: sum(e.phase == phase for e in events) for phase in Phase}
+    assert counts[Phase.WORK] == counts[Phase.OUT_QUEUE_PUT] == counts[Phase.IN_QUEUE_GET] == 20
+    assert counts[Phase.PUT] == counts[Phase.GET] == 20
+    worker_rings = {e.ring for e in events if e.phase == Phase.WORK}
+    assert processor.tracer.parent_ring not in worker_rings
+
+    path = tmp_path / "trace.json"
+    processor.tracer.export_chrome_trace(str(path))
+    trace = json.loads(path.read_text())["traceEvents"]
+    spans = [e for e in trace if e["ph"] == "X"]
+    assert len(spans) == len(events)
+    assert {e["name"] for e in spans} >= {"work", "put", "get", "in_queue_get", "out_queue_put"}
+    names = {e["args"]["name"] for e in trace if e["ph"] == "M"}
+    assert "parent" in names
@@ -0,0 +1,141 @@
+import array
+import asyncio
+import pickle
+from functools import partial
+
+import pytest
+
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.columnar.columnar_worker import (
+    ColumnarBatchWorker,
+    ColumnarSource,
+    IColumnarWorker,
+    concat_batches,
+)
+from batch_processing.columnar.record_batch import ColumnBatch, RecordBatch
+from batch_processing.columnar.shared_columns import SharedColumns
+from batch_processing.configuration import FailurePolicy
+from batch_processing.iterable_batch_processor.iterable_batch_processor import IterableBatchProcessor
+
+
+class Total(IColumnarWorker):
+    def work_batch(self, columns):
+        total = array.array("d", (p * q for p, q in zip(columns["price"], columns["qty"])))
+        return {"total": total}
+
+
+class ArrowLike:
+    """Stands in for a pyarrow array: no buffer protocol, only to_numpy()."""
+
+    def __init__(self, values):
+        self._values = values
+
+    def to_numpy(self):
+        return self._values
+
+
+@pytest.fixture
+def inputs():
+    columns = SharedColumns.from_arrays({
+        "price": array.array("d", [float(i) for i in range(1000)]),
+        "qty": array.array("q", [2] * 1000),
+    })
+    yield columns
+    columns.close()
+    columns.unlink()
+
+
+def run_job(worker_factory, source):
+    # The factory goes to the workers, spawned ones need it picklable: no lambdas
+    config = BatchProcessorConfig(
+        on_worker_exception=FailurePolicy.ABORT,
+        on_worker_death=FailurePolicy.IGNORE,
+        logging=False,
+    )
+    processor = BatchProcessorFactory().create(2, worker_factory, config)
+    return asyncio.run(IterableBatchProcessor(processor, source, len(source)).process())
+
+
+class TestSharedColumns:
+    def test_views_share_the_block(self, inputs):
+        price = inputs.view("price", 10, 13)
+
+        assert list(price) == [10.0, 11.0, 12.0]
+        with pytest.raises(TypeError):
+            price[0] = 0.0
+        assert list(inputs.views(998, 2000)["qty"]) == [2, 2]
+
+    def test_write_checks_format_and_bounds(self):
+        outputs = SharedColumns.allocate({"n": "q"}, 4)
+        outputs.write("n", 2, array.array("q", [5, 6]))
+
+        assert list(outputs.column("n")) == [0, 0, 5, 6]
+        with pytest.raises(ValueError):
+            outputs.write("n", 0, array.array("d", [1.0]))
+        with pytest.raises(IndexError):
+            outputs.write("n", 3, array.array("q", [1, 2]))
+        outputs.close()
+        outputs.unlink()
+
+    def test_columns_need_a_buffer_and_equal_lengths(self):
+        with pytest.raises(ValueError, match="same length"):
+            SharedColumns.from_arrays({"a": array.array("d", [1.0]), "b": array.array("d", [])})
+        with pytest.raises(TypeError):
+            SharedColumns.from_arrays({"a": ["not", "a", "buffer"]})
+
+    @pytest.mark.parametrize("fmt", ["", "dq", "Hi", "x"])
+    def test_only_single_fixed_width_formats_are_allocated(self, fmt):
+        with pytest.raises(ValueError, match="Unsupported"):
+            SharedColumns.allocate({"a": fmt}, 4)
+
+    def test_columns_without_buffer_go_through_to_numpy(self):
+        columns = SharedColumns.from_arrays({"a": ArrowLike(array.array("i", [1, 2, 3]))})
+
+        assert list(columns.column("a")) == [1, 2, 3]
+        # Processes that were not forked attach to the block by name
+        attached = pickle.loads(pickle.dumps(columns))
+        assert list(attached.view("a", 1)) == [2, 3]
+        attached.close()
+        columns.close()
+        columns.unlink()
+
+
+class TestColumnarJob:
+    def test_outputs_are_written_to_shared_memory(self, inputs):
+        outputs = SharedColumns.allocate({"total": "d"}, len(inputs))
+        source = ColumnarSource(inputs, batch_rows=64)
+
+        done = run_job(partial(ColumnarBatchWorker, Total(), inputs, outputs), source)
+
+        assert len(source) == 16
+        assert sorted(batch.start for batch in done) == [batch.start for batch in source]
+        assert list(outputs.column("total")) == [2.0 * i for i in range(1000)]
+        outputs.close()
+        outputs.unlink()
+
+    def test_outputs_returned_by_value_are_joined_in_row_order(self, inputs):
+        batches = run_job(partial(ColumnarBatchWorker, Total(), inputs), ColumnarSource(inputs, batch_rows=300))
+
+        assert all(isinstance(batch, ColumnBatch) for batch in batches)
+        assert list(concat_batches(batches)["total"]) == [2.0 * i for i in range(1000)]
+
+    def test_output_length_must_match_the_batch(self, inputs):
+        class Short(IColumnarWorker):
+            def work_batch(self, columns):
+                return {"total": array.array("d", [0.0])}
+
+        outputs = SharedColumns.allocate({"total": "d"}, len(inputs))
+        with pytest.raises(ValueError, match="rows"):
+            ColumnarBatchWorker(Short(), inputs, outputs).work(RecordBatch(0, 10))
+        outputs.close()
+        outputs.unlink()
+
+
+def test_numpy_views_when_installed(inputs):
+    numpy = pytest.importorskip("numpy")
+    price = inputs.view("price", 0, 5)
+
+    assert isinstance(price, numpy.ndarray)
+    assert not price.flags.writeable
+    assert numpy.shares_memory(price, inputs.view("price"))
@@ -0,0 +1,81 @@
+import threading
+import time
+from multiprocessing import Process
+
+from batch_processing.context import ControlContext
+
+
+class Unpicklable(Exception):
+    def __init__(self, code, detail):
+        super().__init__(f"{code}: {detail}")
+
+
+def set_fatal(ctx, exc):
+    ctx.fatal_exception = exc
+    ctx.abort_event.set()
+
+
+def set_unpicklable(ctx):
+    # Made in the child, a spawned one could not receive it as an argument either
+    set_fatal(ctx, Unpicklable(3, "bad"))
+
+
+def check_summary(ctx, message):
+    exc = ctx.fatal_exception
+    assert type(exc) is RuntimeError and str(exc) == message
+
+
+def test_flags_read_shared_memory():
+    ctx = ControlContext()
+    assert not ctx.stop_event.is_set()
+    ctx.stop_event.set()
+    assert ctx.stop_event.is_set() and ctx.flags[ControlContext.STOP] == 1
+    assert not ctx.abort_event.is_set()
+    ctx.stop_event.clear()
+    assert not ctx.stop_event.is_set()
+
+
+def test_wait_blocks_until_set():
+    ctx = ControlContext()
+    assert not ctx.abort_event.wait(0.01)
+    threading.Timer(0.05, ctx.abort_event.set).start()
+    started = time.monotonic()
+    assert ctx.abort_event.wait(5)
+    assert time.monotonic() - started < 1
+
+
+def test_fatal_exception_set_in_child_reaches_parent():
+    ctx = ControlContext()
+    p = Process(target=set_fatal, args=(ctx, ValueError("from worker")))
+    p.start()
+    p.join(5)
+
+    assert ctx.abort_event.is_set()
+    assert isinstance(ctx.fatal_exception, ValueError)
+    assert str(ctx.fatal_exception) == "from worker"
+
+
+def test_fatal_exception_keeps_identity_in_setting_process():
+    ctx = ControlContext()
+    assert ctx.fatal_exception is None
+    exc = RuntimeError("fatal")
+    ctx.fatal_exception = exc
+    assert ctx.fatal_exception is exc
+    ctx.fatal_exception = None
+    assert ctx.fatal_exception is None
+
+
+def test_unpicklable_or_large_exceptions_are_summarised():
+    ctx = ControlContext(max_exception_size=256)
+    p = Process(target=set_unpicklable, args=(ctx,))
+    p.start()
+    p.join(5)
+    assert type(ctx.fatal_exception) is RuntimeError
+    assert str(ctx.fatal_exception) == "Unpicklable: 3: bad"
+
+    ctx.fatal_exception = ValueError("x" * 1000)
+    # Only other processes see the summary, this one keeps the original object
+    p = Process(target=check_summary, args=(ctx, ("ValueError: " + "x" * 1000)[:128]))
+    p.start()
+    p.join(5)
+    assert p.exitcode == 0
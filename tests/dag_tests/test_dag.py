@@ -0,0 +1,100 @@
+import pytest
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.configuration import FailurePolicy
+from batch_processing.dag import DagFactory, Node
+from batch_processing.gen_mp_queue import FanOutQueue
+
+
+class Load(IBatchWorker[int, bytes]):
+    def work(self, item: int) -> bytes:
+        return bytes(item)
+
+
+class Size(IBatchWorker[bytes, int]):
+    def work(self, item: bytes) -> int:
+        return len(item)
+
+
+class FailEmpty(IBatchWorker[bytes, bool]):
+    def work(self, item: bytes) -> bool:
+        if not item:
+            raise ValueError("empty")
+        return True
+
+
+class Merge(IBatchWorker[dict, tuple]):
+    def work(self, item: dict) -> tuple:
+        return item["size"], item["check"]
+
+
+def ignore_errors():
+    return BatchProcessorConfig(
+        on_worker_exception=FailurePolicy.IGNORE,
+        on_worker_death=FailurePolicy.RESTART,
+        logging=False,
+    )
+
+
+def diamond(**kwargs):
+    return DagFactory().create([
+        Node("merge", Merge, after=("size", "check")),
+        Node("load", Load, buffer_size=4),
+        Node("size", Size, 2, after=("load",), buffer_size=4),
+        Node("check", FailEmpty, after=("load",), buffer_size=4, config=ignore_errors()),
+    ], logging=False, **kwargs)
+
+
+class TestDag:
+    def test_wiring(self):
+        dag = diamond()
+
+        assert list(dag.nodes) == ["load", "size", "check", "merge"]
+        load_out = dag.nodes["load"].ctx.out_queue
+        assert isinstance(load_out, FanOutQueue)
+        assert load_out.queues == [dag.nodes["size"].ctx.in_queue, dag.nodes["check"].ctx.in_queue]
+
+    def test_fan_out_and_join(self):
+        dag = diamond(max_in_flight=8)
+        dag.start()
+        ids = [dag.put(item) for item in range(1, 60)]
+
+        results = dict(dag.drain())
+
+        assert sorted(results) == ids
+        assert all(results[cid] == {"merge": (item, True)} for cid, item in zip(ids, range(1, 60)))
+
+    def test_failed_branch_drops_item(self):
+        dag = diamond()
+        dag.start()
+        failing = dag.put(0)
+        ok = dag.put(3)
+
+        results = dag.drain()
+
+        assert results == [(ok, {"merge": (3, True)})]
+        [info] = dag.poll_exceptions()
+        assert info.task_id == failing
+        assert info.exc_type is ValueError
+
+    def test_several_sinks(self):
+        dag = DagFactory().create([
+            Node("load", Load),
+            Node("size", Size, after=("load",)),
+            Node("check", FailEmpty, after=("load",)),
+        ], logging=False)
+
+        with dag:
+            cid = dag.put(5)
+            assert dag.get() == (cid, {"size": 5, "check": True})
+
+    @pytest.mark.parametrize("nodes", [
+        [],
+        [Node("a", Load), Node("a", Size)],
+        [Node("a", Load, after=("missing",))],
+        [Node("a", Load, after=("b",)), Node("b", Load, after=("a",))],
+    ])
+    def test_invalid_graphs(self, nodes):
+        with pytest.raises(ValueError):
+            DagFactory().create(nodes)
@@ -0,0 +1,128 @@
+import os
+import signal
+import time
+from multiprocessing.connection import Client
+
+import pytest
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.configuration import FailurePolicy
+from batch_processing.distributed import DistributedBatchProcessorFactory, start_local_agents
+
+AUTHKEY = b"test-key"
+
+
+class Double(IBatchWorker[int, tuple]):
+    def work(self, item: int) -> tuple:
+        if item < 0:
+            raise ValueError("negative")
+        return item * 2, os.getppid()
+
+
+class Slow(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        time.sleep(0.05)
+        return item
+
+
+def ignore_errors():
+    return BatchProcessorConfig(
+        on_worker_exception=FailurePolicy.IGNORE,
+        on_worker_death=FailurePolicy.IGNORE,
+        logging=False,
+    )
+
+
+@pytest.fixture
+def processor():
+    processor = DistributedBatchProcessorFactory().create(AUTHKEY, config=ignore_errors())
+    processor.start()
+    agents = []
+    yield processor, agents
+    processor.stop()
+    for agent in agents:
+        agent.join(5)
+        if agent.is_alive():
+            agent.kill()
+
+
+def wait_for_workers(processor, n, timeout=10):
+    deadline = time.time() + timeout
+    while processor.pool.alive_workers() < n:
+        assert time.time() < deadline, "agents did not connect"
+        time.sleep(0.01)
+
+
+def kill_with_workers(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        children = [int(child) for child in f.read().split()]
+    for process in [pid] + children:
+        os.kill(process, signal.SIGKILL)
+
+
+def test_results_come_from_every_agent(processor):
+    processor, agents = processor
+    agents += start_local_agents(processor.pool.address, AUTHKEY, Double, 2, n_workers=1)
+    wait_for_workers(processor, 2)
+
+    for i in range(200):
+        processor.put(i)
+    results = [processor.get() for _ in range(200)]
+
+    assert sorted(r[0] for r in results) == [i * 2 for i in range(200)]
+    assert len({agent for _, agent in results}) == 2
+    assert processor.pool.completed_items() == 200
+    assert processor.pool.taken_items() == 200
+
+
+def test_errors_keep_the_item_and_task_id(processor):
+    processor, agents = processor
+    agents += start_local_agents(processor.pool.address, AUTHKEY, Double, 1, n_workers=1)
+
+    for i in (1, -1, 2):
+        processor.put(i)
+    assert sorted(processor.get()[0] for _ in range(2)) == [2, 4]
+
+    deadline = time.time() + 10
+    errors = []
+    while not errors and time.time() < deadline:
+        errors = processor.poll_exceptions()
+        time.sleep(0.01)
+    assert [(e.exc_type, e.item) for e in errors] == [(ValueError, -1)]
+
+
+def test_drain_waits_for_remote_items(processor):
+    processor, agents = processor
+    agents += start_local_agents(processor.pool.address, AUTHKEY, Slow, 1, n_workers=2)
+    wait_for_workers(processor, 2)
+    for i in range(20):
+        processor.put(i)
+
+    assert sorted(processor.drain()) == list(range(20))
+    for agent in agents:
+        agent.join(5)
+        assert agent.exitcode == 0
+
+
+def test_items_of_a_lost_agent_are_redelivered(processor):
+    processor, agents = processor
+    doomed = start_local_agents(processor.pool.address, AUTHKEY, Slow, 1, n_workers=2)
+    agents += doomed
+    wait_for_workers(processor, 2)
+    for i in range(20):
+        processor.put(i)
+    time.sleep(0.2)
+    kill_with_workers(doomed[0].pid)
+
+    agents += start_local_agents(processor.pool.address, AUTHKEY, Slow, 1, n_workers=2)
+    results = {processor.get() for _ in range(20)}
+
+    assert results == set(range(20))
+
+
+def test_wrong_authkey_is_rejected(processor):
+    processor, _ = processor
+    with pytest.raises(Exception):
+        Client(processor.pool.address, authkey=b"wrong")
+    assert processor.pool.alive_workers() == 0
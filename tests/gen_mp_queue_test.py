@@ -2,7 +2,7 @@ import pytest
 import time
 from queue import Empty, Full
 
-from batch_processing.gen_mp_queue import GenMPQueue
+from batch_processing.gen_mp_queue import FanOutQueue, GenMPQueue
 
 
 def test_queue_starts_empty():
@@ -112,3 +112,45 @@ def test_join_thread_and_cancel_join_thread_do_not_fail():
 
     q.cancel_join_thread()
     q.join_thread()
+
+
+def test_put_sync_is_visible_to_get():
+    q = GenMPQueue[int](maxsize=1)
+    q.put_sync(7)
+
+    assert q.full()
+    with pytest.raises(Full):
+        q.put_sync(8, timeout=0.01)
+    assert q.get(timeout=0.1) == 7
+    assert q.empty()
+
+
+def test_multiprocessing_queue_internals_used_by_put_sync():
+    # put_pickled() and wait() reach into multiprocessing.Queue, fail here first if it changes
+    queue = GenMPQueue()._queue
+
+    assert hasattr(queue._sem, "acquire")
+    assert hasattr(queue, "_wlock")
+    assert hasattr(queue._writer, "send_bytes")
+    assert hasattr(queue._reader, "fileno")
+
+
+def test_fan_out_delivers_to_every_queue():
+    first, second = GenMPQueue[str](), GenMPQueue[str](maxsize=1)
+    fan_out = FanOutQueue([first, second])
+
+    fan_out.put_sync("payload")
+
+    assert first.get(timeout=1) == "payload"
+    assert second.get(timeout=1) == "payload"
+    fan_out.put_sync("again")
+    with pytest.raises(Full):
+        fan_out.put_sync("third", timeout=0.05)
+
+
+def test_wait_returns_queues_with_data():
+    empty, filled = GenMPQueue[int](), GenMPQueue[int]()
+    filled.put_sync(1)
+
+    assert GenMPQueue.wait([empty, filled], timeout=1) == [filled]
+    assert GenMPQueue.wait([empty], timeout=0) == []
@@ -0,0 +1,72 @@
+import mmap
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.input_source.file_range import FileRange
+from batch_processing.input_source.input_source import MmapLineSource
+from batch_processing.input_source.range_worker import LineRangeWorker, iter_range_lines
+
+
+class UpperWorker(IBatchWorker[bytes, bytes]):
+    def work(self, item: bytes) -> bytes:
+        return item.upper()
+
+
+def write_lines(tmp_path, lines):
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"".join(line + b"\n" for line in lines))
+    return path
+
+
+class TestMmapLineSource:
+    def test_ranges_cover_file(self, tmp_path):
+        path = write_lines(tmp_path, [b"a" * 10] * 10)
+        source = MmapLineSource(path, chunk_size=32)
+
+        ranges = list(source)
+
+        assert len(ranges) == len(source) == 4
+        assert ranges[0] == FileRange(str(path), 0, 32)
+        assert sum(r.length for r in ranges) == 110
+
+    def test_empty_file_has_no_ranges(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        source = MmapLineSource(path)
+
+        assert list(source) == []
+        assert len(source) == 0
+
+
+class TestRangeReading:
+    def test_every_line_read_once_for_any_chunk_size(self, tmp_path):
+        lines = [b"x" * n for n in range(1, 30)]
+        path = write_lines(tmp_path, lines)
+
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            for chunk_size in (1, 2, 7, 16, 64, 1024):
+                read = [
+                    line
+                    for r in MmapLineSource(path, chunk_size=chunk_size)
+                    for line in iter_range_lines(buf, r.offset, r.length)
+                ]
+                assert read == lines
+            buf.close()
+
+    def test_last_line_without_newline(self, tmp_path):
+        path = tmp_path / "data.txt"
+        path.write_bytes(b"one\ntwo")
+
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            assert list(iter_range_lines(buf, 0, 3)) == [b"one"]
+            assert list(iter_range_lines(buf, 3, 4)) == [b"two"]
+            buf.close()
+
+    def test_line_range_worker(self, tmp_path):
+        path = write_lines(tmp_path, [b"ab", b"cd", b"ef"])
+        worker = LineRangeWorker(UpperWorker())
+
+        results = [worker.work(r) for r in MmapLineSource(path, chunk_size=4)]
+
+        assert results == [[b"AB", b"CD"], [b"EF"], []]
@@ -0,0 +1,112 @@
+import asyncio
+import pickle
+from unittest.mock import MagicMock
+from queue import Empty
+
+import pytest
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.batch_processor.task import Task, TaskResult
+from batch_processing.configuration import FailurePolicy
+from batch_processing.iterable_batch_processor.checkpoint import Checkpoint
+from batch_processing.iterable_batch_processor.iterable_batch_processor import IterableBatchProcessor
+
+
+def echo_batch_processor(fail: bool = False):
+    """Mock processor that answers every Task with its item doubled."""
+    pending = []
+    batch_processor = MagicMock()
+    batch_processor.__enter__ = MagicMock(return_value=batch_processor)
+    batch_processor.__exit__ = MagicMock(side_effect=RuntimeError("abort") if fail else None)
+    batch_processor.put = MagicMock(side_effect=pending.append)
+
+    def get_nowait():
+        if not pending:
+            raise Empty()
+        task = pending.pop(0)
+        return TaskResult(task.id, task.item * 2)
+
+    batch_processor.get_nowait = MagicMock(side_effect=get_nowait)
+    return batch_processor
+
+
+class Upper(IBatchWorker[str, str]):
+    def work(self, item: str) -> str:
+        return item.upper()
+
+
+class TestCheckpoint:
+    def test_flush_and_load(self, tmp_path):
+        path = tmp_path / "job.ckpt"
+        checkpoint = Checkpoint(path)
+        checkpoint.record(0, "a")
+        checkpoint.record(1, "b")
+        checkpoint.flush()
+        checkpoint.record(5, "c")
+        checkpoint.close()
+
+        restored = Checkpoint(path)
+        assert restored.load() == {0: "a", 1: "b", 5: "c"}
+        assert restored.completed_ranges() == [(0, 2), (5, 6)]
+
+    def test_truncated_frame_is_discarded(self, tmp_path):
+        path = tmp_path / "job.ckpt"
+        checkpoint = Checkpoint(path)
+        checkpoint.record(0, "a")
+        checkpoint.close()
+        with open(path, "ab") as f:
+            f.write(pickle.dumps([(1, "b")])[:-3])
+
+        restored = Checkpoint(path)
+        assert restored.load() == {0: "a"}
+        restored.record(2, "c")
+        restored.close()
+        assert Checkpoint(path).load() == {0: "a", 2: "c"}
+
+
+class TestIterableBatchProcessorCheckpoint:
+    def test_resume_skips_completed_items(self, tmp_path):
+        path = tmp_path / "job.ckpt"
+        first = Checkpoint(path)
+        first.record(0, 0)
+        first.record(1, 2)
+        first.close()
+
+        batch_processor = echo_batch_processor()
+        processor = IterableBatchProcessor(batch_processor, [0, 1, 2, 3], 4, checkpoint=Checkpoint(path))
+
+        result = asyncio.run(processor.process())
+
+        assert result == [0, 2, 4, 6]
+        assert [c.args[0] for c in batch_processor.put.call_args_list] == [Task(2, 2), Task(3, 3)]
+        assert not path.exists()
+
+    def test_failed_run_keeps_progress(self, tmp_path):
+        path = tmp_path / "job.ckpt"
+        batch_processor = echo_batch_processor(fail=True)
+        processor = IterableBatchProcessor(batch_processor, [1, 2, 3], 3, checkpoint=Checkpoint(path))
+
+        with pytest.raises(RuntimeError, match="abort"):
+            asyncio.run(processor.process())
+
+        assert Checkpoint(path).load() == {0: 2, 1: 4, 2: 6}
+
+    @pytest.mark.parametrize("options", [{"cache_size": 10}, {"coalesce": True}])
+    def test_keyed_processor_records_every_index(self, tmp_path, options):
+        path = tmp_path / "job.ckpt"
+        config = BatchProcessorConfig(
+            on_worker_exception=FailurePolicy.ABORT,
+            on_worker_death=FailurePolicy.IGNORE,
+            logging=False,
+            **options,
+        )
+        batch_processor = BatchProcessorFactory().create(1, Upper, config)
+        checkpoint = MagicMock(wraps=Checkpoint(path))
+        processor = IterableBatchProcessor(batch_processor, ["a", "b", "a"], 3, checkpoint=checkpoint)
+
+        result = asyncio.run(processor.process())
+
+        assert sorted(result) == ["A", "A", "B"]
+        assert sorted(c.args for c in checkpoint.record.call_args_list) == [(0, "A"), (1, "B"), (2, "A")]
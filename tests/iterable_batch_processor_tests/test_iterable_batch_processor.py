@@ -1,11 +1,24 @@
 import pytest
 import asyncio
+import os
 from unittest.mock import MagicMock
 from queue import Empty
 
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.exception_info import ExceptionInfo
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.configuration import FailurePolicy
 from batch_processing.iterable_batch_processor.iterable_batch_processor import IterableBatchProcessor
 
 
+class CrashesOnThree(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        if item == 3:
+            os._exit(1)
+        return item
+
+
 class TestIterableBatchProcessor:
     def test_process_full_batch(self):
         # Mock batch processor
@@ -100,4 +113,41 @@ class TestIterableBatchProcessor:
         assert batch_processor.put.call_count == 3
         batch_processor.put.assert_any_call("item1")
         batch_processor.put.assert_any_call("item2")
-        batch_processor.put.assert_any_call("item3")
\ No newline at end of file
+        batch_processor.put.assert_any_call("item3")
+
+    def test_process_counts_failed_items(self):
+        batch_processor = MagicMock()
+        batch_processor.__enter__ = MagicMock(return_value=batch_processor)
+        batch_processor.__exit__ = MagicMock(return_value=None)
+        batch_processor.ctx.abort_event.is_set.return_value = False
+        results = iter(["result1"])
+        def get_nowait():
+            try:
+                return next(results)
+            except StopIteration:
+                raise Empty()
+        batch_processor.get_nowait = MagicMock(side_effect=get_nowait)
+        failure = ExceptionInfo.from_exception(ValueError("bad"), "item2")
+        batch_processor.poll_exceptions = MagicMock(side_effect=[[failure], []])
+
+        processor = IterableBatchProcessor(batch_processor, ["item1", "item2"], 2)
+
+        result = asyncio.run(processor.process())
+
+        assert result == ["result1"]
+        assert processor.exceptions == [failure]
+
+    def test_item_lost_with_a_restarted_worker_settles(self):
+        config = BatchProcessorConfig(
+            on_worker_exception=FailurePolicy.IGNORE,
+            on_worker_death=FailurePolicy.RESTART,
+            worker_monitoring_frequency=0.05,
+            logging=False,
+        )
+        batch_processor = BatchProcessorFactory().create(2, CrashesOnThree, config)
+        processor = IterableBatchProcessor(batch_processor, range(6), 6)
+
+        result = asyncio.run(processor.process())
+
+        assert sorted(result) == [0, 1, 2, 4, 5]
+        assert [info.item for info in processor.exceptions] == [3]
@@ -0,0 +1,189 @@
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.configuration import FailurePolicy
+from batch_processing.logger import (
+    BatchingStreamHandler,
+    LogConfig,
+    RateLimitFilter,
+    logger,
+    queue_logging,
+)
+
+
+class FailOdd(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        if item % 2:
+            raise ValueError(f"odd {item}")
+        return item
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+@pytest.fixture
+def stream():
+    stream = io.StringIO()
+    yield stream
+    queue_logging.stop()
+
+
+def record(msg, created):
+    rec = logging.LogRecord("batch_processing", logging.ERROR, __file__, 1, msg, None, None)
+    rec.created = created
+    return rec
+
+
+def test_import_leaves_root_logger_alone():
+    code = "import logging, batch_processing; print(len(logging.getLogger().handlers))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert out.stdout.strip() == "0"
+
+
+def test_worker_logs_reach_parent_listener_as_json(stream):
+    queue_logging.start(LogConfig(json=True, stream=stream))
+    config = BatchProcessorConfig(FailurePolicy.IGNORE, FailurePolicy.IGNORE)
+    processor = BatchProcessorFactory().create(2, FailOdd, config)
+    processor.start()
+    for i in range(6):
+        processor.put(i)
+    assert sorted(processor.drain()) == [0, 2, 4]
+    queue_logging.stop()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(entries) == 3
+    assert all(entry["message"] == "Worker exception" for entry in entries)
+    assert all("ValueError: odd" in entry["exc"] for entry in entries)
+    assert all(entry["process"] != "MainProcess" for entry in entries)
+
+
+SPAWNED_JOB = """
+import json, multiprocessing, sys
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.configuration import FailurePolicy
+from batch_processing.logger import LogConfig, queue_logging
+from logger_test import FailOdd
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    queue_logging.start(LogConfig(json=True, stream=sys.stdout))
+    config = BatchProcessorConfig(FailurePolicy.IGNORE, FailurePolicy.IGNORE)
+    processor = BatchProcessorFactory().create(2, FailOdd, config)
+    processor.start()
+    for i in range(6):
+        processor.put(i)
+    processor.drain()
+    queue_logging.stop()
+"""
+
+
+def test_spawned_workers_attach_to_the_queue(tmp_path):
+    # Spawned, as on macOS and Windows: workers inherit no handler from the parent
+    script = tmp_path / "job.py"
+    script.write_text(SPAWNED_JOB)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(__file__)] + sys.path))
+    out = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, check=True, env=env, timeout=60)
+
+    entries = [json.loads(line) for line in out.stdout.splitlines()]
+    assert len(entries) == 3
+    assert all(entry["message"] == "Worker exception" for entry in entries)
+
+
+def test_processor_hands_the_queue_to_its_workers(stream):
+    queue_logging.start(LogConfig(stream=stream))
+    config = BatchProcessorConfig(FailurePolicy.IGNORE, FailurePolicy.IGNORE)
+    processor = BatchProcessorFactory().create(1, FailOdd, config)
+    processor.start()
+    processor.stop()
+
+    assert processor.ctx.worker_logging is queue_logging.worker_logging
+    assert processor.ctx.worker_logging.queue is queue_logging.queue
+
+
+def test_repeats_are_dropped_before_they_are_queued(stream):
+    queue_logging.start(LogConfig(stream=stream, max_repeats=2))
+    # Forked workers inherit this handler, spawned ones attach an equal one
+    handler = queue_logging._handler
+    with patch.object(handler, "enqueue", wraps=handler.enqueue) as enqueue:
+        for i in range(5):
+            logger.warning("retrying %d", i)
+        queue_logging.stop()
+
+    assert enqueue.call_count == 3
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[-1].endswith("3 similar messages suppressed: retrying %d")
+
+
+def test_start_keeps_the_level_and_propagation_set_by_the_application(stream):
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+    try:
+        queue_logging.start(LogConfig(stream=stream, level=logging.DEBUG))
+        logger.info("not logged")
+        queue_logging.stop()
+
+        assert stream.getvalue() == ""
+        assert logger.level == logging.WARNING
+        assert not logger.propagate
+    finally:
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+
+def test_restart_keeps_the_queue_and_applies_new_config(stream):
+    queue_logging.start(LogConfig(stream=io.StringIO()))
+    queue_logging.start(LogConfig(json=True, stream=stream))
+    logger.warning("hello %s", "there")
+    queue_logging.stop()
+
+    assert json.loads(stream.getvalue())["message"] == "hello there"
+    assert logger.propagate
+
+
+def test_rate_limit_reports_suppressed_messages():
+    limit = RateLimitFilter(max_repeats=3, window=10.0)
+    passed = [limit.filter(record("failed %s", t)) for t in range(5)]
+    assert passed == [True, True, True, False, False]
+
+    late = record("failed %s", 10)
+    assert limit.filter(late)
+    assert late.getMessage().endswith("(2 similar messages suppressed)")
+    assert limit.filter(record("other", 4))
+
+    limit.filter(record("failed %s", 11))
+    limit.filter(record("failed %s", 12))
+    limit.filter(record("failed %s", 13))
+    [summary] = limit.summaries()
+    assert summary.getMessage() == "1 similar messages suppressed: failed %s"
+    assert limit.summaries() == []
+
+
+def test_batching_handler_writes_once_per_batch():
+    stream = CountingStream()
+    handler = BatchingStreamHandler(stream, batch_size=4)
+    for i in range(10):
+        handler.handle(record(f"line {i}", i))
+    assert stream.writes == 2
+    handler.flush()
+    assert stream.writes == 3
+    assert stream.getvalue().count("\n") == 10
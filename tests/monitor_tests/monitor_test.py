@@ -10,6 +10,8 @@ from batch_processing.monitor.configuration import MonitorConfig
 from batch_processing.context import ControlContext
 from batch_processing.configuration import FailurePolicy, SharedConfig
 from batch_processing.worker_pool.worker_fatal_error import WorkerFatalError
+from batch_processing.worker_pool.item_timeout_error import ItemTimeoutError
+from batch_processing.worker_pool.autotune import AutoTune
 
 
 class TestWorkerMonitor:
@@ -56,7 +58,7 @@ class TestWorkerMonitor:
 		def mock_sleep(_):
 			ctx.stop_event.set()
 		
-		with patch('time.sleep', side_effect=mock_sleep):
+		with patch.object(monitor._halt, 'wait', side_effect=mock_sleep):
 			monitor._loop()
 		
 		assert monitor.events.qsize() == 0
@@ -77,7 +79,7 @@ class TestWorkerMonitor:
 		def mock_sleep(_):
 			ctx.stop_event.set()
 		
-		with patch('time.sleep', side_effect=mock_sleep):
+		with patch.object(monitor._halt, 'wait', side_effect=mock_sleep):
 			monitor._loop()
 		
 		assert monitor.events.qsize() == 1
@@ -101,7 +103,7 @@ class TestWorkerMonitor:
 		def mock_sleep(_):
 			ctx.stop_event.set()
 		
-		with patch('time.sleep', side_effect=mock_sleep):
+		with patch.object(monitor._halt, 'wait', side_effect=mock_sleep):
 			monitor._loop()
 		
 		assert monitor.events.qsize() == 1
@@ -109,4 +111,74 @@ class TestWorkerMonitor:
 		assert event == fatal_error
 		pool.restart_dead.assert_called_once()
 		assert not ctx.abort_event.is_set()
-		assert ctx.stop_event.is_set()
\ No newline at end of file
+		assert ctx.stop_event.is_set()
+
+	def test_loop_evicts_overdue_workers(self):
+		pool = MagicMock()
+		timeout_error = ItemTimeoutError(123, 0, 7, 2.0)
+		pool.evict_overdue.return_value = [timeout_error]
+		config = MonitorConfig(shared=SharedConfig(), on_worker_death=FailurePolicy.IGNORE, item_timeout=1.5)
+		control_ctx = ControlContext()
+		ctx = MonitorContext(config, control_ctx)
+		monitor = WorkerMonitor(pool, ctx)
+		
+		def mock_sleep(_):
+			ctx.stop_event.set()
+		
+		with patch.object(monitor._halt, 'wait', side_effect=mock_sleep):
+			monitor._loop()
+		
+		pool.evict_overdue.assert_called_once_with(1.5)
+		assert monitor.events.get() == timeout_error
+		assert not ctx.abort_event.is_set()
+
+	def test_draining_only_restarts_crashed_workers(self):
+		pool = MagicMock()
+		pool.fatal_errors.return_value = []
+		config = MonitorConfig(shared=SharedConfig(), on_worker_death=FailurePolicy.RESTART, item_timeout=1.5)
+		control_ctx = ControlContext()
+		ctx = MonitorContext(config, control_ctx)
+		monitor = WorkerMonitor(pool, ctx)
+		monitor.draining = True
+		
+		def mock_sleep(_):
+			ctx.stop_event.set()
+		
+		with patch.object(monitor._halt, 'wait', side_effect=mock_sleep):
+			monitor._loop()
+		
+		pool.restart_dead.assert_called_once_with(crashed_only=True)
+		pool.evict_overdue.assert_called_once_with(1.5)
+		pool.recycle.assert_not_called()
+
+	def test_stop_halts_without_stop_event(self):
+		pool = MagicMock()
+		pool.restart_dead.return_value = 0
+		config = MonitorConfig(shared=SharedConfig(), on_worker_death=FailurePolicy.RESTART, worker_monitoring_frequency=10.0)
+		control_ctx = ControlContext()
+		ctx = MonitorContext(config, control_ctx)
+		monitor = WorkerMonitor(pool, ctx)
+		
+		monitor.start()
+		start = time.monotonic()
+		monitor.stop()
+		
+		assert time.monotonic() - start < 1.0
+		assert not monitor._thread.is_alive()
+		assert not ctx.stop_event.is_set()
+
+	def test_autotune_resizes_pool(self):
+		pool = MagicMock()
+		pool.size.return_value = 1
+		pool.worker_rss.return_value = None
+		pool.completed_items.side_effect = [0, 100]
+		config = MonitorConfig(shared=SharedConfig(logging=False), on_worker_death=FailurePolicy.IGNORE, autotune=AutoTune(max_workers=4, interval=0.0))
+		control_ctx = ControlContext()
+		ctx = MonitorContext(config, control_ctx)
+		monitor = WorkerMonitor(pool, ctx)
+		
+		monitor._tune()
+		monitor._tune()
+		
+		pool.resize.assert_called_once_with(2)
+		assert list(monitor.tuner.history) == [1]
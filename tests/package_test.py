@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import batch_processing
+
+
+def loaded_modules(statement):
+    code = f"{statement}; import sys; print(' '.join(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    return set(out.stdout.split())
+
+
+def test_import_is_lazy():
+    modules = loaded_modules("import batch_processing")
+    assert "multiprocessing" not in modules
+    assert not any(name.startswith("batch_processing.") and name != "batch_processing._lazy" for name in modules)
+
+
+def test_factory_import_skips_optional_modules():
+    modules = loaded_modules("from batch_processing import BatchProcessorFactory")
+    assert "batch_processing.batch_processor.factory" in modules
+    for name in ("asyncio", "sqlite3", "cProfile", "batch_processing.dag", "batch_processing.pipeline"):
+        assert name not in modules
+
+
+def test_exports_resolve_on_first_use():
+    from batch_processing.batch_processor.factory import BatchProcessorFactory
+
+    assert batch_processing.BatchProcessorFactory is BatchProcessorFactory
+    assert "BatchProcessorFactory" in vars(batch_processing)
+    assert set(batch_processing.__all__) <= set(dir(batch_processing))
+
+
+def test_star_import_and_unknown_names():
+    namespace = {}
+    exec("from batch_processing import *", namespace)
+    assert set(batch_processing.__all__) <= set(namespace)
+    with pytest.raises(AttributeError):
+        batch_processing.NotAThing
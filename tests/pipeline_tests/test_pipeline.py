@@ -0,0 +1,103 @@
+import pytest
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.configuration import FailurePolicy
+from batch_processing.pipeline import PipelineFactory, Stage
+
+
+class Double(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        return item * 2
+
+
+class FailOdd(IBatchWorker[int, int]):
+    def work(self, item: int) -> int:
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+
+class Payload(IBatchWorker[int, bytes]):
+    def work(self, item: int) -> bytes:
+        return bytes(100_000)
+
+
+class ToStr(IBatchWorker[int, str]):
+    def work(self, item: int) -> str:
+        return str(item)
+
+
+def ignore_errors():
+    return BatchProcessorConfig(
+        on_worker_exception=FailurePolicy.IGNORE,
+        on_worker_death=FailurePolicy.RESTART,
+        logging=False,
+    )
+
+
+class TestPipeline:
+    def test_stages_share_queues(self):
+        pipeline = PipelineFactory().create([Stage(Double, 1, 8), Stage(ToStr, 2, 4)], logging=False)
+
+        first, second = pipeline.stages
+        assert first.ctx.out_queue is second.ctx.in_queue
+        assert first.ctx.control_ctx is second.ctx.control_ctx
+        assert not first.ctx.config.echo_end_of_stream
+
+    def test_drain_returns_every_result(self):
+        pipeline = PipelineFactory().create(
+            [Stage(Double, 2, 4), Stage(Double, 1, 4), Stage(ToStr, 2, 4)], logging=False
+        )
+        pipeline.start()
+        for item in range(200):
+            pipeline.put(item)
+
+        results = pipeline.drain()
+
+        assert sorted(map(int, results)) == [item * 4 for item in range(200)]
+
+    def test_put_does_not_deadlock_on_large_results(self):
+        # The results overflow the pipe of the final queue long before put() returns
+        pipeline = PipelineFactory().create([Stage(Payload, 1, 2), Stage(Payload, 1, 2)], logging=False)
+        pipeline.start()
+        for item in range(100):
+            pipeline.put(item)
+
+        assert len(pipeline.drain()) == 100
+
+    def test_get_through_context_manager(self):
+        with PipelineFactory().create([Stage(Double), Stage(ToStr)], logging=False) as pipeline:
+            for item in range(10):
+                pipeline.put(item)
+            results = sorted(int(pipeline.get()) for _ in range(10))
+
+        assert results == [item * 2 for item in range(10)]
+
+    def test_errors_are_handled_per_stage(self):
+        pipeline = PipelineFactory().create(
+            [Stage(Double), Stage(FailOdd, config=ignore_errors()), Stage(ToStr)], logging=False
+        )
+        pipeline.start()
+        for item in (1, 2):
+            pipeline.put(item)
+            pipeline.put(item + 0.5)
+
+        results = pipeline.drain()
+
+        assert sorted(results) == ["2", "4"]
+        # Errors handled at shutdown are not polled anymore but stay in the summary
+        [group] = pipeline.stages[1].error_summary()
+        assert group.count == 2
+        assert group.info.exc_type is ValueError
+
+    def test_rejects_tracked_stage_config(self):
+        config = ignore_errors()
+        config.item_timeout = 1.0
+
+        with pytest.raises(ValueError):
+            PipelineFactory().create([Stage(Double, config=config)])
+
+    def test_rejects_empty_pipeline(self):
+        with pytest.raises(ValueError):
+            PipelineFactory().create([])
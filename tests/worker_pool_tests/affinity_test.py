@@ -0,0 +1,69 @@
+import os
+import threading
+from multiprocessing import Queue
+from unittest.mock import patch
+
+import pytest
+
+from batch_processing.worker_pool.affinity import Affinity, parse_cpulist, plan_affinity
+from batch_processing.worker_pool.worker_pool import WorkerPool
+from batch_processing.worker_pool.worker import IWorker
+
+
+class ReportingWorker(IWorker):
+    """Reports the CPU sets of its main thread and of a thread it starts."""
+
+    def __init__(self, reported):
+        self.reported = reported
+
+    def target(self):
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(os.sched_getaffinity(0)))
+        thread.start()
+        thread.join()
+        self.reported.put((os.sched_getaffinity(0), seen[0]))
+
+
+TWO_NODES = [{0, 1, 2, 3}, {4, 5, 6, 7}]
+
+
+class TestAffinityPlan:
+    def test_parse_cpulist(self):
+        assert parse_cpulist("0-3,8,10-11\n") == {0, 1, 2, 3, 8, 10, 11}
+        assert parse_cpulist("") == set()
+
+    def test_no_affinity(self):
+        assert plan_affinity(None, 3) == [None, None, None]
+
+    def test_core_alternates_numa_nodes(self):
+        with patch("batch_processing.worker_pool.affinity.numa_nodes", return_value=TWO_NODES):
+            plan = plan_affinity(Affinity.CORE, 4)
+
+        assert plan == [{0}, {4}, {1}, {5}]
+
+    def test_numa_spreads_slots_over_nodes(self):
+        with patch("batch_processing.worker_pool.affinity.numa_nodes", return_value=TWO_NODES):
+            plan = plan_affinity(Affinity.NUMA, 3)
+
+        assert plan == [TWO_NODES[0], TWO_NODES[1], TWO_NODES[0]]
+
+    def test_explicit_cpu_sets_are_cycled(self):
+        assert plan_affinity([[0], [1, 2]], 3) == [{0}, {1, 2}, {0}]
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="requires sched_setaffinity")
+class TestWorkerPoolAffinity:
+    def test_workers_keep_slot_affinity_across_restarts(self):
+        cpu = min(os.sched_getaffinity(0))
+        reported = Queue()
+        pool = WorkerPool(
+            n_workers=2, worker_factory=lambda: ReportingWorker(reported), worker_timeout=1.0, affinity=[[cpu]]
+        )
+        pool.start()
+        assert [reported.get(timeout=5) for _ in range(2)] == [({cpu}, {cpu})] * 2
+
+        pool.stop()
+        pool.restart_dead()
+
+        assert [reported.get(timeout=5) for _ in range(2)] == [({cpu}, {cpu})] * 2
+        pool.cleanup()
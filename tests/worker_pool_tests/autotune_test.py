@@ -0,0 +1,105 @@
+import time
+
+from batch_processing.worker_pool.autotune import AutoTune, WorkerCountTuner
+from batch_processing.worker_pool.worker_pool import WorkerPool
+from batch_processing.worker_pool.worker import IWorker
+
+
+class IdleWorker(IWorker):
+    def target(self):
+        self.slots.mark_ready(self.slot)
+        while not self.slots.should_retire(self.slot):
+            time.sleep(0.01)
+
+
+def run_tuner(tuner, throughput_at, windows=20, rss=None):
+    """Feed the tuner one-second windows whose throughput depends on the worker count."""
+    now, completed = 0.0, 0
+    tuner.observe(completed, rss, now)
+    counts = [tuner.current]
+    for _ in range(windows):
+        now += 1.0
+        completed += throughput_at(tuner.current)
+        tuner.observe(completed, rss, now)
+        counts.append(tuner.current)
+    return counts
+
+
+class TestWorkerCountTuner:
+    def test_climbs_to_peak_and_settles(self):
+        tuner = WorkerCountTuner(AutoTune(max_workers=8, interval=1.0), initial=1)
+        curve = {1: 100, 2: 190, 3: 260, 4: 255, 5: 200}
+
+        counts = run_tuner(tuner, lambda n: curve.get(n, 100))
+
+        assert counts[:5] == [1, 2, 3, 4, 3]
+        assert tuner.converged
+        assert tuner.best_workers == 3
+        assert tuner.best_throughput == 260
+
+    def test_prefers_fewer_workers_within_tolerance(self):
+        tuner = WorkerCountTuner(AutoTune(max_workers=8, interval=1.0, tolerance=0.1), initial=2)
+        curve = {1: 100, 2: 200, 3: 210}
+
+        run_tuner(tuner, lambda n: curve.get(n, 50))
+
+        assert tuner.best_workers == 2
+        assert set(tuner.history) == {1, 2, 3}
+
+    def test_capped_by_max_workers(self):
+        tuner = WorkerCountTuner(AutoTune(max_workers=3, interval=1.0), initial=1)
+
+        counts = run_tuner(tuner, lambda n: 100 * n)
+
+        assert max(counts) == 3
+        assert tuner.best_workers == 3
+
+    def test_memory_budget_shrinks_pool(self):
+        spec = AutoTune(max_workers=8, memory_budget=300, interval=1.0)
+        tuner = WorkerCountTuner(spec, initial=6)
+
+        counts = run_tuner(tuner, lambda n: 100 * n, windows=3, rss=100)
+
+        assert counts[1] == 3
+        assert max(counts[1:]) == 3
+
+    def test_waits_for_full_window(self):
+        tuner = WorkerCountTuner(AutoTune(max_workers=4, interval=5.0), initial=1)
+        tuner.observe(0, None, 0.0)
+
+        assert tuner.observe(100, None, 1.0) is None
+        assert tuner.history == {}
+
+
+class TestWorkerPoolResize:
+    def test_grow_and_shrink(self):
+        pool = WorkerPool(n_workers=1, worker_factory=IdleWorker, worker_timeout=1.0, max_workers=3)
+        pool.start()
+        try:
+            pool.resize(3)
+            assert pool.size() == 3
+            assert pool.alive_workers() == 3
+
+            removed = pool._workers[1:]
+            pool.resize(1)
+            for p in removed:
+                p.join(timeout=2)
+                assert p.exitcode == 0
+            pool.recycle()
+            assert pool.alive_workers() == 1
+
+            pool.resize(10)
+            assert pool.size() == 3
+            assert pool.alive_workers() == 3
+        finally:
+            pool.cleanup()
+
+    def test_completed_items_survive_restarts(self):
+        pool = WorkerPool(n_workers=2, worker_factory=IdleWorker, worker_timeout=1.0)
+        pool.slots.begin(0, None)
+        pool.slots.end(0)
+        pool.slots.reset(0)
+        pool.slots.begin(1, None)
+        pool.slots.end(1)
+
+        assert pool.completed_items() == 2
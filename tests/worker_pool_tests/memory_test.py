@@ -0,0 +1,37 @@
+import importlib
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from batch_processing.worker_pool import memory
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="requires procfs")
+def test_process_rss_reads_procfs():
+    assert memory.process_rss(os.getpid()) > 0
+    assert memory.process_rss(-1) is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires getrusage")
+def test_peak_rss_fallback_is_scaled_to_bytes():
+    with patch.object(memory, "process_rss", return_value=None):
+        with patch.object(memory.sys, "platform", "linux"):
+            in_kib = memory.current_rss()
+        with patch.object(memory.sys, "platform", "darwin"):
+            in_bytes = memory.current_rss()
+
+    assert in_bytes > 0
+    # Same peak, only reported in different units
+    assert in_bytes * 1024 == pytest.approx(in_kib, rel=0.01)
+
+
+def test_imports_without_resource_or_sysconf():
+    # As on Windows: importing resource fails and os has no sysconf
+    with patch.dict(sys.modules, {"resource": None}):
+        with patch.object(memory.os, "sysconf", None, create=True):
+            importlib.reload(memory)
+        with patch.object(memory, "process_rss", return_value=None):
+            assert memory.current_rss() == 0
+    importlib.reload(memory)
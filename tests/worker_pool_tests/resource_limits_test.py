@@ -0,0 +1,170 @@
+import os
+import signal
+import time
+from multiprocessing import Barrier, Process, Value
+
+import pytest
+
+from batch_processing.batch_processor.batch_worker import IBatchWorker
+from batch_processing.batch_processor.configuration import BatchProcessorConfig
+from batch_processing.batch_processor.factory import BatchProcessorFactory
+from batch_processing.configuration import FailurePolicy
+from batch_processing.worker_pool import resource_limits
+from batch_processing.worker_pool.resource_limits import ResourceLimit, ResourceLimits
+from batch_processing.worker_pool.worker import IWorker
+from batch_processing.worker_pool.worker_pool import WorkerPool
+
+
+def take_tokens(limits, n, barrier, started, finished):
+    limits.attach(0)
+    barrier.wait()
+    started.value = time.monotonic()
+    for _ in range(n):
+        limits.acquire("api")
+    finished.value = time.monotonic()
+
+
+def test_token_bucket_is_shared_across_processes():
+    limits = ResourceLimits({"api": ResourceLimit(rate=50, burst=5)}, 1)
+    # Processes start taking tokens together, however long they took to start
+    barrier = Barrier(3)
+    times = [(Value("d", 0.0), Value("d", 0.0)) for _ in range(3)]
+    processes = [Process(target=take_tokens, args=(limits, 10, barrier, *t)) for t in times]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    # 5 tokens up front, the other 25 at 50 per second
+    start = min(started.value for started, _ in times)
+    assert max(finished.value for _, finished in times) - start >= 0.45
+
+
+def hold_api(limits, slot, running, peak):
+    limits.attach(slot)
+    for _ in range(5):
+        with limits.hold("api"):
+            with running.get_lock():
+                running.value += 1
+                peak.value = max(peak.value, running.value)
+            time.sleep(0.01)
+            with running.get_lock():
+                running.value -= 1
+
+
+def test_concurrency_is_capped_across_processes():
+    limits = ResourceLimits({"api": ResourceLimit(concurrency=2)}, 4)
+    running, peak = Value("i", 0), Value("i", 0)
+    processes = [Process(target=hold_api, args=(limits, slot, running, peak)) for slot in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    assert 1 <= peak.value <= 2
+    assert limits.in_use("api") == 0
+
+
+def test_acquire_times_out_and_releases_what_it_took():
+    limits = ResourceLimits({"db": ResourceLimit(concurrency=1), "api": ResourceLimit(concurrency=1)}, 1)
+    assert limits.acquire("api")
+
+    assert not limits.acquire("api", timeout=0.05)
+    with pytest.raises(TimeoutError):
+        limits.acquire_all(["db", "api"], timeout=0.05)
+    assert limits.in_use("db") == 0
+    assert limits.in_use("api") == 1
+
+    with pytest.raises(ValueError, match="cache"):
+        limits.acquire("cache")
+
+
+@pytest.mark.parametrize("limit", [{"rate": 0}, {"rate": 1, "burst": 0.5}, {"concurrency": 0}])
+def test_limits_that_could_never_be_met_are_rejected(limit):
+    with pytest.raises(ValueError):
+        ResourceLimit(**limit)
+
+
+def test_reclaim_gives_back_exactly_the_permits_held():
+    limits = ResourceLimits({"api": ResourceLimit(concurrency=2)}, 1)
+    limits.attach(0)
+    assert limits.acquire("api")
+
+    assert limits.reclaim(0) == 1
+    assert limits.reclaim(0) == 0
+    with pytest.raises(ValueError, match="released more"):
+        limits.release("api")
+    # Never more permits than the limit, however often a slot is reclaimed
+    assert limits.acquire("api") and limits.acquire("api")
+    assert not limits.acquire("api", timeout=0.01)
+    assert limits.in_use("api") == 2
+
+
+def killed_while_updating(limits):
+    limits.attach(0)
+    with limits._locked(0):
+        os.kill(os.getpid(), signal.SIGKILL)
+
+
+def killed_before_recording_the_owner(limits):
+    limits._locks[0].acquire()
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+@pytest.mark.parametrize("die", [killed_while_updating, killed_before_recording_the_owner])
+def test_reclaim_releases_the_lock_of_a_worker_killed_inside_it(die, monkeypatch):
+    monkeypatch.setattr(resource_limits, "_STUCK_AFTER", 0.05)
+    limits = ResourceLimits({"api": ResourceLimit(rate=100, concurrency=1)}, 1)
+    p = Process(target=die, args=(limits,))
+    p.start()
+    p.join()
+
+    assert limits.reclaim(0) == 0
+    assert limits.acquire("api", timeout=1)
+
+
+class DiesHolding(IWorker):
+    def target(self):
+        self.limits.attach(self.slot)
+        self.limits.acquire("api")
+        os._exit(1)
+
+
+def test_pool_reclaims_permits_of_dead_workers():
+    pool = WorkerPool(1, DiesHolding, worker_timeout=1.0, resource_limits={"api": ResourceLimit(concurrency=1)})
+    pool.start()
+    pool._workers[0].join()
+    assert pool.limits.in_use("api") == 1
+
+    pool.restart_dead()
+    pool._workers[0].join()
+    # The replacement got the permit back and died holding it in turn
+    assert pool.limits.in_use("api") == 1
+    pool.cleanup()
+
+
+class Timed(IBatchWorker[int, tuple]):
+    resources = ("api",)
+
+    def work(self, item: int) -> tuple:
+        start = time.monotonic()
+        time.sleep(0.02)
+        return start, time.monotonic()
+
+
+def test_executor_holds_worker_resources_around_work():
+    config = BatchProcessorConfig(
+        on_worker_exception=FailurePolicy.ABORT,
+        on_worker_death=FailurePolicy.IGNORE,
+        logging=False,
+        resource_limits={"api": ResourceLimit(concurrency=1)},
+    )
+    processor = BatchProcessorFactory().create(3, Timed, config)
+    processor.start()
+    for i in range(9):
+        processor.put(i)
+    spans = sorted(processor.drain())
+
+    assert len(spans) == 9
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+    assert processor.pool.limits.in_use("api") == 0
@@ -1,9 +1,12 @@
 import pytest
 import time
+from multiprocessing import Process
 
 from batch_processing.worker_pool.worker_pool import WorkerPool
 from batch_processing.worker_pool.worker import IWorker
 from batch_processing.worker_pool.worker_fatal_error import WorkerFatalError
+from batch_processing.worker_pool.item_timeout_error import ItemTimeoutError
+from batch_processing.worker_pool.slot_table import SlotTable
 
 
 class DummyWorker(IWorker):
@@ -17,6 +20,49 @@ class DummyWorker(IWorker):
         time.sleep(0.1)
 
 
+class StubbornWorker(IWorker):
+    """Ignores SIGTERM and never exits on its own."""
+
+    def target(self):
+        import signal
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        while True:
+            time.sleep(0.1)
+
+
+class ReadyWorker(IWorker):
+    def __init__(self, init_time):
+        self.init_time = init_time
+
+    def target(self):
+        time.sleep(self.init_time)
+        self.slots.mark_ready(self.slot)
+        time.sleep(0.5)
+
+
+class RecyclingWorker(IWorker):
+    """Workers started by start() ask to be recycled right away; all exit once retired."""
+
+    def target(self):
+        self.slots.mark_ready(self.slot)
+        if self.slot < len(self.slots) // 2:
+            self.slots.request_recycle(self.slot)
+        while not self.slots.should_retire(self.slot):
+            time.sleep(0.01)
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll instead of sleeping a fixed time, spawned workers take a while to start."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def all_exited(pool):
+    return lambda: not any(p.is_alive() for p in pool._workers)
+
+
 def dummy_worker_factory(exit_code=0):
     def factory():
         return DummyWorker(exit_code)
@@ -50,17 +96,25 @@ class TestWorkerPool:
     def test_restart_dead_restarts_workers(self):
         pool = WorkerPool(n_workers=3, worker_factory=dummy_worker_factory(), worker_timeout=1.0)
         pool.start()
-        time.sleep(0.2)  # Let workers finish
+        assert wait_until(all_exited(pool))
         dead_count = pool.restart_dead()
         assert dead_count == 3  # All should be dead
         assert len(pool._workers) == 3
         assert all(p.is_alive() for p in pool._workers)
         pool.cleanup()
 
+    def test_restart_dead_can_leave_clean_exits(self):
+        pool = WorkerPool(n_workers=1, worker_factory=dummy_worker_factory(), worker_timeout=1.0)
+        pool.start()
+        assert wait_until(all_exited(pool))
+        assert pool.restart_dead(crashed_only=True) == 0
+        assert pool.alive_workers() == 0
+        pool.cleanup()
+
     def test_fatal_errors_collects_errors(self):
         pool = WorkerPool(n_workers=2, worker_factory=dummy_worker_factory(exit_code=1), worker_timeout=1.0)
         pool.start()
-        time.sleep(0.2)  # Let workers exit
+        assert wait_until(all_exited(pool))
         errors = pool.fatal_errors()
         assert len(errors) == 2
         for error in errors:
@@ -72,4 +126,141 @@ class TestWorkerPool:
         pool.start()
         with pytest.raises(RuntimeError, match="WorkerPool already started"):
             pool.start()
-        pool.cleanup()
\ No newline at end of file
+        pool.cleanup()
+
+    def test_evict_overdue_replaces_worker(self):
+        pool = WorkerPool(n_workers=2, worker_factory=dummy_worker_factory(), worker_timeout=1.0)
+        pool.start()
+        old = pool._workers[1]
+        pool.slots.begin(1, 7)
+
+        errors = pool.evict_overdue(0.0)
+
+        assert len(errors) == 1
+        assert isinstance(errors[0], ItemTimeoutError)
+        assert errors[0].slot == 1 and errors[0].task_id == 7
+        assert not old.is_alive()
+        assert pool._workers[1] is not old
+        assert pool.slots.started_at(1) == SlotTable.IDLE
+        lost = pool.lost_tasks()
+        assert [(t.task_id, t.error) for t in lost] == [(7, errors[0])]
+        assert pool.lost_tasks() == []
+        pool.cleanup()
+
+    def test_cancel_returns_the_task_a_worker_moved_on_to(self, monkeypatch):
+        pool = WorkerPool(n_workers=1, worker_factory=lambda: ReadyWorker(10), worker_timeout=1.0)
+        pool.start()
+        pool.slots.begin(0, 1)
+        kill = Process.kill
+
+        def move_on_then_kill(p):
+            # The cancelled copy finished and task 2 was taken before the kill landed
+            pool.slots.end(0)
+            pool.slots.take(0, 2)
+            kill(p)
+
+        monkeypatch.setattr(Process, "kill", move_on_then_kill)
+        assert pool.cancel_tasks([1]) == [2]
+        monkeypatch.undo()
+
+        assert pool.lost_tasks() == []
+        assert pool.cancel_tasks([1]) == []
+        pool.cleanup()
+
+    def test_evict_overdue_ignores_idle_and_recent(self):
+        pool = WorkerPool(n_workers=2, worker_factory=dummy_worker_factory(), worker_timeout=1.0)
+        pool.start()
+        pool.slots.begin(0, 1)
+
+        assert pool.evict_overdue(60.0) == []
+        assert pool.lost_tasks() == []
+        pool.cleanup()
+
+    def test_restart_dead_records_in_flight_task(self):
+        pool = WorkerPool(n_workers=2, worker_factory=dummy_worker_factory(exit_code=1), worker_timeout=1.0)
+        pool.start()
+        assert wait_until(all_exited(pool))
+        pool.slots.begin(0, 11)
+
+        assert pool.restart_dead() == 2
+        lost = pool.lost_tasks()
+        assert [t.task_id for t in lost] == [11]
+        assert isinstance(lost[0].error, WorkerFatalError)
+        assert pool.slots.task_id(0) is None
+        pool.cleanup()
+
+    def test_stop_uses_single_deadline(self):
+        pool = WorkerPool(n_workers=4, worker_factory=StubbornWorker, worker_timeout=0.2)
+        pool.start()
+
+        start = time.monotonic()
+        pool.stop()
+
+        assert time.monotonic() - start < 0.6
+        pool.cleanup()
+
+    def test_cleanup_escalates_to_kill(self):
+        pool = WorkerPool(n_workers=2, worker_factory=StubbornWorker, worker_timeout=1.0, kill_timeout=0.2)
+        pool.start()
+        time.sleep(0.1)  # Let workers install their signal handler
+        workers = list(pool._workers)
+
+        pool.cleanup()
+
+        assert all(not p.is_alive() for p in workers)
+
+    def test_start_waits_for_ready_workers(self):
+        pool = WorkerPool(n_workers=3, worker_factory=lambda: ReadyWorker(0.1), worker_timeout=1.0, startup_timeout=10.0)
+
+        pool.start()
+
+        assert all(pool.slots.is_ready(slot) for slot in range(3))
+        pool.cleanup()
+
+    def test_start_timeout_when_workers_not_ready(self):
+        pool = WorkerPool(n_workers=2, worker_factory=lambda: ReadyWorker(1.0), worker_timeout=1.0, startup_timeout=0.1)
+
+        with pytest.raises(TimeoutError):
+            pool.start()
+        assert len(pool._workers) == 0
+
+    def _recycle_until(self, pool, retired, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        total = 0
+        while total < retired and time.monotonic() < deadline:
+            total += pool.recycle()
+            time.sleep(0.01)
+        return total
+
+    def test_recycle_starts_replacement_before_retiring(self):
+        pool = WorkerPool(n_workers=2, worker_factory=RecyclingWorker, worker_timeout=1.0)
+        pool.start()
+        try:
+            assert wait_until(lambda: all(pool.slots.recycle_requested(slot) for slot in range(2)))
+            old = list(pool._workers)
+
+            assert pool.recycle() == 0  # Replacements are only started by the first call
+            assert pool.alive_workers() == 4
+
+            assert self._recycle_until(pool, 2) == 2
+            assert all(p not in old for p in pool._workers)
+            assert pool._worker_slots == [2, 3]
+            for p in old:
+                p.join(timeout=2)
+                assert p.exitcode == 0
+            pool.recycle()
+            assert pool._retiring == []
+            assert pool.alive_workers() == 2
+            assert pool.lost_tasks() == []
+        finally:
+            pool.cleanup()
+
+    def test_recycle_ignores_workers_without_request(self):
+        pool = WorkerPool(n_workers=2, worker_factory=dummy_worker_factory(), worker_timeout=1.0)
+        pool.start()
+        old = list(pool._workers)
+
+        assert pool.recycle() == 0
+        assert pool._workers == old
+        assert pool._incoming == {}
+        pool.cleanup()